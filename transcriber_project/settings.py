@@ -202,4 +202,59 @@ CELERY_TIMEZONE = "UTC"
 # TRANSCRIPTION PROFILE
 # ======================
 
-TRANSCRIBE_PROFILE = "multi_job"
\ No newline at end of file
+TRANSCRIBE_PROFILE = "multi_job"
+
+# "memory" slices chunks from the memory-mapped normalized wav,
+# "ffmpeg" cuts every chunk to its own file
+TRANSCRIBE_CHUNK_MODE = "memory"
+
+# "thread" shares one model between MAX_TRANSCRIBE_WORKERS threads,
+# "process" runs TRANSCRIBE_POOL_WORKERS processes with a model each
+# ("auto" sizes the pool from cores and available RAM)
+TRANSCRIBE_BACKEND = "thread"
+TRANSCRIBE_POOL_WORKERS = "auto"
+
+# Label speakers with pyannote (needs pyannote.audio and a Hugging Face token).
+# Runs alongside transcription; off, speakers come from "P1:" tags and question runs.
+TRANSCRIBE_DIARIZE = os.environ.get("TRANSCRIBE_DIARIZE", "")
+
+# Keep per-word timestamps (slower decoding) for word-level seek and search
+# at /transcription/<id>/words/?t=<seconds> or ?q=<word>
+TRANSCRIBE_WORD_TIMESTAMPS = os.environ.get("TRANSCRIBE_WORD_TIMESTAMPS", "")
+
+# Unix socket path or host:port of `manage.py run_model_server`.
+# When set, workers send transcription and diarization there instead of
+# loading their own models (and fall back to in-process if it is down).
+MODEL_SERVER_ADDRESS = os.environ.get("MODEL_SERVER_ADDRESS", "")
+
+# Per-chunk Whisper results keyed by audio content, reused by retries and
+# duplicate uploads. Least recently used chunks are evicted past the limit
+# (0 disables the cache).
+TRANSCRIBE_CACHE_DIR = os.path.join(MEDIA_ROOT, "cache", "transcripts")
+TRANSCRIBE_CACHE_MAX_BYTES = 1024 ** 3
+
+# Rendered PDF/DOCX exports keyed by transcript content version, format and
+# options; least recently used files are evicted past the limit (0 disables)
+EXPORT_CACHE_DIR = os.path.join(MEDIA_ROOT, "cache", "exports")
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 ** 2
+# Formats a Celery task renders into that cache as soon as a transcription
+# finishes (comma-separated; empty disables). Streaming text formats are skipped.
+EXPORT_PRERENDER_FORMATS = os.environ.get("EXPORT_PRERENDER_FORMATS", "pdf,docx")
+# Threads rendering PDF/DOCX ahead of a bulk ZIP export
+BULK_EXPORT_WORKERS = int(os.environ.get("BULK_EXPORT_WORKERS", 2))
+
+# LLM normalization results keyed by model, prompt and text, so only new
+# segments are sent to LLM_API_URL (0 entries disables the cache)
+LLM_CACHE_MAX_ENTRIES = 100_000
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+# Per-status counts on the processing pages are cached this long and dropped on
+# status changes (0 disables). Use a shared CACHES backend to invalidate across processes.
+DASHBOARD_STATS_CACHE_SECONDS = 5
+
+# Audio for the player is sent by Django (with sendfile() under gunicorn/uWSGI)
+# unless a front proxy takes over: "X-Accel-Redirect" for nginx, with
+# AUDIO_ACCEL_REDIRECT_PREFIX an internal location aliasing MEDIA_ROOT,
+# or "X-Sendfile" for Apache mod_xsendfile / lighttpd.
+AUDIO_SENDFILE_HEADER = os.environ.get("AUDIO_SENDFILE_HEADER", "")
+AUDIO_ACCEL_REDIRECT_PREFIX = os.environ.get("AUDIO_ACCEL_REDIRECT_PREFIX", "/protected-media/")
\ No newline at end of file
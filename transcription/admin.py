@@ -5,4 +5,15 @@ from .models import *
 class TranscriptionAdmin(admin.ModelAdmin):
     list_display = ['audio_file', 'uploaded_at', 'raw_transcript', 'normalized_english', 'structured_segments']
 
-admin.site.register(Transcription, TranscriptionAdmin)
\ No newline at end of file
+admin.site.register(Transcription, TranscriptionAdmin)
+
+class TranscriptionChunkAdmin(admin.ModelAdmin):
+    list_display = ['transcription', 'start_sample', 'end_sample', 'params', 'created_at']
+
+admin.site.register(TranscriptionChunk, TranscriptionChunkAdmin)
+
+
+class LLMCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['key', 'model', 'hits', 'created_at', 'last_used_at']
+
+admin.site.register(LLMCacheEntry, LLMCacheEntryAdmin)
@@ -3,6 +3,17 @@
 from abc import ABC, abstractmethod
 
 class BaseExporter(ABC):
+    content_type = "application/octet-stream"
+    # Text formats are produced segment by segment and can be streamed
+    streaming = False
+
+    def iter_export(self, segments, options):
+        """
+        segments: iterable of structured segment dicts, read once in order
+        options: export options dict
+        yields: encoded chunks of the document
+        """
+        yield self.export(segments, options)
 
     @abstractmethod
     def export(self, segments, options):
@@ -11,4 +22,36 @@ class BaseExporter(ABC):
         options: export options dict
         returns: bytes
         """
-        pass
+
+
+class StreamingExporter(BaseExporter):
+    """
+    Exporters that write one block of text per segment. Blocks are encoded
+    and yielded in chunks of about chunk_size bytes, so memory stays flat
+    however long the transcript is.
+    """
+    streaming = True
+    chunk_size = 64 * 1024
+
+    @abstractmethod
+    def iter_text(self, segments, options):
+        """
+        yields: str blocks of the document
+        """
+
+    def export(self, segments, options):
+        return b"".join(self.iter_export(segments, options))
+
+    def iter_export(self, segments, options):
+        buffer = []
+        size = 0
+        for text in self.iter_text(segments, options):
+            data = text.encode("utf-8")
+            buffer.append(data)
+            size += len(data)
+            if size >= self.chunk_size:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b"".join(buffer)
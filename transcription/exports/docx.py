@@ -4,6 +4,7 @@ from io import BytesIO
 from .utils import format_hhmmss
 
 class DocxExporter(BaseExporter):
+    content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
     def export(self, segments, options):
         doc = Document()
@@ -4,6 +4,7 @@ from .txt import TxtExporter
 from .pdf import PdfExporter
 from .docx import DocxExporter
 from .srt import SrtExporter
+from .vtt import VttExporter
 
 class ExportManager:
 
@@ -12,6 +13,7 @@ class ExportManager:
         "pdf": PdfExporter,
         "docx": DocxExporter,
         "srt": SrtExporter,
+        "vtt": VttExporter,
     }
 
     @classmethod
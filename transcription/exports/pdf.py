@@ -5,6 +5,7 @@ from io import BytesIO
 from .utils import format_hhmmss
 
 class PdfExporter(BaseExporter):
+    content_type = "application/pdf"
 
     def export(self, segments, options):
         buffer = BytesIO()
@@ -1,27 +1,18 @@
-from .base import BaseExporter
-from .utils import format_hhmmss
+from .base import StreamingExporter
+from .utils import format_timestamp
 
-class SrtExporter(BaseExporter):
+class SrtExporter(StreamingExporter):
+    content_type = "application/x-subrip; charset=utf-8"
 
-    def export(self, segments, options):
-        lines = []
-        index = 1
-
-        for segment in segments:
-            lines.append(str(index))
-
-            # Format timestamps for SRT
-            start = format_hhmmss(segment["start"])
-            end = format_hhmmss(segment["end"])
-            lines.append(f"{start} --> {end}")
+    def iter_text(self, segments, options):
+        for index, segment in enumerate(segments, start=1):
+            # SRT timestamps are HH:MM:SS,mmm
+            start = format_timestamp(segment["start"], ",")
+            end = format_timestamp(segment["end"], ",")
 
             # Include speaker optionally
             text = segment["english"]
             if options.get("include_speakers"):
                 text = f"{segment['speaker']}: {text}"
 
-            lines.append(text)
-            lines.append("")
-            index += 1
-
-        return "\n".join(lines).encode("utf-8")
+            yield f"{index}\n{start} --> {end}\n{text}\n\n"
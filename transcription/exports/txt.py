@@ -1,10 +1,11 @@
-from .base import BaseExporter
+from .base import StreamingExporter
 from .utils import format_hhmmss
 
-class TxtExporter(BaseExporter):
+class TxtExporter(StreamingExporter):
+    content_type = "text/plain; charset=utf-8"
 
-    def export(self, segments, options):
-        lines = []
+    def iter_text(self, segments, options):
+        separator = ""
 
         for segment in segments:
             line = ""
@@ -15,6 +16,6 @@ class TxtExporter(BaseExporter):
             if options.get("include_speakers"):
                 line += f"{segment['speaker']}: "
             line += segment["english"]
-            lines.append(line)
 
-        return "\n".join(lines).encode("utf-8")
+            yield separator + line
+            separator = "\n"
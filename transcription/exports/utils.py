@@ -1,3 +1,6 @@
+import os
+
+
 def format_hhmmss(seconds):
     """
     Convert seconds (float) into HH:MM:SS string.
@@ -10,3 +13,27 @@ def format_hhmmss(seconds):
         return f"{h:02d}:{m:02d}:{s:02d}"
     else:
         return f"{m:02d}:{s:02d}"
+
+
+def format_timestamp(seconds, decimal_separator="."):
+    """
+    Convert seconds (float) into HH:MM:SS.mmm, as subtitle formats expect
+    (SRT uses a comma as decimal separator).
+    """
+    millis = round(max(seconds or 0, 0) * 1000)
+    h, millis = divmod(millis, 3600 * 1000)
+    m, millis = divmod(millis, 60 * 1000)
+    s, millis = divmod(millis, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{decimal_separator}{millis:03d}"
+
+
+def export_basename(transcription) -> str:
+    """
+    Download name of a transcription without extension: the uploaded audio
+    file's name, with unsafe characters replaced.
+    """
+    if transcription.audio_file:
+        base_name = os.path.splitext(os.path.basename(transcription.audio_file.name))[0]
+    else:
+        base_name = f"transcript_{transcription.id}"
+    return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in base_name)
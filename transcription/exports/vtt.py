@@ -0,0 +1,24 @@
+from html import escape
+
+from .base import StreamingExporter
+from .utils import format_timestamp
+
+class VttExporter(StreamingExporter):
+    content_type = "text/vtt; charset=utf-8"
+
+    def iter_text(self, segments, options):
+        yield "WEBVTT\n\n"
+
+        for segment in segments:
+            # WebVTT timestamps are HH:MM:SS.mmm
+            start = format_timestamp(segment["start"])
+            end = format_timestamp(segment["end"])
+
+            # Speakers become voice spans, which players can style or show
+            # A cue ends at the first blank line; escaping "&", "<" and ">"
+            # keeps text from being read as tags and "-->" out of the cue
+            text = escape(" ".join(segment["english"].splitlines()), quote=False)
+            if options.get("include_speakers"):
+                text = f"<v {escape(segment['speaker'], quote=False)}>{text}"
+
+            yield f"{start} --> {end}\n{text}\n\n"
@@ -0,0 +1,147 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from transcription.services.audio_serving import serve_file
+
+LEGACY_CHUNK_SIZE = 8192
+
+
+def legacy_file_iter(file_path, start, length, chunk_size=LEGACY_CHUNK_SIZE):
+    """
+    The generator transcription_audio used to stream files with.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+class Drain:
+    """
+    A socket standing in for the client connection, read as fast as possible.
+    """
+
+    def __init__(self):
+        self.sock, peer = socket.socketpair()
+        self.received = 0
+        self.thread = threading.Thread(target=self._read, args=(peer,), daemon=True)
+        self.thread.start()
+
+    def _read(self, peer):
+        buffer = bytearray(1024 * 1024)
+        with peer:
+            while n := peer.recv_into(buffer):
+                self.received += n
+
+    def close(self) -> int:
+        self.sock.close()
+        self.thread.join()
+        return self.received
+
+
+def send_iterable(chunks, sock):
+    for chunk in chunks:
+        sock.sendall(chunk)
+
+
+def send_file(response, sock):
+    """
+    What wsgi.file_wrapper does with a FileResponse under gunicorn.
+    """
+    fileno = response.file_to_stream.fileno()
+    offset = os.lseek(fileno, 0, os.SEEK_CUR)
+    remaining = int(response["Content-Length"])
+    while remaining > 0:
+        sent = os.sendfile(sock.fileno(), fileno, offset, remaining)
+        if not sent:
+            break
+        offset += sent
+        remaining -= sent
+
+
+class Command(BaseCommand):
+    help = "Compare audio serving throughput: the old 8 KB generator, FileResponse, and sendfile()."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio_path", nargs="?", help="File to serve (default: a generated file)")
+        parser.add_argument("--size-mb", type=int, default=256, help="Size of the generated file")
+        parser.add_argument("--range", default="", help='Range header to request, e.g. "bytes=1000000-"')
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        path = options["audio_path"]
+        if path and not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+        if not hasattr(os, "sendfile"):
+            raise CommandError("os.sendfile is not available on this platform")
+
+        generated = None
+        if not path:
+            generated = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+            with generated:
+                block = os.urandom(1024 * 1024)
+                for _ in range(options["size_mb"]):
+                    generated.write(block)
+            path = generated.name
+
+        try:
+            self.run(path, options["range"], options["repeat"])
+        finally:
+            if generated is not None:
+                os.remove(generated.name)
+
+    def request(self, path, range_header):
+        headers = {"HTTP_RANGE": range_header} if range_header else {}
+        response = serve_file(RequestFactory().get("/", **headers), path, "audio/wav", os.path.basename(path))
+        if response.status_code not in (200, 206) or response.get("Content-Type", "").startswith("multipart/"):
+            raise CommandError(f"Range {range_header!r} gives a {response.status_code} multipart or error response")
+        return response
+
+    def run(self, path, range_header, repeat):
+        probe = self.request(path, range_header)
+        length = int(probe["Content-Length"])
+        start = int(probe["Content-Range"].split()[1].split("-")[0]) if probe.status_code == 206 else 0
+        probe.close()
+
+        def generator(sock):
+            send_iterable(legacy_file_iter(path, start, length), sock)
+
+        def file_response(sock):
+            response = self.request(path, range_header)
+            send_iterable(response, sock)
+            response.close()
+
+        def sendfile(sock):
+            response = self.request(path, range_header)
+            send_file(response, sock)
+            response.close()
+
+        self.stdout.write(f"{length / 1024 ** 2:.0f} MiB per request, best of {repeat}")
+        self.stdout.write(f"{'path':>14} {'seconds':>9} {'MiB/s':>9} {'speedup':>8}")
+        baseline = None
+        for name, send in (("generator-8k", generator), ("fileresponse", file_response), ("sendfile", sendfile)):
+            best = None
+            for _ in range(repeat):
+                drain = Drain()
+                started = time.perf_counter()
+                send(drain.sock)
+                received = drain.close()
+                elapsed = time.perf_counter() - started
+                if received != length:
+                    raise CommandError(f"{name} sent {received} bytes instead of {length}")
+                best = elapsed if best is None else min(best, elapsed)
+            baseline = baseline or best
+            self.stdout.write(
+                f"{name:>14} {best:>9.3f} {length / 1024 ** 2 / best:>9.0f} {baseline / best:>7.1f}x"
+            )
@@ -0,0 +1,68 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transcription.services.kolokwa_patterns import KOLOKWA_PATTERNS
+from transcription.services.regex_normalizer import DEFAULT_ENGINE
+
+FILLER_WORDS = (
+    "the", "we", "go", "to", "market", "and", "come", "back", "people", "water",
+    "they", "say", "it", "was", "raining", "yesterday", "my", "house", "school", "one",
+)
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> list:
+    """
+    Segments of 8-30 words, about one in ten of them a Kolokwa phrase.
+    """
+    rng = random.Random(seed)
+    phrases = [re.sub(r"\\b", "", pattern) for pattern, _replacement in KOLOKWA_PATTERNS]
+    corpus = []
+    for _ in range(count):
+        words = [
+            rng.choice(phrases) if rng.random() < 0.1 else rng.choice(FILLER_WORDS)
+            for _ in range(rng.randint(8, 30))
+        ]
+        corpus.append(" ".join(words))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = "Compare the single-pass Kolokwa normalizer with rule-by-rule rewriting."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--segments", type=int, default=100_000)
+        parser.add_argument("--corpus", help="Text file with one segment per line instead of a synthetic corpus")
+
+    def handle(self, *args, **options):
+        if options["corpus"]:
+            try:
+                with open(options["corpus"], encoding="utf-8") as f:
+                    corpus = [line.rstrip("\n") for line in f if line.strip()]
+            except OSError as e:
+                raise CommandError(str(e))
+        else:
+            corpus = synthetic_corpus(options["segments"])
+
+        self.stdout.write(f"{len(corpus)} segments, {len(DEFAULT_ENGINE.rules)} rules")
+        self.stdout.write(f"{'engine':>12} {'seconds':>9} {'segments/s':>11} {'speedup':>8}")
+
+        results = {}
+        baseline = None
+        for name, func in (
+            ("sequential", DEFAULT_ENGINE.normalize_sequential),
+            ("report", lambda text: DEFAULT_ENGINE.normalize(text)[0]),
+            ("fast", DEFAULT_ENGINE.normalize_fast),
+        ):
+            started = time.perf_counter()
+            results[name] = [func(text) for text in corpus]
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{name:>12} {elapsed:>9.2f} {len(corpus) / elapsed:>11.0f} {baseline / elapsed:>7.1f}x"
+            )
+
+        differing = sum(a != b for a, b in zip(results["sequential"], results["fast"]))
+        self.stdout.write(f"{differing} segments differ from rule-by-rule output (chained rewrites)")
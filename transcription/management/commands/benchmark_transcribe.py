@@ -0,0 +1,73 @@
+import os
+import time
+import multiprocessing
+from dataclasses import replace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transcription.services import transcribe_pool
+from transcription.services.audio_chunker import SAMPLE_RATE, prepare_chunks
+
+
+class Command(BaseCommand):
+    help = "Report the real-time factor of the process-pool backend for several pool sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio_path")
+        parser.add_argument(
+            "--workers",
+            default="1,2,4",
+            help="Comma-separated pool sizes to try, e.g. 1,2,4,8",
+        )
+        parser.add_argument("--chunk-seconds", type=int, default=120)
+        parser.add_argument(
+            "--accurate",
+            action="store_true",
+            help="Benchmark beam search (fast_mode off)",
+        )
+
+    def handle(self, *args, **options):
+        audio_path = options["audio_path"]
+        if not os.path.exists(audio_path):
+            raise CommandError(f"{audio_path} does not exist")
+        try:
+            sizes = [int(n) for n in options["workers"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers")
+
+        fast_mode = not options["accurate"]
+        _total, chunk_iter = prepare_chunks(audio_path, chunk_length=options["chunk_seconds"], mode="memory")
+        chunks = list(chunk_iter)
+        duration = chunks[-1].end
+        # One second of audio per worker, so model loading is not timed
+        warm_up = replace(chunks[0], end_sample=min(chunks[0].end_sample, SAMPLE_RATE))
+
+        self.stdout.write(
+            f"{duration:.0f} s of audio in {len(chunks)} chunks, "
+            f"auto pool size here: {transcribe_pool.auto_worker_count()}"
+        )
+        self.stdout.write(f"{'workers':>7} {'cpu_threads':>11} {'seconds':>9} {'RTF':>7}")
+
+        with multiprocessing.get_context("spawn").Manager() as manager:
+            for workers in sizes:
+                self.run(manager, workers, chunks, warm_up, duration, fast_mode)
+
+    def run(self, manager, workers, chunks, warm_up, duration, fast_mode):
+        pool = transcribe_pool.create_pool(workers)
+        try:
+            # Every worker must hold its warm-up chunk until all have loaded a model
+            barrier = manager.Barrier(workers)
+            warm_ups = [pool.submit(transcribe_pool.warm_up_worker, warm_up, barrier) for _ in range(workers)]
+            for future in warm_ups:
+                future.result()
+
+            started = time.perf_counter()
+            futures = [pool.submit(transcribe_pool.transcribe_in_worker, chunk, fast_mode) for chunk in chunks]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - started
+        finally:
+            pool.shutdown()
+
+        cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+        self.stdout.write(f"{workers:>7} {cpu_threads:>11} {elapsed:>9.1f} {elapsed / duration:>7.3f}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from transcription.services import search_index
+
+
+class Command(BaseCommand):
+    help = "Reindex every transcript segment for full-text search (e.g. after restoring a backup)."
+
+    def handle(self, *args, **options):
+        if not search_index.is_available():
+            self.stdout.write("Full-text search needs SQLite FTS5; searches use substring matching instead")
+            return
+        count = search_index.rebuild()
+        self.stdout.write(f"Indexed {count} segments")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from transcription.services.model_client import parse_address
+from transcription.services.model_server import DEFAULT_SLOTS, serve
+
+
+class Command(BaseCommand):
+    help = "Run the local model server that keeps Whisper and pyannote loaded for all Celery workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address",
+            help="Unix socket path or host:port (defaults to MODEL_SERVER_ADDRESS)",
+        )
+        parser.add_argument(
+            "--slots",
+            type=int,
+            default=DEFAULT_SLOTS,
+            help="Chunks decoded concurrently on the shared model",
+        )
+
+    def handle(self, *args, **options):
+        address = parse_address(options["address"]) if options["address"] else None
+
+        try:
+            serve(address, slots=max(1, options["slots"]))
+        except KeyboardInterrupt:
+            self.stdout.write("Model server stopped")
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0011_remove_transcription_progress_logs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_sample', models.BigIntegerField()),
+                ('end_sample', models.BigIntegerField()),
+                ('params', models.CharField(max_length=100)),
+                ('raw_segments', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transcription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='transcription.transcription')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='transcriptionchunk',
+            constraint=models.UniqueConstraint(fields=('transcription', 'start_sample', 'end_sample', 'params'), name='unique_transcription_chunk'),
+        ),
+    ]
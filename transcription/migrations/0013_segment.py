@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0012_transcriptionchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Segment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.FloatField()),
+                ('end', models.FloatField()),
+                ('speaker', models.CharField(blank=True, max_length=50)),
+                ('speaker_color', models.CharField(blank=True, max_length=100)),
+                ('segment_type', models.CharField(blank=True, max_length=20)),
+                ('original', models.TextField(blank=True)),
+                ('english', models.TextField(blank=True)),
+                ('transcription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='transcription.transcription')),
+            ],
+            options={
+                'ordering': ['start', 'id'],
+                'indexes': [models.Index(fields=['transcription', 'start'], name='segment_transcription_start')],
+            },
+        ),
+    ]
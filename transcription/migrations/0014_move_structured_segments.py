@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    Transcription = apps.get_model("transcription", "Transcription")
+    Segment = apps.get_model("transcription", "Segment")
+
+    for transcription in Transcription.objects.exclude(structured_segments=[]).iterator():
+        Segment.objects.bulk_create(
+            Segment(
+                transcription=transcription,
+                start=seg.get("start", 0),
+                end=seg.get("end", 0),
+                speaker=seg.get("speaker") or "",
+                speaker_color=seg.get("speaker_color") or "",
+                segment_type=seg.get("type") or "",
+                original=seg.get("original") or "",
+                english=seg.get("english") or "",
+            )
+            for seg in transcription.structured_segments or []
+        )
+        transcription.structured_segments = []
+        transcription.save(update_fields=["structured_segments"])
+
+
+def backwards(apps, schema_editor):
+    Transcription = apps.get_model("transcription", "Transcription")
+
+    for transcription in Transcription.objects.filter(segments__isnull=False).distinct().iterator():
+        transcription.structured_segments = [
+            {
+                "start": seg.start,
+                "end": seg.end,
+                "speaker": seg.speaker,
+                "speaker_color": seg.speaker_color,
+                "type": seg.segment_type,
+                "original": seg.original,
+                "english": seg.english,
+            }
+            for seg in transcription.segments.order_by("start", "id")
+        ]
+        transcription.save(update_fields=["structured_segments"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0013_segment'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
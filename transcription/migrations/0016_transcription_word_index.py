@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0015_llmcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='word_index',
+            field=models.FileField(blank=True, upload_to='words/'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+FTS_TABLE = "transcription_segment_fts"
+
+
+def create_index(apps, schema_editor):
+    # FTS5 is SQLite only; other databases search without an index
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    Segment = apps.get_model("transcription", "Segment")
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "original, english, transcription_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, original, english, transcription_id) VALUES (%s, %s, %s, %s)",
+            list(Segment.objects.values_list("id", "original", "english", "transcription_id").iterator()),
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0016_transcription_word_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+PREVIEW_LENGTH = 160
+
+
+def backfill_summary(apps, schema_editor):
+    Transcription = apps.get_model("transcription", "Transcription")
+    Segment = apps.get_model("transcription", "Segment")
+
+    for transcription in Transcription.objects.filter(segments__isnull=False).distinct().only("id").iterator():
+        segments = Segment.objects.filter(transcription=transcription)
+        summary = segments.aggregate(
+            duration=models.Max("end"),
+            segment_count=models.Count("id"),
+            speaker_count=models.Count("speaker", distinct=True, filter=~models.Q(speaker__in=["", "UNKNOWN"])),
+        )
+        texts = list(segments.order_by("start", "id").values_list("original", flat=True))
+        preview = ""
+        for text in texts:
+            if len(preview) >= PREVIEW_LENGTH:
+                break
+            if text and text.strip():
+                preview = f"{preview} {text.strip()}" if preview else text.strip()
+        Transcription.objects.filter(pk=transcription.pk).update(
+            duration=summary["duration"] or 0,
+            segment_count=summary["segment_count"],
+            speaker_count=summary["speaker_count"],
+            word_count=sum(len(text.split()) for text in texts if text),
+            preview=preview[:PREVIEW_LENGTH],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0017_segment_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='duration',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='preview',
+            field=models.CharField(blank=True, max_length=160),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='segment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='speaker_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transcription',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='transcription',
+            index=models.Index(fields=['status', 'uploaded_at'], name='transcription_status_uploaded'),
+        ),
+        migrations.AddIndex(
+            model_name='transcription',
+            index=models.Index(fields=['uploaded_at'], name='transcription_uploaded_at'),
+        ),
+        migrations.RunPython(backfill_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0018_transcription_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcription',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,33 @@
 from django.db import models
 
+PREVIEW_LENGTH = 160
+
+
+def count_words(text: str) -> int:
+    return len(text.split()) if text else 0
+
+
+def make_preview(texts) -> str:
+    """
+    The opening of a transcript from its segment texts in order, reading
+    only as many as fit in PREVIEW_LENGTH.
+    """
+    preview = ""
+    for text in texts:
+        if len(preview) >= PREVIEW_LENGTH:
+            break
+        if text and text.strip():
+            preview = f"{preview} {text.strip()}" if preview else text.strip()
+    return preview[:PREVIEW_LENGTH]
+
+
 class Transcription(models.Model):
+    # Everything the list and dashboard pages render, without the large text columns
+    SUMMARY_FIELDS = (
+        "id", "audio_file", "uploaded_at", "status", "progress",
+        "duration", "segment_count", "speaker_count", "word_count", "preview",
+    )
+
     audio_file = models.FileField(upload_to="audio/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -26,6 +53,166 @@ class Transcription(models.Model):
         default="FILE_RECEIVED"
     )
     error_message = models.TextField(blank=True)
+    # Per-word timestamps (services.word_index), when TRANSCRIBE_WORD_TIMESTAMPS is on
+    word_index = models.FileField(upload_to="words/", blank=True)
+
+    # Summary of the segments, maintained by update_summary on write
+    duration = models.FloatField(default=0)
+    segment_count = models.PositiveIntegerField(default=0)
+    speaker_count = models.PositiveIntegerField(default=0)
+    word_count = models.PositiveIntegerField(default=0)
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True)
+    # Bumped by every segment write, so exports rendered from older segments are stale
+    content_version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Status filter with either date order, and the status sort
+            models.Index(fields=["status", "uploaded_at"], name="transcription_status_uploaded"),
+            models.Index(fields=["uploaded_at"], name="transcription_uploaded_at"),
+        ]
 
     def __str__(self):
         return f"Transcription {self.id}"
+
+    def bump_content_version(self):
+        Transcription.objects.filter(pk=self.pk).update(content_version=models.F("content_version") + 1)
+        self.refresh_from_db(fields=["content_version"])
+
+    def refresh_preview(self) -> str:
+        # Each segment adds at least two characters, so this many rows always suffice
+        return make_preview(
+            self.segments.order_by("start", "id").values_list("original", flat=True)[:PREVIEW_LENGTH // 2]
+        )
+
+    def update_summary(self, save: bool = True):
+        """
+        Recompute the summary columns from the segment rows.
+        """
+        summary = self.segments.aggregate(
+            duration=models.Max("end"),
+            segment_count=models.Count("id"),
+            speaker_count=models.Count("speaker", distinct=True, filter=~models.Q(speaker__in=["", "UNKNOWN"])),
+        )
+        self.duration = summary["duration"] or 0
+        self.segment_count = summary["segment_count"]
+        self.speaker_count = summary["speaker_count"]
+
+        texts = list(self.segments.order_by("start", "id").values_list("original", flat=True))
+        self.word_count = sum(count_words(text) for text in texts)
+        self.preview = make_preview(texts)
+
+        if save:
+            self.save(update_fields=["duration", "segment_count", "speaker_count", "word_count", "preview"])
+
+    def get_segments(self) -> list[dict]:
+        """
+        Segments in time order, as the dicts exporters and templates expect.
+        Falls back to the legacy structured_segments JSON if there are no rows.
+        """
+        segments = list(
+            self.segments.order_by("start", "id").values(*Segment.DICT_FIELDS, type=models.F("segment_type"))
+        )
+        return segments or list(self.structured_segments or [])
+
+    def iter_segments(self, chunk_size: int = 2000):
+        """
+        Same as get_segments, but read from the database in chunks for
+        exports that stream, so long transcripts are never held in memory.
+        """
+        if not self.segments.exists():
+            yield from self.structured_segments or []
+            return
+        yield from (
+            self.segments.order_by("start", "id")
+            .values(*Segment.DICT_FIELDS, type=models.F("segment_type"))
+            .iterator(chunk_size=chunk_size)
+        )
+
+
+class Segment(models.Model):
+    """
+    One transcript segment. Stored as rows so a finished chunk is a bulk
+    insert and an edit is a single-row update, instead of rewriting the
+    whole structured_segments array.
+    """
+    DICT_FIELDS = ("start", "end", "speaker", "speaker_color", "original", "english")
+
+    transcription = models.ForeignKey(
+        Transcription,
+        on_delete=models.CASCADE,
+        related_name="segments",
+    )
+    start = models.FloatField()
+    end = models.FloatField()
+    speaker = models.CharField(max_length=50, blank=True)
+    speaker_color = models.CharField(max_length=100, blank=True)
+    segment_type = models.CharField(max_length=20, blank=True)
+    original = models.TextField(blank=True)
+    english = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["start", "id"]
+        indexes = [
+            models.Index(fields=["transcription", "start"], name="segment_transcription_start"),
+        ]
+
+    def __str__(self):
+        return f"Segment {self.start:.2f}s of transcription {self.transcription_id}"
+
+    @classmethod
+    def from_dict(cls, transcription, data: dict) -> "Segment":
+        return cls(
+            transcription=transcription,
+            start=data.get("start", 0),
+            end=data.get("end", 0),
+            speaker=data.get("speaker") or "",
+            speaker_color=data.get("speaker_color") or "",
+            segment_type=data.get("type") or "",
+            original=data.get("original") or "",
+            english=data.get("english") or "",
+        )
+
+
+class TranscriptionChunk(models.Model):
+    """
+    Raw Whisper output of one chunk, checkpointed as soon as the chunk is
+    transcribed so a retried or resumed job only transcribes missing chunks.
+    """
+    transcription = models.ForeignKey(
+        Transcription,
+        on_delete=models.CASCADE,
+        related_name="chunks",
+    )
+    start_sample = models.BigIntegerField()
+    end_sample = models.BigIntegerField()
+    # Model, language and beam size the segments were produced with
+    params = models.CharField(max_length=100)
+    raw_segments = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["transcription", "start_sample", "end_sample", "params"],
+                name="unique_transcription_chunk",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Chunk {self.start_sample}-{self.end_sample} of transcription {self.transcription_id}"
+
+
+class LLMCacheEntry(models.Model):
+    """
+    One LLM normalization result, keyed by a hash of the model, prompt and input text.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    model = models.CharField(max_length=100)
+    output = models.TextField()
+    created_at = models.DateTimeField()
+    last_used_at = models.DateTimeField(db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"LLM cache entry {self.key[:12]}"
@@ -1,34 +1,35 @@
 import os
 import math
+import struct
 import subprocess
 import logging
+from dataclasses import dataclass, replace
+
+import numpy as np
+from django.conf import settings
 
 DEFAULT_CHUNK_LENGTH = 600  # seconds
-DEFAULT_OVERLAP = 2
+DEFAULT_OVERLAP = 2  # only used when no silence is found near a cut
+DEFAULT_BOUNDARY_TOLERANCE = 15  # seconds searched either side of a nominal cut
+SAMPLE_RATE = 16000  # normalize_audio always writes 16 kHz mono s16le
+
+# "memory": memory-map the normalized wav and hand Whisper float32 windows
+# "ffmpeg": cut each chunk to its own wav file with ffmpeg
+CHUNK_MODES = ("memory", "ffmpeg")
+
+# Energy-based silence detection used to place chunk boundaries
+SILENCE_FRAME = 480  # 30 ms at 16 kHz
+MIN_SILENCE_FRAMES = 10  # a pause must last at least 300 ms
+SILENCE_RMS = 328  # about -40 dBFS
 
 logger = logging.getLogger("transcription")
 
-def get_audio_duration(audio_path: str) -> float:
+def normalized_path_for(audio_path: str) -> str:
     """
-    Returns the duration of an audio file in seconds using ffprobe.
+    Where normalize_audio writes the normalized wav of audio_path.
     """
-    try:
-        return float(
-            subprocess.check_output(
-                [
-                    "ffprobe",
-                    "-v", "error",
-                    "-show_entries", "format=duration",
-                    "-of", "default=noprint_wrappers=1:nokey=1",
-                    audio_path,
-                ],
-                stderr=subprocess.STDOUT,
-            )
-        )
-    except subprocess.CalledProcessError as e:
-        details = e.output.decode(errors="replace") if e.output else str(e)
-        logger.error
-        raise RuntimeError(f"Failed to read audio duration: {details}")
+    base, _ = os.path.splitext(audio_path)
+    return f"{base}_normalized.wav"
 
 
 def normalize_audio(audio_path: str) -> str:
@@ -36,8 +37,7 @@ def normalize_audio(audio_path: str) -> str:
     Normalize audio to 16kHz mono PCM WAV for accurate and fast chunking.
     Returns path to normalized wav file.
     """
-    base, _ = os.path.splitext(audio_path)
-    normalized_path = f"{base}_normalized.wav"
+    normalized_path = normalized_path_for(audio_path)
 
     try:
         subprocess.run(
@@ -62,42 +62,240 @@ def normalize_audio(audio_path: str) -> str:
     return normalized_path
 
 
-def chunk_audio(
-    audio_path: str,
+def get_chunk_mode() -> str:
+    mode = getattr(settings, "TRANSCRIBE_CHUNK_MODE", None) or os.environ.get("TRANSCRIBE_CHUNK_MODE", "memory")
+    mode = mode.strip().lower()
+    return mode if mode in CHUNK_MODES else "memory"
+
+
+def _find_wav_data(f) -> tuple[int, int]:
+    """
+    Walk the RIFF chunks of a wav file and return (offset, size) of its data chunk.
+    """
+    riff, _size, wave_id = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise RuntimeError("Normalized audio is not a RIFF/WAVE file")
+
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise RuntimeError("Normalized audio has no data chunk")
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"data":
+            return f.tell(), chunk_size
+        # Chunks are word aligned
+        f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def read_pcm(normalized_path: str) -> np.ndarray:
+    """
+    Memory-map the 16-bit samples of a normalized wav without decoding or copying it.
+    """
+    file_size = os.path.getsize(normalized_path)
+    with open(normalized_path, "rb") as f:
+        offset, size = _find_wav_data(f)
+
+    # ffmpeg leaves the size unset when it cannot seek back; trust the file instead
+    size = min(size, file_size - offset)
+    count = size // 2
+    if count == 0:
+        return np.zeros(0, dtype="<i2")
+    return np.memmap(normalized_path, dtype="<i2", mode="r", offset=offset, shape=(count,))
+
+
+def pcm_window(samples: np.ndarray, start: int, end: int) -> np.ndarray:
+    """
+    Float32 samples in [-1, 1] for samples[start:end], the input faster-whisper expects.
+    Only this window is materialized; the rest of the file stays memory-mapped.
+    """
+    return samples[start:end].astype(np.float32) / 32768.0
+
+
+def find_silence_boundary(
+    samples: np.ndarray,
+    target: int,
+    tolerance: int,
+    lower: int = 0,
+) -> int | None:
+    """
+    Sample offset of the middle of the pause closest to target, searching
+    target +/- tolerance samples (never before lower).
+    Returns None when there is no pause of at least MIN_SILENCE_FRAMES there.
+    """
+    lo = max(lower, target - tolerance)
+    hi = min(len(samples), target + tolerance)
+    n_frames = (hi - lo) // SILENCE_FRAME
+    if n_frames < MIN_SILENCE_FRAMES:
+        return None
+
+    frames = np.asarray(samples[lo:lo + n_frames * SILENCE_FRAME], dtype=np.float32)
+    frames = frames.reshape(n_frames, SILENCE_FRAME)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+
+    # Follow the recording's noise floor so background hiss does not hide every
+    # pause, but stay well under the typical level so steady noise is not "silence"
+    noise_floor = float(np.percentile(rms, 5))
+    threshold = max(SILENCE_RMS, min(2 * noise_floor, 0.5 * float(np.median(rms))))
+    quiet = np.concatenate(([0], (rms <= threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(quiet))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+
+    long_enough = (run_ends - run_starts) >= MIN_SILENCE_FRAMES
+    if not long_enough.any():
+        return None
+
+    centers = lo + (run_starts[long_enough] + run_ends[long_enough]) * SILENCE_FRAME // 2
+    return int(centers[np.argmin(np.abs(centers - target))])
+
+
+def plan_chunk_boundaries(
+    samples: np.ndarray,
     chunk_length: int = DEFAULT_CHUNK_LENGTH,
     overlap: int = DEFAULT_OVERLAP,
-) -> list[str]:
+    tolerance: float = DEFAULT_BOUNDARY_TOLERANCE,
+) -> list[tuple[int, int]]:
     """
-    Splits audio into chunks.
-    Returns original file if shorter than chunk_length.
+    Split audio into [start, end) sample ranges of about chunk_length seconds.
+    Each cut is moved to the nearest pause within tolerance seconds, so chunks
+    meet exactly with no overlap. Only when no pause is found does the cut stay
+    at the fixed position, with overlap seconds shared by both chunks.
     """
-    normalized_path = normalize_audio(audio_path)
-    duration = get_audio_duration(normalized_path)
+    total = len(samples)
+    chunk_samples = chunk_length * SAMPLE_RATE
+    tolerance_samples = int(tolerance * SAMPLE_RATE)
+    overlap_samples = overlap * SAMPLE_RATE
+
+    boundaries = []
+    start = 0
+    while total - start > chunk_samples:
+        target = start + chunk_samples
+        cut = None
+        if tolerance_samples:
+            cut = find_silence_boundary(
+                samples,
+                target,
+                tolerance_samples,
+                lower=start + chunk_samples // 2,
+            )
+
+        if cut is None:
+            boundaries.append((start, target))
+            start = target - overlap_samples
+        else:
+            boundaries.append((start, cut))
+            start = cut
+
+    boundaries.append((start, total))
+    return boundaries
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """
+    One entry of the chunk manifest.
+    start_sample/end_sample locate the chunk in the normalized recording, and
+    keep_start/keep_end (seconds) is the part of it this chunk owns when
+    neighbouring chunks overlap, so duplicate segments can be dropped.
+    """
+    index: int
+    start_sample: int
+    end_sample: int
+    keep_start: float
+    keep_end: float
+    # Chunk wav file, or the normalized wav itself for in-memory chunks
+    path: str
+    in_memory: bool = False
+
+    @property
+    def start(self) -> float:
+        return self.start_sample / SAMPLE_RATE
+
+    @property
+    def end(self) -> float:
+        return self.end_sample / SAMPLE_RATE
+
+    def load(self):
+        """
+        Audio to hand to Whisper: the chunk path, or float32 samples for
+        in-memory chunks. Kept lazy so chunks stay cheap to queue and pickle.
+        """
+        if not self.in_memory:
+            return self.path
+        return pcm_window(read_pcm(self.path), self.start_sample, self.end_sample)
+
+    def owns(self, start: float, end: float) -> bool:
+        """
+        Whether a segment at absolute [start, end] belongs to this chunk
+        rather than to the neighbour it overlaps with.
+        """
+        middle = (start + end) / 2
+        return self.keep_start <= middle < self.keep_end
+
+
+def build_manifest(
+    boundaries: list[tuple[int, int]],
+    path: str,
+    in_memory: bool = False,
+) -> list[AudioChunk]:
+    """
+    Turn planned boundaries into AudioChunks. Overlapping neighbours split
+    their shared audio at its midpoint.
+    """
+    manifest = []
+    for i, (start, end) in enumerate(boundaries):
+        if i == 0:
+            keep_start = 0.0
+        else:
+            keep_start = (start + boundaries[i - 1][1]) / 2 / SAMPLE_RATE
+        if i == len(boundaries) - 1:
+            keep_end = math.inf
+        else:
+            keep_end = (boundaries[i + 1][0] + end) / 2 / SAMPLE_RATE
+
+        manifest.append(
+            AudioChunk(
+                index=i,
+                start_sample=start,
+                end_sample=end,
+                keep_start=keep_start,
+                keep_end=keep_end,
+                path=path,
+                in_memory=in_memory,
+            )
+        )
+    return manifest
+
 
-    if duration <= chunk_length:
-        return [normalized_path]
+def iter_chunks(normalized_path: str, boundaries: list[tuple[int, int]]):
+    """
+    Lazily cuts a normalized wav at the planned sample boundaries, yielding each
+    AudioChunk as soon as ffmpeg has written its file so transcription can start
+    on chunk 0 while later chunks are still being cut.
+    Uses the normalized file itself if there is only one chunk.
+    """
+    manifest = build_manifest(boundaries, normalized_path)
+    if len(manifest) == 1:
+        yield manifest[0]
+        return
 
     base, _ = os.path.splitext(normalized_path)
     output_dir = f"{base}_chunks"
     os.makedirs(output_dir, exist_ok=True)
 
-    chunks = []
-    total_chunks = math.ceil(duration / chunk_length)
-
-    for i in range(total_chunks):
-        start = max(0, i * chunk_length - overlap)
-        out_file = os.path.join(output_dir, f"chunk_{i}.wav")
+    for chunk in manifest:
+        out_file = os.path.join(output_dir, f"chunk_{chunk.index}.wav")
 
         try:
             subprocess.run(
                 [
                     "ffmpeg",
                     "-y",
-                    "-ss", str(start),
+                    "-ss", f"{chunk.start:.6f}",
                     "-i", normalized_path,
-                    "-t", str(chunk_length),
-                    # PCM WAV supports accurate and fast stream copy
-                    "-c", "copy",
+                    "-t", f"{chunk.end - chunk.start:.6f}",
+                    # Re-encoding PCM is cheap and, unlike stream copy,
+                    # lets ffmpeg trim to the exact sample
+                    "-acodec", "pcm_s16le",
                     out_file,
                 ],
                 stdout=subprocess.DEVNULL,
@@ -107,9 +305,38 @@ def chunk_audio(
         except subprocess.CalledProcessError as e:
             details = e.stderr.decode(errors="replace") if e.stderr else str(e)
             logger.error(f"FFmpeg error: {details}")
-            raise RuntimeError(f"ffmpeg failed to create chunk {i}: {details}")
+            raise RuntimeError(f"ffmpeg failed to create chunk {chunk.index}: {details}")
+
+        yield replace(chunk, path=out_file)
+
+
+def iter_pcm_chunks(normalized_path: str, boundaries: list[tuple[int, int]]):
+    """
+    Same chunks as iter_chunks, but read as float32 windows of the memory-mapped
+    normalized wav: no ffmpeg process and no chunk file per window.
+    """
+    yield from build_manifest(boundaries, normalized_path, in_memory=True)
+
 
+def prepare_chunks(
+    audio_path: str,
+    chunk_length: int = DEFAULT_CHUNK_LENGTH,
+    overlap: int = DEFAULT_OVERLAP,
+    mode: str | None = None,
+):
+    """
+    Normalize audio, plan silence-aligned chunk boundaries and return
+    (total_chunks, chunk_iter).
+    chunk_iter lazily yields the AudioChunk manifest, backed by chunk wav files
+    in "ffmpeg" mode or by the memory-mapped normalized wav in "memory" mode.
+    """
+    mode = mode or get_chunk_mode()
+    normalized_path = normalize_audio(audio_path)
+    boundaries = plan_chunk_boundaries(read_pcm(normalized_path), chunk_length, overlap)
 
-        chunks.append(out_file)
+    if mode == "memory":
+        chunk_iter = iter_pcm_chunks(normalized_path, boundaries)
+    else:
+        chunk_iter = iter_chunks(normalized_path, boundaries)
 
-    return chunks
+    return len(boundaries), chunk_iter
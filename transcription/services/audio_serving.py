@@ -0,0 +1,219 @@
+"""
+Serving uploaded audio to the player.
+
+Players seek with Range requests, so responses support single, suffix
+(bytes=-500) and multiple ranges, and answer If-None-Match /
+If-Modified-Since with 304 and If-Range with the whole file when it changed.
+Whole files and single ranges are FileResponses over the open file: WSGI
+servers with wsgi.file_wrapper (gunicorn, uWSGI) send them with sendfile()
+instead of copying them through Python.
+
+Set AUDIO_SENDFILE_HEADER to hand the transfer to a front proxy instead:
+"X-Accel-Redirect" (nginx, with AUDIO_ACCEL_REDIRECT_PREFIX an internal
+location aliasing MEDIA_ROOT) or "X-Sendfile" (Apache mod_xsendfile,
+lighttpd). The proxy then handles ranges itself.
+"""
+import os
+import secrets
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+# Reads when Python does the copying (runserver, or servers without sendfile)
+BLOCK_SIZE = 256 * 1024
+# More ranges than this in one request get the whole file
+MAX_RANGES = 16
+CACHE_CONTROL = "private, max-age=3600"
+SENDFILE_HEADERS = ("X-Accel-Redirect", "X-Sendfile")
+DEFAULT_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+CRLF = "\r\n"
+
+
+def get_sendfile_header() -> str:
+    """
+    "X-Accel-Redirect", "X-Sendfile", or "" to send files from Django.
+    """
+    header = getattr(settings, "AUDIO_SENDFILE_HEADER", None) or os.environ.get("AUDIO_SENDFILE_HEADER", "")
+    for name in SENDFILE_HEADERS:
+        if header.lower() == name.lower():
+            return name
+    return ""
+
+
+def get_accel_redirect_prefix() -> str:
+    return getattr(settings, "AUDIO_ACCEL_REDIRECT_PREFIX", None) or os.environ.get(
+        "AUDIO_ACCEL_REDIRECT_PREFIX", DEFAULT_ACCEL_REDIRECT_PREFIX
+    )
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """
+    Strong ETag of a file from its size and modification time.
+    """
+    return quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+def parse_range_header(header: str, size: int) -> list[tuple[int, int]] | None:
+    """
+    Inclusive (start, end) byte ranges of a Range header for a file of size
+    bytes, sorted and with overlapping or adjacent ranges merged.
+    None when the header should be ignored (absent, malformed, another unit
+    or too many ranges); an empty list when no range is satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        first, dash, last = part.strip().partition("-")
+        if not dash or not (first.isdigit() or last.isdigit()):
+            return None
+        if first and last and not (first.isdigit() and last.isdigit()):
+            return None
+        if not first:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix and size:
+                ranges.append((max(size - suffix, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last), size - 1) if last else size - 1))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """
+    Whether a Range request may be answered partially: no If-Range, or one
+    naming the current strong ETag or exact Last-Modified date.
+    """
+    if_range = request.headers.get("If-Range", "").strip()
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return not if_range.startswith("W/") and parse_etags(if_range) == [etag]
+    return parse_http_date_safe(if_range) == last_modified
+
+
+class _FileRange:
+    """
+    Read-only view of bytes [start, start + length) of an open file. Keeps
+    fileno(), so wsgi.file_wrapper can still sendfile() it: the file is
+    positioned at start and Content-Length bounds the copy.
+    """
+
+    def __init__(self, f, start: int, length: int):
+        self.file = f
+        self.remaining = length
+        f.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _iter_ranges(path: str, ranges, parts, closing: bytes):
+    with open(path, "rb") as f:
+        for (start, end), part_header in zip(ranges, parts):
+            yield part_header
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(BLOCK_SIZE, remaining))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+    yield closing
+
+
+def _multipart_response(path: str, ranges, size: int, content_type: str) -> StreamingHttpResponse:
+    boundary = secrets.token_hex(16)
+    # Every part after the first starts on a new line
+    parts = [
+        (
+            f"{'' if i == 0 else CRLF}--{boundary}{CRLF}"
+            f"Content-Type: {content_type}{CRLF}"
+            f"Content-Range: bytes {start}-{end}/{size}{CRLF}{CRLF}"
+        ).encode("ascii")
+        for i, (start, end) in enumerate(ranges)
+    ]
+    closing = f"{CRLF}--{boundary}--{CRLF}".encode("ascii")
+    length = sum(map(len, parts)) + sum(end - start + 1 for start, end in ranges) + len(closing)
+
+    response = StreamingHttpResponse(
+        _iter_ranges(path, ranges, parts, closing),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response["Content-Length"] = str(length)
+    return response
+
+
+def serve_file(request, path: str, content_type: str, name: str):
+    """
+    Response for a GET of the media file at path (name relative to MEDIA_ROOT).
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        sendfile_header = get_sendfile_header()
+        ranges = None
+        if not sendfile_header and _if_range_matches(request, etag, last_modified):
+            ranges = parse_range_header(request.headers.get("Range", ""), size)
+
+        if sendfile_header == "X-Accel-Redirect":
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = quote(get_accel_redirect_prefix().rstrip("/") + "/" + name.lstrip("/"))
+        elif sendfile_header == "X-Sendfile":
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = path
+        elif ranges == []:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif ranges is None:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+            response.block_size = BLOCK_SIZE
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            response = FileResponse(_FileRange(open(path, "rb"), start, end - start + 1),
+                                    status=206, content_type=content_type)
+            response.block_size = BLOCK_SIZE
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            response = _multipart_response(path, ranges, size, content_type)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,162 @@
+"""
+Many transcripts in one ZIP download, streamed.
+
+The archive is written by zipfile into a buffer that is drained after every
+entry chunk, so the response starts at once and only the entries being
+rendered are ever in memory. Text formats stream segment rows straight into
+their entry. PDF and DOCX are rendered whole by a small thread pool a few
+transcripts ahead of the writer (BULK_EXPORT_WORKERS); finished transcripts
+reuse and fill the rendered export cache.
+"""
+import os
+import zipfile
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+
+from ..exports.manager import ExportManager
+from ..exports.utils import export_basename
+from .export_cache import export_key, get_export_cache
+
+DEFAULT_WORKERS = 2
+# Bytes buffered before the archive is handed to the response
+FLUSH_BYTES = 64 * 1024
+
+logger = logging.getLogger("transcription")
+
+
+def get_bulk_export_workers() -> int:
+    workers = getattr(settings, "BULK_EXPORT_WORKERS", None) or os.environ.get("BULK_EXPORT_WORKERS", DEFAULT_WORKERS)
+    return max(1, int(workers))
+
+
+class _ArchiveBuffer:
+    """
+    Write-only, unseekable file for zipfile. Unseekable output makes zipfile
+    write sizes and CRCs after each entry's data, so nothing is rewritten.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def iter_zip(entries):
+    """
+    ZIP archive of (name, iterable of bytes) entries, as a generator of
+    bytes chunks. Each entry is consumed as it is written.
+    """
+    buffer = _ArchiveBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in entries:
+            with archive.open(name, "w") as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if buffer.size >= FLUSH_BYTES:
+                        yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _iter_file(f, chunk_size=FLUSH_BYTES):
+    with f:
+        while data := f.read(chunk_size):
+            yield data
+
+
+def _unique_name(name: str, used: set) -> str:
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}{ext}"
+    used.add(candidate)
+    return candidate
+
+
+def iter_export_entries(transcription_ids, fmt: str, options: dict, workers: int | None = None):
+    """
+    (file name, bytes chunks) of every transcription's export, in id order.
+    """
+    Transcription = apps.get_model("transcription", "Transcription")
+    exporter = ExportManager.get_exporter(fmt)
+    ids = list(Transcription.objects.filter(id__in=transcription_ids).order_by("id").values_list("id", flat=True))
+    used = set()
+
+    def transcriptions():
+        # One row at a time; legacy rows carry their segments as JSON
+        for transcription_id in ids:
+            transcription = Transcription.objects.filter(id=transcription_id).first()
+            if transcription is not None:
+                yield transcription, _unique_name(f"{export_basename(transcription)}.{fmt}", used)
+
+    if exporter.streaming:
+        for transcription, name in transcriptions():
+            yield name, exporter.iter_export(transcription.iter_segments(), options)
+        return
+
+    cache = get_export_cache()
+    workers = workers or get_bulk_export_workers()
+    # Rendering threads only get segment dicts, never a database connection
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def finish(name, key, job):
+        if not isinstance(job, Future):
+            return name, _iter_file(job)
+        try:
+            data = job.result()
+        except Exception:
+            logger.exception(f"Bulk export could not render {name}")
+            return None
+        if key is not None:
+            cache.put_bytes(key, data)
+        return name, [data]
+
+    try:
+        for transcription, name in transcriptions():
+            key = path = None
+            if cache is not None and transcription.status == "DONE":
+                key = export_key(transcription.id, transcription.content_version, fmt, options)
+                path = cache.get_path(key)
+            if path is not None:
+                # Opened now so eviction cannot remove it before it is written
+                pending.append((name, None, open(path, "rb")))
+            else:
+                pending.append((name, key, pool.submit(exporter.export, transcription.get_segments(), options)))
+
+            while len(pending) > workers:
+                if (entry := finish(*pending.popleft())) is not None:
+                    yield entry
+        while pending:
+            if (entry := finish(*pending.popleft())) is not None:
+                yield entry
+    finally:
+        for _name, _key, job in pending:
+            if not isinstance(job, Future):
+                job.close()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_bulk_export(transcription_ids, fmt: str, options: dict, workers: int | None = None):
+    """
+    Streamed ZIP with one export per transcription.
+    """
+    return iter_zip(iter_export_entries(transcription_ids, fmt, options, workers))
@@ -0,0 +1,59 @@
+from django.apps import apps
+
+from .transcriber import MODEL_NAME, LANGUAGE, get_beam_size, word_timestamps_enabled
+
+
+class ChunkCheckpoints:
+    """
+    Per-job checkpoints of raw Whisper output, one TranscriptionChunk row per
+    finished chunk. Offers the same get/put interface as ChunkResultCache and
+    sits in front of it, so a re-run job skips every chunk it already has and
+    only transcribes the missing ones.
+    """
+    def __init__(self, transcription, fast_mode: bool, cache=None):
+        self.TranscriptionChunk = apps.get_model("transcription", "TranscriptionChunk")
+        self.transcription = transcription
+        self.params = f"{MODEL_NAME}:{LANGUAGE}:beam{get_beam_size(fast_mode)}"
+        if word_timestamps_enabled():
+            self.params += ":words"
+        self.cache = cache
+        self._done = {
+            (row.start_sample, row.end_sample): row.raw_segments
+            for row in self.TranscriptionChunk.objects.filter(
+                transcription=transcription,
+                params=self.params,
+            )
+        }
+
+    def __len__(self):
+        return len(self._done)
+
+    def get(self, chunk) -> list | None:
+        raw_segments = self._done.get((chunk.start_sample, chunk.end_sample))
+        if raw_segments is None and self.cache is not None:
+            raw_segments = self.cache.get(chunk)
+            if raw_segments is not None:
+                self._save(chunk, raw_segments)
+        return raw_segments
+
+    def put(self, chunk, raw_segments: list):
+        self._save(chunk, raw_segments)
+        if self.cache is not None:
+            self.cache.put(chunk, raw_segments)
+
+    def _save(self, chunk, raw_segments: list):
+        self.TranscriptionChunk.objects.update_or_create(
+            transcription=self.transcription,
+            start_sample=chunk.start_sample,
+            end_sample=chunk.end_sample,
+            params=self.params,
+            defaults={"raw_segments": raw_segments},
+        )
+        self._done[(chunk.start_sample, chunk.end_sample)] = raw_segments
+
+    def clear(self):
+        """
+        Drop the checkpoints once the job is done; the merged result is saved on the transcription.
+        """
+        self.TranscriptionChunk.objects.filter(transcription=self.transcription).delete()
+        self._done = {}
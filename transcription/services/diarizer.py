@@ -1,5 +1,36 @@
-from pyannote.audio import Pipeline
+"""
+Speaker diarization of long recordings.
+
+The normalized wav is memory-mapped once and cut into the same silence-aligned
+chunks as transcription. Chunks are diarized in parallel on a process pool,
+each worker with its own pyannote pipeline. pyannote's labels (SPEAKER_00, ...)
+are only meaningful within a chunk, so every chunk-local speaker's embedding is
+clustered globally and the resulting clusters become the recording's speakers.
+"""
 import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+from . import model_client
+from .audio_chunker import (
+    SAMPLE_RATE,
+    build_manifest,
+    normalize_audio,
+    plan_chunk_boundaries,
+    read_pcm,
+)
+from .transcribe_pool import auto_worker_count
+
+# Cosine distance under which two chunk-local speakers are the same person
+DIARIZE_CLUSTER_THRESHOLD = 0.7
+# Resident size of one pyannote pipeline with its segmentation and embedding models
+PIPELINE_RAM_BYTES = 1024 ** 3
+
+logger = logging.getLogger("transcription")
 
 # Lazy-loaded global pipeline
 _pipeline = None
@@ -7,6 +38,8 @@ _pipeline = None
 def get_pipeline():
     global _pipeline
     if _pipeline is None:
+        from pyannote.audio import Pipeline
+
         _pipeline = Pipeline.from_pretrained(
             "pyannote/speaker-diarization",
             use_auth_token=True  # add if required for huggingface
@@ -14,63 +47,195 @@ def get_pipeline():
     return _pipeline
 
 
-def diarize_audio(file_path, chunk_length=600, overlap=2):
+def diarization_enabled() -> bool:
+    """
+    Whether process_transcription labels speakers with pyannote (TRANSCRIBE_DIARIZE).
+    """
+    enabled = getattr(settings, "TRANSCRIBE_DIARIZE", None) or os.environ.get("TRANSCRIBE_DIARIZE", "")
+    return str(enabled).lower() in ("1", "true", "yes", "on")
+
+
+def get_diarize_workers() -> int:
+    workers = getattr(settings, "DIARIZE_WORKERS", None) or os.environ.get("DIARIZE_WORKERS", "auto")
+    try:
+        return max(1, int(workers))
+    except (TypeError, ValueError):
+        return auto_worker_count(model_ram_bytes=PIPELINE_RAM_BYTES)
+
+
+def diarize_chunk(pipeline, chunk) -> dict:
+    """
+    Diarize one in-memory chunk. Returns its index, the turns it owns as
+    (start, end, local_label) in recording time, and one embedding per local speaker.
+    """
+    import torch
+
+    waveform = torch.from_numpy(np.ascontiguousarray(chunk.load()))[None]
+    diarization, embeddings = pipeline(
+        {"waveform": waveform, "sample_rate": SAMPLE_RATE},
+        return_embeddings=True,
+    )
+
+    tracks = []
+    for turn, _track, label in diarization.itertracks(yield_label=True):
+        start, end = turn.start + chunk.start, turn.end + chunk.start
+        if chunk.owns(start, end):
+            tracks.append((start, end, label))
+
+    # Speakers with too little speech get no usable (finite) embedding
+    speaker_embeddings = {
+        label: np.asarray(embeddings[i])
+        for i, label in enumerate(diarization.labels())
+        if i < len(embeddings) and np.all(np.isfinite(embeddings[i]))
+    }
+    return {"index": chunk.index, "tracks": tracks, "embeddings": speaker_embeddings}
+
+
+def _init_worker(torch_threads: int):
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    get_pipeline()
+
+
+def diarize_chunk_in_worker(chunk) -> dict:
+    """
+    Runs inside a pool process.
+    """
+    return diarize_chunk(get_pipeline(), chunk)
+
+
+def cluster_speakers(chunk_results: list, threshold: float = DIARIZE_CLUSTER_THRESHOLD) -> dict:
+    """
+    Average-linkage agglomerative clustering of chunk-local speaker embeddings
+    by cosine distance. Two speakers of the same chunk are never merged: the
+    pipeline already told them apart.
+    Returns {(chunk_index, local_label): cluster_id}.
+    """
+    keys = []
+    vectors = []
+    for result in chunk_results:
+        for label, embedding in result["embeddings"].items():
+            keys.append((result["index"], label))
+            vectors.append(embedding)
+    if not keys:
+        return {}
+
+    x = np.asarray(vectors, dtype=np.float64)
+    x /= np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+    distance = 1.0 - x @ x.T
+
+    n = len(keys)
+    chunk_of = np.array([chunk_index for chunk_index, _label in keys])
+    # Clusters that must stay apart because they share a chunk
+    conflict = chunk_of[:, None] == chunk_of[None, :]
+    sizes = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    members = [[i] for i in range(n)]
+
+    while True:
+        candidates = np.where(conflict | ~active[:, None] | ~active[None, :], np.inf, distance)
+        a, b = np.unravel_index(np.argmin(candidates), candidates.shape)
+        if candidates[a, b] >= threshold:
+            break
+
+        # Lance-Williams update for average linkage, b merged into a
+        distance[a, :] = (sizes[a] * distance[a, :] + sizes[b] * distance[b, :]) / (sizes[a] + sizes[b])
+        distance[:, a] = distance[a, :]
+        conflict[a, :] |= conflict[b, :]
+        conflict[:, a] = conflict[a, :]
+        sizes[a] += sizes[b]
+        active[b] = False
+        members[a].extend(members[b])
+
+    return {
+        keys[member]: cluster_id
+        for cluster_id, root in enumerate(np.flatnonzero(active))
+        for member in members[root]
+    }
+
+
+def stitch_speakers(chunk_results: list, threshold: float = DIARIZE_CLUSTER_THRESHOLD) -> list:
+    """
+    Merge per-chunk turns into one timeline with recording-wide speaker labels,
+    numbered in order of first appearance.
+    """
+    clusters = cluster_speakers(chunk_results, threshold)
+
+    turns = []
+    for result in chunk_results:
+        for start, end, label in result["tracks"]:
+            # A speaker without an embedding stays on its own
+            cluster = clusters.get((result["index"], label), ("unclustered", result["index"], label))
+            turns.append((start, end, cluster))
+    turns.sort(key=lambda turn: turn[0])
+
+    names = {}
+    segments = []
+    for start, end, cluster in turns:
+        speaker = names.setdefault(cluster, f"SPEAKER_{len(names):02d}")
+        if segments and segments[-1]["speaker"] == speaker and start <= segments[-1]["end"]:
+            segments[-1]["end"] = max(segments[-1]["end"], end)
+        else:
+            segments.append({"start": start, "end": end, "speaker": speaker})
+    return segments
+
+
+def diarize_audio(file_path, chunk_length=600, overlap=2, normalized_path=None):
+    """
+    Diarize audio on the model server when one is configured, falling back
+    to the in-process pipeline. See diarize_audio_local for arguments.
     """
-    Diarize audio in chunks and merge segments with adjusted timestamps.
+    if model_client.use_model_server():
+        try:
+            return model_client.request(
+                "diarize",
+                file_path=file_path,
+                chunk_length=chunk_length,
+                overlap=overlap,
+                normalized_path=normalized_path,
+            )
+        except model_client.ModelServerUnavailable as e:
+            logger.warning(f"{e}; diarizing in-process")
+
+    return diarize_audio_local(file_path, chunk_length, overlap, normalized_path=normalized_path)
+
+
+def diarize_audio_local(file_path, chunk_length=600, overlap=2, workers=None, normalized_path=None):
+    """
+    Diarize audio in chunks and label speakers consistently across chunks.
     Args:
         file_path: full audio file path
         chunk_length: chunk size in seconds
         overlap: overlap in seconds between chunks
+        workers: pool size (default DIARIZE_WORKERS); 1 diarizes in this process
+        normalized_path: an existing 16 kHz mono wav of file_path, to skip ffmpeg
     Returns:
         List of dicts: [{"start": float, "end": float, "speaker": str}, ...]
     """
-    duration = float(os.popen(
-        f"ffprobe -v error -show_entries format=duration "
-        f"-of default=noprint_wrappers=1:nokey=1 \"{file_path}\""
-    ).read().strip())
-
-    if duration <= chunk_length:
-        # Short audio: process directly
-        pipeline = get_pipeline()
-        diarization = pipeline(file_path)
-        return [
-            {"start": s.start, "end": s.end, "speaker": s.label}
-            for s in diarization.itertracks(yield_label=True)
-        ]
-
-    # Long audio: process in chunks
-    segments = []
-    pipeline = get_pipeline()
-    total_chunks = int((duration + chunk_length - 1) // chunk_length)
+    normalized_path = normalized_path or normalize_audio(file_path)
+    boundaries = plan_chunk_boundaries(read_pcm(normalized_path), chunk_length, overlap)
+    chunks = build_manifest(boundaries, normalized_path, in_memory=True)
 
-    for i in range(total_chunks):
-        start = max(0, i * chunk_length - overlap)
-        end = min(duration, (i + 1) * chunk_length + overlap)
+    workers = min(len(chunks), workers or get_diarize_workers())
+    if workers > 1 and multiprocessing.current_process().daemon:
+        # Daemonic processes (e.g. Celery prefork children) cannot have children
+        logger.warning("Parallel diarization is unavailable in a daemonic worker; diarizing chunks in turn")
+        workers = 1
 
-        chunk_file = f"{file_path}_diarize_chunk_{i}.wav"
-        os.system(
-            f'ffmpeg -y -i "{file_path}" -ss {start} -to {end} "{chunk_file}" -loglevel quiet'
-        )
-
-        diarization = pipeline(chunk_file)
-        for s in diarization.itertracks(yield_label=True):
-            seg_start = s.start + start
-            seg_end = s.end + start
-            segments.append({"start": seg_start, "end": seg_end, "speaker": s.label})
-
-        # Clean up chunk file
-        os.remove(chunk_file)
-
-    # Optional: merge consecutive segments with same speaker
-    merged = []
-    for seg in segments:
-        if not merged:
-            merged.append(seg)
-            continue
-        last = merged[-1]
-        if last["speaker"] == seg["speaker"] and seg["start"] <= last["end"]:
-            last["end"] = max(last["end"], seg["end"])
-        else:
-            merged.append(seg)
+    if workers == 1:
+        pipeline = get_pipeline()
+        results = [diarize_chunk(pipeline, chunk) for chunk in chunks]
+    else:
+        logger.info(f"Diarizing {len(chunks)} chunks on {workers} processes")
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork: torch and the calling process may already be running threads
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(torch_threads,),
+        ) as pool:
+            results = list(pool.map(diarize_chunk_in_worker, chunks))
 
-    return merged
\ No newline at end of file
+    return stitch_speakers(results)
@@ -0,0 +1,160 @@
+"""
+Size-bounded on-disk cache.
+
+Entries are files named by their key under a two-level fan-out. Reads touch
+the file's mtime, so evicting oldest-mtime-first is least-recently-used.
+
+Each process keeps a running byte total per cache directory, counted once
+and updated on every put and delete, so writes only walk the directory when
+the total goes over max_bytes. Other processes write to the same directory
+unseen, so the total is also recounted every RESCAN_EVERY_PUTS puts.
+"""
+import os
+import json
+import logging
+import tempfile
+import threading
+
+RESCAN_EVERY_PUTS = 100
+
+logger = logging.getLogger("transcription")
+
+# {directory: [bytes, puts since the last count]}, shared by all DiskCache instances
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get_path(self, key: str) -> str | None:
+        """
+        Path of a cached entry (marked as recently used), or None on a miss.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_bytes(self, key: str) -> bytes | None:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by another process between touch and read
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with _usage_lock:
+            # Counted before the entry lands so it is not counted twice
+            self._usage()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            replaced = _file_size(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with _usage_lock:
+            usage = self._usage()
+            usage[0] += len(data) - replaced
+            usage[1] += 1
+            full = usage[0] > self.max_bytes or usage[1] >= RESCAN_EVERY_PUTS
+        if full:
+            self.evict()
+        return path
+
+    def get_json(self, key: str):
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            logger.warning(f"Dropping corrupt cache entry {key}")
+            self.delete(key)
+            return None
+
+    def put_json(self, key: str, value) -> str:
+        return self.put_bytes(key, json.dumps(value).encode("utf-8"))
+
+    def delete(self, key: str):
+        path = self.path_for(key)
+        size = _file_size(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with _usage_lock:
+            if self.directory in _usage:
+                _usage[self.directory][0] -= size
+
+    def _usage(self) -> list:
+        """
+        [bytes, puts] of this directory, counted on first use. Call with _usage_lock held.
+        """
+        if self.directory not in _usage:
+            _usage[self.directory] = [sum(size for _mtime, size, _path in self._scan()), 0]
+        return _usage[self.directory]
+
+    def _scan(self) -> list[tuple]:
+        """
+        (mtime, size, path) of every entry.
+        """
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Recount the cache and delete least recently used entries until it fits max_bytes.
+        """
+        entries = self._scan()
+        total = sum(size for _mtime, size, _path in entries)
+
+        if total > self.max_bytes:
+            for _mtime, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+        with _usage_lock:
+            _usage[self.directory] = [total, 0]
@@ -0,0 +1,166 @@
+"""
+On-disk cache of rendered exports.
+
+PDF and DOCX take long to render for multi-hour interviews but rarely change
+once reviewed. Artifacts are keyed by transcription, content version, format
+and options; any segment write bumps the content version, so edited
+transcripts miss the cache and old artifacts age out under
+EXPORT_CACHE_MAX_BYTES. The same key is the export's ETag.
+
+When a transcription finishes, the EXPORT_PRERENDER_FORMATS are rendered by
+a Celery task, so downloads are served from disk instead of rendering in the
+web request. While the task runs, a small marker file next to each pending
+artifact carries the render's progress.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+
+from django.apps import apps
+from django.conf import settings
+
+from ..exports.manager import ExportManager
+from .disk_cache import DiskCache
+
+# Bump when exporter output changes
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+# Background renders use the export menu's defaults
+PRERENDER_OPTIONS = {"include_timestamps": False, "include_speakers": False}
+# Segments between progress updates of a background render
+PROGRESS_EVERY = 200
+RENDER_STALE_SECONDS = 300
+
+logger = logging.getLogger("transcription")
+
+
+def get_export_cache() -> DiskCache | None:
+    """
+    The rendered export cache, or None when EXPORT_CACHE_MAX_BYTES is 0.
+    """
+    max_bytes = getattr(settings, "EXPORT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    if not max_bytes:
+        return None
+    directory = getattr(settings, "EXPORT_CACHE_DIR", None) or os.path.join(
+        settings.MEDIA_ROOT, "cache", "exports"
+    )
+    return DiskCache(directory, int(max_bytes))
+
+
+def export_key(transcription_id: int, content_version: int, fmt: str, options: dict) -> str:
+    params = [CACHE_VERSION, transcription_id, content_version, fmt, sorted(options.items())]
+    return hashlib.sha256(json.dumps(params).encode("utf-8")).hexdigest()
+
+
+def get_prerender_formats() -> list[str]:
+    """
+    Formats rendered in the background when a transcription finishes
+    (EXPORT_PRERENDER_FORMATS, a list or comma-separated string).
+    """
+    formats = getattr(settings, "EXPORT_PRERENDER_FORMATS", None)
+    if formats is None:
+        formats = os.environ.get("EXPORT_PRERENDER_FORMATS", "pdf,docx")
+    if isinstance(formats, str):
+        formats = formats.split(",")
+    return [fmt.strip().lower() for fmt in formats if fmt.strip()]
+
+
+def _marker_key(key: str) -> str:
+    return f"{key}.rendering"
+
+
+def _write_progress(cache: DiskCache, key: str, fmt: str, done: int, total: int):
+    cache.put_json(_marker_key(key), {"format": fmt, "done": done, "total": total})
+
+
+def get_render_progress(cache: DiskCache, key: str) -> dict | None:
+    """
+    {"format", "done", "total"} while a background render of key is in
+    flight, or None. A marker not updated for RENDER_STALE_SECONDS belongs
+    to a render that died and is ignored.
+    """
+    path = cache.path_for(_marker_key(key))
+    try:
+        if time.time() - os.path.getmtime(path) > RENDER_STALE_SECONDS:
+            return None
+        # Read directly: DiskCache reads touch the mtime this staleness check relies on
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _prerender_jobs(transcription, formats) -> list[tuple]:
+    """
+    (format, exporter, key) for every configured format worth caching.
+    """
+    jobs = []
+    for fmt in formats:
+        try:
+            exporter = ExportManager.get_exporter(fmt)
+        except ValueError:
+            logger.warning(f"Ignoring unknown export format {fmt!r} in EXPORT_PRERENDER_FORMATS")
+            continue
+        # Text formats stream from the database and are never cached
+        if not exporter.streaming:
+            jobs.append((fmt, exporter, export_key(transcription.id, transcription.content_version, fmt, PRERENDER_OPTIONS)))
+    return jobs
+
+
+def schedule_prerender(transcription):
+    """
+    Queue prerender_exports_task for the default exports of a finished
+    transcription. Nothing is marked as rendering until the task starts:
+    downloads before that render in the request, and the task skips them.
+    """
+    if get_export_cache() is None or not get_prerender_formats():
+        return
+
+    from ..tasks import prerender_exports_task
+
+    try:
+        prerender_exports_task.delay(transcription.id, transcription.content_version)
+    except Exception:
+        logger.exception(f"Could not queue export pre-rendering for transcription {transcription.id}")
+
+
+def prerender_exports(transcription_id: int, content_version: int) -> list[str]:
+    """
+    Render the default exports of one content version into the cache,
+    reading the segments from the database once for all formats.
+    Returns the formats rendered.
+    """
+    Transcription = apps.get_model("transcription", "Transcription")
+    cache = get_export_cache()
+    transcription = Transcription.objects.filter(id=transcription_id).first()
+    if cache is None or transcription is None:
+        return []
+
+    if transcription.content_version != content_version:
+        # Edited since it was queued; downloads render the new version on demand
+        return []
+
+    jobs = [job for job in _prerender_jobs(transcription, get_prerender_formats()) if cache.get_path(job[2]) is None]
+    # Downloads wait for these renders from here on
+    for fmt, _exporter, key in jobs:
+        _write_progress(cache, key, fmt, 0, transcription.segment_count)
+
+    try:
+        segments = transcription.get_segments()
+        rendered = []
+        for fmt, exporter, key in jobs:
+            def tracked(fmt=fmt, key=key):
+                for done, segment in enumerate(segments):
+                    if done % PROGRESS_EVERY == 0:
+                        _write_progress(cache, key, fmt, done, len(segments))
+                    yield segment
+
+            cache.put_bytes(key, exporter.export(tracked(), PRERENDER_OPTIONS))
+            cache.delete(_marker_key(key))
+            rendered.append(fmt)
+        return rendered
+    finally:
+        for _fmt, _exporter, key in jobs:
+            cache.delete(_marker_key(key))
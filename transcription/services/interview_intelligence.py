@@ -1,5 +1,14 @@
 import re
-from .regex_normalizer import normalize_text
+import heapq
+from .regex_normalizer import normalize_text_batch
+
+SPEAKER_COLORS = [
+    "bg-red-100 text-red-800",
+    "bg-green-100 text-green-800",
+    "bg-blue-100 text-blue-800",
+    "bg-yellow-100 text-yellow-800",
+    "bg-purple-100 text-purple-800",
+]
 
 def detect_speaker(text: str) -> str:
     """
@@ -9,19 +18,71 @@ def detect_speaker(text: str) -> str:
     match = re.match(r"^\s*(P\d+)\b(\s*[:\-])?", text, flags=re.IGNORECASE)
     return match.group(1).upper() if match else "UNKNOWN"
 
+def speaker_color(speaker: str) -> str:
+    """
+    Color classes for a speaker label, by its number (P2, SPEAKER_01, ...).
+    """
+    return SPEAKER_COLORS[int(re.sub(r"\D", "", speaker) or 0) % len(SPEAKER_COLORS)]
+
+def assign_speakers(segments: list, turns: list) -> list:
+    """
+    The speaker of each segment by maximal time overlap with diarization turns
+    ({"start", "end", "speaker"}), or None where no turn overlaps it.
+    Segments and turns are swept once in start order; only turns still open at
+    a segment's start are compared with it, instead of every turn.
+    """
+    turns = sorted(turns, key=lambda turn: turn["start"])
+    order = sorted(range(len(segments)), key=lambda i: segments[i]["start"])
+    speakers = [None] * len(segments)
+
+    open_turns = []  # heap of (end, position in turns)
+    next_turn = 0
+    for i in order:
+        start, end = segments[i]["start"], segments[i]["end"]
+        while next_turn < len(turns) and turns[next_turn]["start"] < end:
+            heapq.heappush(open_turns, (turns[next_turn]["end"], next_turn))
+            next_turn += 1
+        # Later segments start no earlier, so turns ending here are done for good
+        while open_turns and open_turns[0][0] <= start:
+            heapq.heappop(open_turns)
+
+        overlap = {}
+        for turn_end, position in open_turns:
+            turn = turns[position]
+            shared = min(end, turn_end) - max(start, turn["start"])
+            if shared > 0:
+                overlap[turn["speaker"]] = overlap.get(turn["speaker"], 0.0) + shared
+        if overlap:
+            speakers[i] = max(overlap, key=overlap.get)
+    return speakers
+
 def is_question(text: str) -> bool:
     t = text.lower()
     return "?" in t or any(q in t for q in ("what", "why", "how", "when", "where", "who"))
 
-def build_segments(raw_segments: list, normalizer_func=normalize_text, offset: float = 0.0) -> list:
+def build_segments(
+    raw_segments: list,
+    normalizer_func=None,
+    offset: float = 0.0,
+    batch_normalizer_func=normalize_text_batch,
+) -> list:
     """
     Convert raw Whisper segments into structured interview segments with type and speaker color.
+    English is normalized for all segments in one batch; a per-text
+    normalizer_func, if given, is called once per distinct text.
     """
     structured = []
     consecutive_unknown_questions = 0
 
+    texts = [s.get("text") or s.get("original") or "" for s in raw_segments]
+    if normalizer_func is not None:
+        unique = {text: normalizer_func(text) for text in dict.fromkeys(texts)}
+        english = [unique[text] for text in texts]
+    else:
+        english = batch_normalizer_func(texts)
+
     for i, s in enumerate(raw_segments):
-        text = s.get("text") or s.get("original") or ""
+        text = texts[i]
         speaker = detect_speaker(text)
         segment_type = "Question" if is_question(text) else "Answer"
 
@@ -32,26 +93,16 @@ def build_segments(raw_segments: list, normalizer_func=normalize_text, offset: f
         else:
             consecutive_unknown_questions = 0
 
-        # Assign a color for each speaker
-        color_classes = [
-            "bg-red-100 text-red-800",
-            "bg-green-100 text-green-800",
-            "bg-blue-100 text-blue-800",
-            "bg-yellow-100 text-yellow-800",
-            "bg-purple-100 text-purple-800",
-        ]
-        speaker_index = int(re.sub(r"\D", "", speaker) or 0) % len(color_classes)
-        speaker_color = color_classes[speaker_index]
-
         structured.append(
             {
                 "start": s.get("start", 0) + offset,
                 "end": s.get("end", 0) + offset,
                 "speaker": speaker,
-                "speaker_color": speaker_color,
+                # Assign a color for each speaker
+                "speaker_color": speaker_color(speaker),
                 "type": segment_type,
                 "original": text,
-                "english": normalizer_func(text),
+                "english": english[i],
             }
         )
 
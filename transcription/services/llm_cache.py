@@ -0,0 +1,112 @@
+"""
+Persistent cache of LLM normalization results.
+
+Keyed by a hash of the model, system prompt, few-shot examples and input
+text, so translating an interview again, or another interview with the same
+phrases, only sends genuinely new text to LLM_API_URL. Entries expire after
+LLM_CACHE_TTL_SECONDS, and the least recently used ones are evicted past
+LLM_CACHE_MAX_ENTRIES.
+"""
+import json
+import hashlib
+from datetime import timedelta
+from threading import Lock
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+# Bump when prompts change in a way the hashed fields do not capture
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+# Keys per query, below SQLite's bound-parameter limit
+QUERY_BATCH_SIZE = 500
+
+
+class LLMCache:
+    def __init__(self, model: str, system_prompt: str, examples, max_entries: int, ttl_seconds: int):
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._prefix = json.dumps([CACHE_VERSION, model, system_prompt, examples])
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._prefix}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts) -> dict:
+        """
+        Cached outputs for the texts that have an unexpired entry.
+        """
+        LLMCacheEntry = apps.get_model("transcription", "LLMCacheEntry")
+        keys = {self.key(text): text for text in texts}
+        key_list = list(keys)
+        now = timezone.now()
+
+        found = {}
+        for i in range(0, len(key_list), QUERY_BATCH_SIZE):
+            batch = key_list[i:i + QUERY_BATCH_SIZE]
+            entries = LLMCacheEntry.objects.filter(key__in=batch)
+            if self.ttl_seconds:
+                entries = entries.filter(created_at__gte=now - timedelta(seconds=self.ttl_seconds))
+            hit_keys = dict(entries.values_list("key", "output"))
+            if hit_keys:
+                LLMCacheEntry.objects.filter(key__in=list(hit_keys)).update(hits=F("hits") + 1, last_used_at=now)
+            found.update(hit_keys)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {keys[key]: output for key, output in found.items()}
+
+    def get(self, text: str) -> str | None:
+        return self.get_many([text]).get(text)
+
+    def put_many(self, outputs: dict):
+        LLMCacheEntry = apps.get_model("transcription", "LLMCacheEntry")
+        now = timezone.now()
+        LLMCacheEntry.objects.bulk_create(
+            [
+                LLMCacheEntry(key=self.key(text), model=self.model, output=output, created_at=now, last_used_at=now)
+                for text, output in outputs.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["key"],
+            update_fields=["model", "output", "created_at", "last_used_at"],
+            batch_size=QUERY_BATCH_SIZE,
+        )
+        self.evict()
+
+    def put(self, text: str, output: str):
+        self.put_many({text: output})
+
+    def evict(self):
+        """
+        Drop expired entries, then the least recently used ones past max_entries.
+        """
+        LLMCacheEntry = apps.get_model("transcription", "LLMCacheEntry")
+        if self.ttl_seconds:
+            LLMCacheEntry.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=self.ttl_seconds)).delete()
+
+        excess = LLMCacheEntry.objects.count() - self.max_entries
+        if excess > 0:
+            stale = LLMCacheEntry.objects.order_by("last_used_at").values_list("key", flat=True)[:excess]
+            LLMCacheEntry.objects.filter(key__in=list(stale)).delete()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def get_llm_cache(model: str, system_prompt: str, examples) -> LLMCache | None:
+    """
+    The cache for one model and prompt, or None when LLM_CACHE_MAX_ENTRIES is 0.
+    """
+    max_entries = getattr(settings, "LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    if not max_entries:
+        return None
+    ttl_seconds = getattr(settings, "LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    return LLMCache(model, system_prompt, examples, int(max_entries), int(ttl_seconds or 0))
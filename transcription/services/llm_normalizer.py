@@ -1,7 +1,27 @@
 import os
+import re
 import json
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from .llm_cache import get_llm_cache
+
+# Segments packed into one prompt, and prompts in flight at once
+LLM_BATCH_SIZE = 20
+LLM_MAX_CONCURRENCY = 4
+# Attempts per request on timeouts, 429 and 5xx, with exponential backoff
+LLM_MAX_ATTEMPTS = 4
+LLM_BACKOFF_SECONDS = 1.0
+LLM_TIMEOUT_SECONDS = 60
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
+logger = logging.getLogger("transcription")
 
 _SYSTEM_PROMPT = (
     "You are a normalization assistant. Your task is to convert Liberian Kolokwa / "
@@ -16,50 +36,134 @@ _EXAMPLES = [
     ("He say he na coming today", "He said he is not coming today"),
 ]
 
+# Built once; only the inputs change between requests
+_FEW_SHOT = "Examples:\n" + "\n".join([f"Input: {src}\nOutput: {dst}" for src, dst in _EXAMPLES])
+
+_BATCH_INSTRUCTIONS = (
+    "Normalize each numbered input separately. Reply with only a JSON object that maps "
+    'each input number to its normalized text, e.g. {"1": "...", "2": "..."}.'
+)
+
+_INDEXED_LINE_RE = re.compile(r"^\s*(\d+)\s*[.:)]\s*(.*)$")
+
+_session = None
+_session_lock = Lock()
+
+
+class LLMError(RuntimeError):
+    """
+    The LLM endpoint failed or returned something unusable.
+    """
+
 
 def _build_prompt(text: str) -> str:
-    examples = "\n".join([f"Input: {src}\nOutput: {dst}" for src, dst in _EXAMPLES])
     return (
         f"{_SYSTEM_PROMPT}\n\n"
-        "Examples:\n"
-        f"{examples}\n\n"
+        f"{_FEW_SHOT}\n\n"
         "Now normalize the following text:\n"
         f"Input: {text}\n"
         "Output:"
     )
 
 
-def llm_normalize_to_standard_english(text: str) -> str:
+def _build_batch_prompt(texts: list) -> str:
+    inputs = "\n".join(f"{i}. {text}" for i, text in enumerate(texts, start=1))
+    return (
+        f"{_SYSTEM_PROMPT}\n\n"
+        f"{_FEW_SHOT}\n\n"
+        f"{_BATCH_INSTRUCTIONS}\n\n"
+        f"Inputs:\n{inputs}"
+    )
+
+
+def get_llm_config() -> dict:
+    return {
+        "api_url": os.environ.get("LLM_API_URL", "").strip(),
+        "api_key": os.environ.get("LLM_API_KEY", "").strip(),
+        "model": os.environ.get("LLM_MODEL", "gpt-4o-mini").strip(),
+    }
+
+
+def llm_is_configured() -> bool:
+    config = get_llm_config()
+    return bool(config["api_url"] and config["api_key"])
+
+
+def get_session() -> requests.Session:
     """
-    Normalize Liberian Kolokwa / Liberian English to standard English using an LLM.
-    This function is only meant to be called by the translate view on user action.
+    One pooled session per process, sized for LLM_MAX_CONCURRENCY parallel requests.
     """
-    api_url = os.environ.get("LLM_API_URL", "").strip()
-    api_key = os.environ.get("LLM_API_KEY", "").strip()
-    model = os.environ.get("LLM_MODEL", "gpt-4o-mini").strip()
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_MAX_CONCURRENCY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
 
-    if not api_url or not api_key:
+
+def _backoff_delay(attempt: int, response=None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    # Full jitter, so concurrent batches do not retry in lockstep
+    return random.uniform(0, LLM_BACKOFF_SECONDS * (2 ** attempt))
+
+
+def _chat(prompt: str) -> str:
+    """
+    Send one prompt and return the reply text, retrying transient failures.
+    """
+    config = get_llm_config()
+    if not config["api_url"] or not config["api_key"]:
         raise RuntimeError("LLM_API_URL and LLM_API_KEY must be set to use LLM normalization.")
 
-    prompt = _build_prompt(text)
     payload = {
-        "model": model,
+        "model": config["model"],
         "messages": [
             {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         "temperature": 0.0,
     }
-
     headers = {
-        "Authorization": f"Bearer {api_key}",
+        "Authorization": f"Bearer {config['api_key']}",
         "Content-Type": "application/json",
     }
 
-    resp = requests.post(api_url, headers=headers, data=json.dumps(payload), timeout=60)
-    resp.raise_for_status()
-    data = resp.json()
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        response = None
+        try:
+            response = get_session().post(
+                config["api_url"],
+                headers=headers,
+                data=json.dumps(payload),
+                timeout=LLM_TIMEOUT_SECONDS,
+            )
+            if response.status_code not in RETRY_STATUS_CODES:
+                try:
+                    response.raise_for_status()
+                    data = response.json()
+                except requests.HTTPError as e:
+                    raise LLMError(f"LLM returned HTTP {response.status_code}") from e
+                except ValueError as e:
+                    raise LLMError("LLM returned a response that is not JSON") from e
+                return _extract_content(data)
+            error = LLMError(f"LLM returned HTTP {response.status_code}")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt + 1 < LLM_MAX_ATTEMPTS:
+            delay = _backoff_delay(attempt, response)
+            logger.warning(f"LLM request failed ({error}); retrying in {delay:.1f} s")
+            time.sleep(delay)
+
+    raise LLMError(f"LLM request failed after {LLM_MAX_ATTEMPTS} attempts: {error}")
 
+
+def _extract_content(data) -> str:
     # Support common response shapes
     if isinstance(data, dict):
         if "choices" in data and data["choices"]:
@@ -67,4 +171,117 @@ def llm_normalize_to_standard_english(text: str) -> str:
         if "output_text" in data:
             return str(data["output_text"]).strip()
 
-    raise RuntimeError("Unexpected LLM response format.")
+    raise LLMError("Unexpected LLM response format.")
+
+
+def parse_indexed_outputs(content: str, count: int) -> dict:
+    """
+    Map input numbers (1-based) to outputs from a batch reply: a JSON object
+    as requested, or "1. ..." lines as a fallback. Unusable entries are left out.
+    """
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+
+    outputs = {}
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = ((i, value) for i, value in enumerate(data, start=1))
+    else:
+        items = (match.groups() for match in map(_INDEXED_LINE_RE.match, content.splitlines()) if match)
+
+    for key, value in items:
+        try:
+            index = int(key)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= index <= count and isinstance(value, str) and value.strip():
+            outputs[index] = value.strip()
+    return outputs
+
+
+def get_cache():
+    return get_llm_cache(get_llm_config()["model"], _SYSTEM_PROMPT, _EXAMPLES)
+
+
+def llm_normalize_to_standard_english(text: str) -> str:
+    """
+    Normalize Liberian Kolokwa / Liberian English to standard English using an LLM.
+    This function is only meant to be called by the translate view on user action.
+    """
+    cache = get_cache()
+    cached = cache.get(text) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    output = _chat(_build_prompt(text))
+    if cache is not None:
+        cache.put(text, output)
+    return output
+
+
+def _normalize_chunk(texts: list) -> list:
+    """
+    Normalize one batch in a single prompt; segments missing from the reply
+    are retried on their own.
+    """
+    try:
+        outputs = parse_indexed_outputs(_chat(_build_batch_prompt(texts)), len(texts))
+    except LLMError as e:
+        logger.warning(f"Batch of {len(texts)} segments failed ({e}); normalizing them one by one")
+        outputs = {}
+
+    # Runs in a worker thread: talks to the LLM only, the caller does the caching
+    return [
+        outputs.get(i) or _chat(_build_prompt(text))
+        for i, text in enumerate(texts, start=1)
+    ]
+
+
+def llm_normalize_batch(texts: list, progress_callback=None, batch_size: int = LLM_BATCH_SIZE) -> list:
+    """
+    Normalize many texts with the LLM, in order. Distinct texts are looked up
+    in the cache first; the rest are packed batch_size to a prompt and up to
+    LLM_MAX_CONCURRENCY prompts run at once.
+    progress_callback(done, total) is called as distinct texts complete.
+    """
+    unique = [text for text in dict.fromkeys(texts) if text.strip()]
+    results = {text: text for text in texts}
+
+    cache = get_cache()
+    cached = cache.get_many(unique) if cache is not None else {}
+    results.update(cached)
+    pending = [text for text in unique if text not in cached]
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    done = len(cached)
+    if progress_callback and done:
+        progress_callback(done, len(unique))
+
+    with ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY) as executor:
+        futures = {executor.submit(_normalize_chunk, batch): batch for batch in batches}
+        try:
+            for future in as_completed(futures):
+                batch = futures[future]
+                outputs = dict(zip(batch, future.result()))
+                results.update(outputs)
+                if cache is not None:
+                    cache.put_many(outputs)
+                done += len(batch)
+                if progress_callback:
+                    progress_callback(done, len(unique))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(f"LLM normalization cache: {stats['hits']} hits, {stats['misses']} misses")
+    return [results[text] for text in texts]
@@ -0,0 +1,80 @@
+"""
+Client for the local model server (see model_server.py).
+
+When MODEL_SERVER_ADDRESS is set, transcribe_chunk and diarize_audio send
+their work to one long-running process that keeps Whisper and pyannote
+loaded, instead of every Celery worker loading its own copy.
+"""
+import os
+import hashlib
+import logging
+from multiprocessing.connection import Client
+
+from django.conf import settings
+
+logger = logging.getLogger("transcription")
+
+
+class ModelServerUnavailable(RuntimeError):
+    """
+    The model server is not configured or not accepting connections.
+    """
+
+
+def parse_address(address: str):
+    """
+    A unix socket path, or a (host, port) tuple for "host:port".
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and host and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def get_server_address():
+    """
+    MODEL_SERVER_ADDRESS is either a unix socket path or "host:port".
+    Returns None when the model server is not configured.
+    """
+    address = getattr(settings, "MODEL_SERVER_ADDRESS", None) or os.environ.get("MODEL_SERVER_ADDRESS", "")
+    address = address.strip()
+    return parse_address(address) if address else None
+
+
+def get_authkey() -> bytes:
+    key = getattr(settings, "MODEL_SERVER_AUTHKEY", None) or os.environ.get("MODEL_SERVER_AUTHKEY", "")
+    if not key:
+        key = hashlib.sha256(f"model-server:{settings.SECRET_KEY}".encode()).hexdigest()
+    return key.encode()
+
+
+def use_model_server() -> bool:
+    return get_server_address() is not None
+
+
+def request(op: str, **payload):
+    """
+    Send one request to the model server and return its result.
+    Raises ModelServerUnavailable if the server cannot be reached, so callers
+    can fall back to running the model in-process.
+    """
+    address = get_server_address()
+    if address is None:
+        raise ModelServerUnavailable("MODEL_SERVER_ADDRESS is not set")
+
+    try:
+        conn = Client(address, authkey=get_authkey())
+    except (OSError, EOFError) as e:
+        raise ModelServerUnavailable(f"Model server at {address} is not running: {e}")
+
+    try:
+        with conn:
+            conn.send({"op": op, **payload})
+            reply = conn.recv()
+    except (OSError, EOFError) as e:
+        # Reset, broken pipe or closed connection: the server went away mid-request
+        raise ModelServerUnavailable(f"Model server at {address} dropped the connection: {e}")
+
+    if not reply.get("ok"):
+        raise RuntimeError(f"Model server error: {reply.get('error')}")
+    return reply["result"]
@@ -0,0 +1,110 @@
+"""
+Local model server.
+
+Loads Whisper once (and pyannote on first use) in a single long-running
+process and serves transcribe/diarize requests from every Celery worker over
+a unix socket or localhost port. Start it with `python manage.py
+run_model_server`; clients are in model_client.py.
+
+Requests from all workers share one WhisperModel with `slots` CTranslate2
+workers, so up to `slots` chunks are decoded concurrently against a single
+copy of the weights; further requests queue until a slot frees up.
+
+Requests are not batched together: WhisperModel.transcribe decodes one
+audio input per call, so combining chunks from different workers into one
+batch would mean re-implementing faster-whisper's decode loop. Concurrency
+comes from the slots instead.
+"""
+import os
+import logging
+import threading
+from multiprocessing.connection import Listener
+from multiprocessing import AuthenticationError
+
+from .model_client import get_authkey, get_server_address
+from .transcriber import load_model, transcribe_chunk
+
+DEFAULT_SLOTS = 2
+
+logger = logging.getLogger("transcription")
+
+
+class ModelServer:
+    def __init__(self, slots: int = DEFAULT_SLOTS):
+        cpu_threads = max(1, (os.cpu_count() or 1) // slots)
+        self.model = load_model(cpu_threads=cpu_threads, num_workers=slots)
+        self.slots = threading.BoundedSemaphore(slots)
+        # pyannote pipelines are not thread-safe
+        self.diarize_lock = threading.Lock()
+
+    def dispatch(self, request: dict):
+        op = request.get("op")
+        if op == "transcribe":
+            with self.slots:
+                return transcribe_chunk(
+                    request["audio"],
+                    request.get("fast_mode", True),
+                    model=self.model,
+                    word_timestamps=request.get("word_timestamps", False),
+                )
+        if op == "diarize":
+            from .diarizer import diarize_audio_local
+
+            with self.diarize_lock:
+                # One pipeline, shared by every client: chunks run in turn here
+                return diarize_audio_local(
+                    request["file_path"],
+                    request.get("chunk_length", 600),
+                    request.get("overlap", 2),
+                    workers=1,
+                    normalized_path=request.get("normalized_path"),
+                )
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"Unknown model server operation: {op}")
+
+    def handle(self, conn):
+        with conn:
+            try:
+                request = conn.recv()
+            except EOFError:
+                return
+
+            try:
+                reply = {"ok": True, "result": self.dispatch(request)}
+            except Exception as e:
+                logger.exception(f"Model server request failed: {request.get('op')}")
+                reply = {"ok": False, "error": str(e)}
+
+            try:
+                conn.send(reply)
+            except (BrokenPipeError, ConnectionResetError):
+                logger.warning("Model server client disconnected before the reply was sent")
+
+
+def serve(address=None, slots: int = DEFAULT_SLOTS):
+    """
+    Run the model server until interrupted.
+    """
+    address = address or get_server_address()
+    if address is None:
+        raise RuntimeError("Set MODEL_SERVER_ADDRESS to a socket path or host:port")
+
+    # A socket file left behind by a previous run would make bind fail
+    if isinstance(address, str) and os.path.exists(address):
+        os.remove(address)
+
+    server = ModelServer(slots)
+    listener = Listener(address, authkey=get_authkey())
+    logger.info(f"Model server listening on {address} with {slots} decode slots")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError) as e:
+                logger.warning(f"Model server rejected a connection: {e}")
+                continue
+            threading.Thread(target=server.handle, args=(conn,), daemon=True).start()
+    finally:
+        listener.close()
@@ -1,89 +1,300 @@
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import queue
+import threading
 from django.apps import apps
-from .audio_chunker import chunk_audio
+from .audio_chunker import normalized_path_for, prepare_chunks
 from .transcriber import transcribe_chunk
+from . import transcribe_pool
 from .cancel import get_cancel_event
-from .interview_intelligence import build_segments
-from .regex_normalizer import normalize_text
+from .interview_intelligence import assign_speakers, build_segments, speaker_color
+from .diarizer import diarization_enabled, diarize_audio
+from .result_cache import get_chunk_cache
+from .checkpoints import ChunkCheckpoints
+from .word_index import WordIndex
+from . import progress_channel
+from . import search_index
+from .export_cache import schedule_prerender
+from . import status_counts
+from django.core.files.base import ContentFile
 import logging
 
 CHUNK_SECONDS = 600
 MAX_TRANSCRIBE_WORKERS = 2
+# How many cut chunks may wait for a free transcription worker
+CHUNK_QUEUE_SIZE = 2
+QUEUE_POLL_SECONDS = 0.5
+
+_END_OF_CHUNKS = object()
 
 logger = logging.getLogger("transcription")
 
 
+def _put_chunk(chunk_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """
+    Put an item on the bounded chunk queue, giving up once the consumer stopped.
+    """
+    while not stop_event.is_set():
+        try:
+            chunk_queue.put(item, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_chunks(chunk_iter, chunk_queue: queue.Queue, stop_event: threading.Event):
+    """
+    Producer thread: cut chunks one by one and hand them to the consumer.
+    Errors are forwarded through the queue so the consumer can raise them.
+    """
+    try:
+        for chunk in chunk_iter:
+            if not _put_chunk(chunk_queue, chunk, stop_event):
+                return
+    except Exception as e:
+        _put_chunk(chunk_queue, e, stop_event)
+        return
+    _put_chunk(chunk_queue, _END_OF_CHUNKS, stop_event)
+
+
+def stream_transcriptions(
+    chunk_iter,
+    fast_mode=True,
+    max_workers: int = MAX_TRANSCRIBE_WORKERS,
+    cache=None,
+):
+    """
+    Transcribe AudioChunks while they are still being produced.
+    A background thread pulls from chunk_iter into a bounded queue, and up to
+    max_workers chunks are transcribed at once, on threads sharing one model
+    or, with TRANSCRIBE_BACKEND = "process", on the shared process pool.
+    Chunks found in cache (a ChunkResultCache) skip Whisper entirely, and
+    fresh results are stored in it.
+    Yields (chunk, raw_segments) as soon as each chunk finishes, which may be
+    out of chunk order. Closing the generator stops the producer and drops any
+    chunks that have not started yet.
+    """
+    if transcribe_pool.get_transcribe_backend() == "process":
+        executor, max_workers = transcribe_pool.get_pool()
+        transcribe = transcribe_pool.transcribe_in_worker
+        owns_executor = False
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        transcribe = transcribe_chunk
+        owns_executor = True
+
+    chunk_queue = queue.Queue(maxsize=CHUNK_QUEUE_SIZE)
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=_produce_chunks,
+        args=(chunk_iter, chunk_queue, stop_event),
+        daemon=True,
+    )
+    producer.start()
+
+    in_flight = {}
+    try:
+        exhausted = False
+        while not exhausted or in_flight:
+            # Keep every worker busy without running ahead of the producer
+            while not exhausted and len(in_flight) < max_workers:
+                item = chunk_queue.get()
+                if item is _END_OF_CHUNKS:
+                    exhausted = True
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    cached = cache.get(item) if cache is not None else None
+                    if cached is not None:
+                        yield item, cached
+                    else:
+                        in_flight[executor.submit(transcribe, item, fast_mode)] = item
+
+            if in_flight:
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    raw_segments = future.result()
+                    if cache is not None:
+                        cache.put(chunk, raw_segments)
+                    yield chunk, raw_segments
+    except BrokenProcessPool:
+        transcribe_pool.discard_pool()
+        raise
+    finally:
+        stop_event.set()
+        for future in in_flight:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def apply_speakers(transcription, turns: list) -> int:
+    """
+    Relabel a transcription's segments with the diarized speaker overlapping
+    each one most. Segments no turn overlaps keep their heuristic speaker.
+    Returns the number of segments relabelled.
+    """
+    Segment = apps.get_model("transcription", "Segment")
+    rows = list(transcription.segments.values("id", "start", "end"))
+
+    updated = []
+    for row, speaker in zip(rows, assign_speakers(rows, turns)):
+        if speaker is not None:
+            updated.append(Segment(id=row["id"], speaker=speaker, speaker_color=speaker_color(speaker)))
+    Segment.objects.bulk_update(updated, ["speaker", "speaker_color"], batch_size=500)
+    return len(updated)
+
+
 def process_transcription(transcription_id: int, fast_mode=True):
     """
     Full transcription pipeline:
-    - Chunk audio
-    - Transcribe each chunk with Whisper (English forced)
+    - Normalize audio and cut chunks lazily
+    - Transcribe each chunk as soon as it is cut with Whisper (English forced)
     - Build structured segments with speaker/type
     - Normalize Kolokwa/Creole to English
+    - With TRANSCRIBE_DIARIZE, diarize the same normalized wav alongside
+      transcription and relabel speakers from it
     - Save results in Django model
     """
     Transcription = apps.get_model("transcription", "Transcription")
+    Segment = apps.get_model("transcription", "Segment")
+    diarize_executor = None
     try:
         transcription = Transcription.objects.get(id=transcription_id)
 
         cancel_event = get_cancel_event(transcription_id)
 
-        # Chunk audio
-        chunks = chunk_audio(transcription.audio_file.path)
-
-        all_segments = []
+        # Normalize once; chunks are cut lazily while Whisper is already running
+        total_chunks, chunk_iter = prepare_chunks(
+            transcription.audio_file.path,
+            chunk_length=CHUNK_SECONDS,
+        )
 
-        # Transcribe chunks (parallel)
-        offset = 0.0
-        total_chunks = len(chunks)
         if cancel_event.is_set():
             transcription.status = "CANCELLED"
             transcription.save(update_fields=["status"])
+            status_counts.invalidate()
+            progress_channel.publish(transcription_id, status="CANCELLED")
             return
-        def _transcribe(chunk_path: str):
-            return transcribe_chunk(chunk_path, fast_mode)
 
-        with ThreadPoolExecutor(max_workers=MAX_TRANSCRIBE_WORKERS) as executor:
-            raw_segments_list = list(executor.map(_transcribe, chunks))
+        diarization = None
+        if diarization_enabled():
+            # Runs next to Whisper on the wav prepare_chunks just wrote, cut at the same pauses
+            diarize_executor = ThreadPoolExecutor(max_workers=1)
+            diarization = diarize_executor.submit(
+                diarize_audio,
+                transcription.audio_file.path,
+                chunk_length=CHUNK_SECONDS,
+                normalized_path=normalized_path_for(transcription.audio_file.path),
+            )
 
-        # 3️⃣ Build segments per chunk and persist progress
-        for idx, raw_segments in enumerate(raw_segments_list):
-            if cancel_event.is_set():
-                transcription.status = "CANCELLED"
-                transcription.save(update_fields=["status"])
-                return
+        # Segments of an earlier attempt are rebuilt from the checkpoints below
+        search_index.remove_transcription(transcription_id)
+        transcription.segments.all().delete()
+        if transcription.structured_segments:
+            transcription.structured_segments = []
+            transcription.save(update_fields=["structured_segments"])
+        if transcription.word_index:
+            transcription.word_index.delete(save=False)
+            transcription.save(update_fields=["word_index"])
+        words = []
 
-            # Build structured segments (with speaker/type) and normalize English
-            structured_segments = build_segments(
-                raw_segments,
-                normalizer_func=normalize_text,
-                offset=offset
-            )
+        # Chunks this job already finished (crash, cancel, retry) are resumed from
+        # checkpoints; chunks of identical audio (re-uploads) come from the cache
+        checkpoints = ChunkCheckpoints(
+            transcription,
+            fast_mode,
+            cache=get_chunk_cache(transcription.audio_file.path, fast_mode),
+        )
+        if len(checkpoints):
+            logger.info(f"Resuming transcription {transcription_id} with {len(checkpoints)} chunks already done")
+
+        # Transcribe chunks (parallel, streamed) and persist progress per chunk
+        with closing(stream_transcriptions(chunk_iter, fast_mode, cache=checkpoints)) as results:
+            for done_count, (chunk, raw_segments) in enumerate(results, start=1):
+                if cancel_event.is_set():
+                    transcription.status = "CANCELLED"
+                    transcription.save(update_fields=["status"])
+                    status_counts.invalidate()
+                    progress_channel.publish(transcription_id, status="CANCELLED")
+                    return
 
-            all_segments.extend(structured_segments)
+                # Build structured segments (with speaker/type) and normalize English,
+                # placing them at the chunk's exact position in the recording
+                structured_segments = build_segments(raw_segments, offset=chunk.start)
 
-            # Increment offset for next chunk
-            if raw_segments:
-                chunk_duration = max(seg["end"] for seg in raw_segments)
-            else:
-                chunk_duration = 0
-            offset += chunk_duration
+                # Insert only this chunk's segments, dropping those a neighbouring
+                # chunk already covers in their overlap. Chunks may finish out of
+                # order; rows are read back ordered by start time.
+                owned = [i for i, seg in enumerate(structured_segments) if chunk.owns(seg["start"], seg["end"])]
+                new_segments = [structured_segments[i] for i in owned]
+                for i in owned:
+                    words.extend(
+                        (start + chunk.start, end + chunk.start, word)
+                        for start, end, word in raw_segments[i].get("words", ())
+                    )
+                Segment.objects.bulk_create(Segment.from_dict(transcription, seg) for seg in new_segments)
 
-            # Save partial progress after each chunk
-            transcription.structured_segments = all_segments
-            transcription.progress = int(((idx + 1) / total_chunks) * 100) if total_chunks else 100
-            transcription.save(update_fields=["structured_segments", "progress"])
+                # Save partial progress after each chunk and push it to open pages
+                transcription.progress = int((done_count / total_chunks) * 100) if total_chunks else 100
+                transcription.save(update_fields=["progress"])
+                progress_channel.publish(
+                    transcription_id,
+                    status="PROCESSING",
+                    progress=transcription.progress,
+                    segments=new_segments,
+                )
 
-        # 4️⃣ Sort by start time
-        all_segments.sort(key=lambda x: x["start"])
+        if diarization is not None:
+            try:
+                relabelled = apply_speakers(transcription, diarization.result())
+                logger.info(f"Diarization relabelled {relabelled} segments of transcription {transcription_id}")
+            except Exception:
+                # Optional stage: keep the heuristic speakers rather than fail the job
+                logger.exception(f"Diarization failed for ID {transcription_id}")
 
         # 5️⃣ Save to model
-        transcription.structured_segments = all_segments
         transcription.status = "DONE"
-        transcription.save(update_fields=["structured_segments", "status"])
+        if words:
+            transcription.word_index.save(
+                f"{transcription_id}.npz",
+                ContentFile(WordIndex.build(words).to_bytes()),
+                save=False,
+            )
+        transcription.update_summary(save=False)
+        # Exports of an earlier run are stale
+        transcription.content_version += 1
+        transcription.save(update_fields=[
+            "status", "word_index", "duration", "segment_count", "speaker_count", "word_count", "preview",
+            "content_version",
+        ])
+        status_counts.invalidate()
+        # The job is saved as DONE: follow-up stages log their failures rather than fail it
+        try:
+            search_index.index_transcription(transcription_id)
+        except Exception:
+            logger.exception(f"Search indexing failed for ID {transcription_id}")
+        try:
+            schedule_prerender(transcription)
+        except Exception:
+            logger.exception(f"Export pre-rendering could not be scheduled for ID {transcription_id}")
+        try:
+            checkpoints.clear()
+        except Exception:
+            logger.exception(f"Checkpoint cleanup failed for ID {transcription_id}")
+        progress_channel.publish(transcription_id, status="DONE", progress=100)
     except Exception as e:
         logger.exception(f"Transcription failed for ID {transcription_id}")
         
         transcription.status = "ERROR"
         transcription.error_message = str(e)
         transcription.save(update_fields=["status",  "error_message"])
+        status_counts.invalidate()
+        progress_channel.publish(transcription_id, status="ERROR", error_message=str(e))
+    finally:
+        if diarize_executor is not None:
+            # A cancelled or failed job does not wait for diarization to finish
+            diarize_executor.shutdown(wait=False, cancel_futures=True)
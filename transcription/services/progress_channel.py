@@ -0,0 +1,98 @@
+"""
+Progress events pushed from the transcription worker to the web process.
+
+The worker publishes one small JSON message per finished chunk and per status
+change on a Redis pub/sub channel; the SSE view relays them to the browser, so
+open processing pages no longer poll the database.
+"""
+import os
+import json
+import logging
+
+import redis
+import redis.asyncio
+
+from django.conf import settings
+
+# Seconds without an event before the stream sends a keep-alive comment
+HEARTBEAT_SECONDS = 15
+# A stream ends after this long and the browser's EventSource reconnects, so a
+# client that went away holds its subscription at most this long
+STREAM_MAX_SECONDS = 300
+CONNECT_TIMEOUT_SECONDS = 1
+
+logger = logging.getLogger("transcription")
+
+_client = None
+
+
+def get_channel_url() -> str:
+    return (
+        getattr(settings, "PROGRESS_CHANNEL_URL", None)
+        or os.environ.get("PROGRESS_CHANNEL_URL")
+        or getattr(settings, "CELERY_BROKER_URL", "redis://localhost:6379/0")
+    )
+
+
+def channel_name(transcription_id: int) -> str:
+    return f"transcription:{transcription_id}:progress"
+
+
+def get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            get_channel_url(),
+            socket_connect_timeout=CONNECT_TIMEOUT_SECONDS,
+            socket_timeout=CONNECT_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+def publish(transcription_id: int, **event):
+    """
+    Best effort: a missing Redis only costs live updates, clients fall back to polling.
+    """
+    try:
+        get_client().publish(channel_name(transcription_id), json.dumps(event))
+    except redis.RedisError as e:
+        logger.debug(f"Progress event for transcription {transcription_id} not published: {e}")
+
+
+class Subscription:
+    """
+    Async context manager over one transcription's channel:
+
+        async with Subscription(transcription_id) as subscription:
+            event = await subscription.get()
+
+    Raises redis.RedisError if the channel is unreachable.
+    """
+    def __init__(self, transcription_id: int):
+        self.channel = channel_name(transcription_id)
+        self.client = None
+        self.pubsub = None
+
+    async def __aenter__(self):
+        self.client = redis.asyncio.Redis.from_url(get_channel_url(), socket_connect_timeout=CONNECT_TIMEOUT_SECONDS)
+        self.pubsub = self.client.pubsub()
+        try:
+            await self.pubsub.subscribe(self.channel)
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get(self, timeout: float = HEARTBEAT_SECONDS) -> dict | None:
+        """
+        The next event, or None after `timeout` seconds without one.
+        """
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(message["data"]) if message else None
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
@@ -1,8 +1,50 @@
 import re
+import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple, Dict
+from threading import Lock
+from typing import Iterable, List, Tuple, Dict, Optional, Set
 
-from .kolokwa_normalizer import KOLOKWA_PATTERNS
+from .kolokwa_patterns import KOLOKWA_PATTERNS
+
+WORD_RE = re.compile(r"\w+")
+# A pattern source that starts with a word boundary and a literal word
+FIRST_WORD_RE = re.compile(r"\\b(\w+)(?=$|\\b|[ \-])")
+# Normalized utterances remembered across segments and jobs
+NORMALIZE_CACHE_SIZE = 10000
+
+
+class _LRUCache:
+    """
+    Bounded, thread-safe mapping that evicts the least recently used key.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, keys: Iterable) -> Dict[object, str]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def put_many(self, items: Dict[object, str]):
+        with self._lock:
+            self._data.update(items)
+            for key in items:
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+_NORMALIZE_CACHE = _LRUCache(NORMALIZE_CACHE_SIZE)
 
 
 @dataclass(frozen=True)
@@ -19,6 +61,13 @@ class NormalizerEngine:
     """
     Apply regex-based normalization rules in priority order.
     Tracks per-rule confidence (1 if matched, 0 if not).
+
+    Text is rewritten in a single left-to-right scan: at the leftmost position
+    where any rule matches, the highest-priority rule matching there wins.
+    This differs from applying rules one after another (normalize_sequential)
+    in two ways: replaced text is final and is not rewritten again by
+    lower-priority rules, and a lower-priority rule matching further left
+    wins over an overlapping higher-priority one that starts later.
     """
     def __init__(self, rules: Iterable[NormalizationRule]):
         self.rules = sorted(list(rules), key=lambda r: r.priority, reverse=True)
@@ -26,6 +75,108 @@ class NormalizerEngine:
             (rule, [re.compile(pat, re.IGNORECASE) for pat in rule.patterns])
             for rule in self.rules
         ]
+        # Identifies the rule set in the shared cache, so editing a rule never serves stale text
+        self.version = hashlib.sha1(
+            repr([(rule.patterns, rule.replacement, rule.priority) for rule in self.rules]).encode("utf-8")
+        ).hexdigest()[:12]
+
+        # Rules that start with a literal word are indexed by it, so at each
+        # word the scan only tries the few rules that can match there
+        self._by_first_word: Dict[str, List[Tuple[int, re.Pattern]]] = {}
+        indexable = True
+        for rule_index, (rule, patterns) in enumerate(self._compiled):
+            for pattern in patterns:
+                first_word = FIRST_WORD_RE.match(pattern.pattern)
+                if first_word is None or "|" in pattern.pattern:
+                    indexable = False
+                    continue
+                self._by_first_word.setdefault(first_word.group(1).lower(), []).append((rule_index, pattern))
+
+        # Otherwise all patterns are merged into one alternation, highest priority first
+        self._combined = None
+        self._group_rules: Dict[str, Tuple[int, re.Pattern]] = {}
+        if not indexable:
+            alternatives = []
+            for rule_index, (rule, patterns) in enumerate(self._compiled):
+                for pattern in patterns:
+                    name = f"r{len(alternatives)}"
+                    alternatives.append(f"(?P<{name}>{pattern.pattern})")
+                    self._group_rules[name] = (rule_index, pattern)
+            self._by_first_word = None
+            self._combined = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def _expand(self, rule_index: int, match: re.Match) -> str:
+        replacement = self.rules[rule_index].replacement
+        return match.expand(replacement) if "\\" in replacement else replacement
+
+    def _rewrite_indexed(self, text: str, fired: Optional[Set[int]]) -> str:
+        parts = []
+        copied_to = 0
+        for word in WORD_RE.finditer(text):
+            start = word.start()
+            if start < copied_to:
+                continue
+            candidates = self._by_first_word.get(word.group().lower())
+            if not candidates:
+                continue
+            for rule_index, pattern in candidates:
+                match = pattern.match(text, start)
+                if match:
+                    parts.append(text[copied_to:start])
+                    parts.append(self._expand(rule_index, match))
+                    copied_to = match.end()
+                    if fired is not None:
+                        fired.add(rule_index)
+                    break
+
+        if not parts:
+            return text
+        parts.append(text[copied_to:])
+        return "".join(parts)
+
+    def _rewrite_combined(self, text: str, fired: Optional[Set[int]]) -> str:
+        def replace(match: re.Match) -> str:
+            rule_index, pattern = self._group_rules[match.lastgroup]
+            if fired is not None:
+                fired.add(rule_index)
+            # Group references are numbered within the rule's own pattern
+            return self._expand(rule_index, pattern.match(text, match.start()))
+
+        return self._combined.sub(replace, text)
+
+    def _rewrite(self, text: str, fired: Optional[Set[int]] = None) -> str:
+        if self._by_first_word is not None:
+            return self._rewrite_indexed(text, fired)
+        return self._rewrite_combined(text, fired)
+
+    def normalize_fast(self, text: str) -> str:
+        """
+        Normalized text only, without building the per-rule report.
+        """
+        out = self._rewrite(text)
+        if out:
+            out = out[0].upper() + out[1:]
+        return out
+
+    def normalize_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Normalize many texts at once, in order. Each distinct text is
+        normalized once, and results are memoized across calls, so a
+        transcript costs roughly its number of unique utterances.
+        """
+        texts = list(texts)
+        keys = {text: (self.version, text) for text in texts}
+        cached = _NORMALIZE_CACHE.get_many(keys.values())
+
+        results = {text: cached[key] for text, key in keys.items() if key in cached}
+        computed = {}
+        for text, key in keys.items():
+            if text not in results:
+                results[text] = computed[key] = self.normalize_fast(text)
+        if computed:
+            _NORMALIZE_CACHE.put_many(computed)
+
+        return [results[text] for text in texts]
 
     def normalize(self, text: str) -> Tuple[str, float, List[Dict[str, object]]]:
         """
@@ -34,24 +185,18 @@ class NormalizerEngine:
         - overall_confidence (0.0 - 1.0)
         - report: list of fired rules with per-rule confidence
         """
-        out = text
-        report: List[Dict[str, object]] = []
+        fired = set()
+        out = self._rewrite(text, fired)
 
-        for rule, patterns in self._compiled:
-            matched = False
-            for pattern in patterns:
-                if pattern.search(out):
-                    matched = True
-                    out = pattern.sub(rule.replacement, out)
-
-            report.append(
-                {
-                    "replacement": rule.replacement,
-                    "patterns": rule.patterns,
-                    "priority": rule.priority,
-                    "confidence": 1 if matched else 0,
-                }
-            )
+        report: List[Dict[str, object]] = [
+            {
+                "replacement": rule.replacement,
+                "patterns": rule.patterns,
+                "priority": rule.priority,
+                "confidence": 1 if rule_index in fired else 0,
+            }
+            for rule_index, rule in enumerate(self.rules)
+        ]
 
         if out:
             out = out[0].upper() + out[1:]
@@ -63,6 +208,19 @@ class NormalizerEngine:
 
         return out, overall_confidence, report
 
+    def normalize_sequential(self, text: str) -> str:
+        """
+        Reference implementation: one search-and-replace pass per rule.
+        Kept for benchmarks and equivalence tests.
+        """
+        out = text
+        for rule, patterns in self._compiled:
+            for pattern in patterns:
+                out = pattern.sub(rule.replacement, out)
+        if out:
+            out = out[0].upper() + out[1:]
+        return out
+
 
 def build_rules_from_kolokwa_patterns(
     patterns: List[Tuple[str, str]],
@@ -92,8 +250,14 @@ def normalize_text(text: str) -> str:
     """
     Normalize text using the default engine and return normalized text only.
     """
-    normalized, _confidence, _report = DEFAULT_ENGINE.normalize(text)
-    return normalized
+    return DEFAULT_ENGINE.normalize_fast(text)
+
+
+def normalize_text_batch(texts: Iterable[str]) -> List[str]:
+    """
+    Normalize a list of texts with the default engine, memoizing repeated utterances.
+    """
+    return DEFAULT_ENGINE.normalize_batch(texts)
 
 
 # Example usage
@@ -0,0 +1,71 @@
+"""
+Per-chunk cache of raw Whisper output, keyed by audio content.
+
+The key combines a hash of the uploaded file with the model, decoding
+options and the chunk's exact sample range. Celery retries and re-uploads
+of the same recording therefore reuse every chunk that was already
+transcribed instead of running Whisper again.
+"""
+import os
+import json
+import hashlib
+
+from django.conf import settings
+
+from .disk_cache import DiskCache
+from .transcriber import MODEL_NAME, LANGUAGE, get_beam_size, word_timestamps_enabled
+
+# Bump when the shape of transcribe_chunk output changes
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def get_transcript_cache() -> DiskCache | None:
+    """
+    The shared chunk result cache, or None when TRANSCRIBE_CACHE_MAX_BYTES is 0.
+    """
+    max_bytes = getattr(settings, "TRANSCRIBE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    if not max_bytes:
+        return None
+    directory = getattr(settings, "TRANSCRIBE_CACHE_DIR", None) or os.path.join(
+        settings.MEDIA_ROOT, "cache", "transcripts"
+    )
+    return DiskCache(directory, int(max_bytes))
+
+
+def audio_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class ChunkResultCache:
+    def __init__(self, audio_hash: str, fast_mode: bool, cache: DiskCache):
+        self.audio_hash = audio_hash
+        self.fast_mode = fast_mode
+        self.cache = cache
+
+    def key(self, chunk) -> str:
+        params = [
+            CACHE_VERSION,
+            MODEL_NAME,
+            LANGUAGE,
+            get_beam_size(self.fast_mode),
+            word_timestamps_enabled(),
+            self.audio_hash,
+            chunk.start_sample,
+            chunk.end_sample,
+        ]
+        return hashlib.sha256(json.dumps(params).encode("utf-8")).hexdigest()
+
+    def get(self, chunk) -> list | None:
+        return self.cache.get_json(self.key(chunk))
+
+    def put(self, chunk, raw_segments: list):
+        self.cache.put_json(self.key(chunk), raw_segments)
+
+
+def get_chunk_cache(audio_path: str, fast_mode: bool) -> ChunkResultCache | None:
+    cache = get_transcript_cache()
+    if cache is None:
+        return None
+    return ChunkResultCache(audio_digest(audio_path), fast_mode, cache)
@@ -0,0 +1,178 @@
+"""
+Full-text search over every transcript's segments.
+
+On SQLite the segments' original and English text is indexed in an FTS5
+table (created by migration 0017) whose rowid is the Segment id. It is kept
+up to date incrementally: a transcription is indexed when
+process_transcription finishes, and single segments when they are edited or
+translated. Results are ranked by bm25, original text weighing more than the
+English normalization.
+Other databases have no FTS5; search falls back to an unranked substring
+match and the indexing calls do nothing.
+"""
+import re
+import logging
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = "transcription_segment_fts"
+# bm25 column weights: original, english
+RANK_WEIGHTS = (2.0, 1.0)
+DEFAULT_LIMIT = 50
+# Ids per statement, below SQLite's bound-parameter limit
+QUERY_BATCH_SIZE = 500
+
+_TERM_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+logger = logging.getLogger("transcription")
+
+
+def is_available() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def match_query(query: str) -> str:
+    """
+    FTS5 query for free text: every word must appear, the last one as a
+    prefix so results show up while typing. Quoting each word keeps FTS5
+    operators and punctuation in user input from being parsed.
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _batches(items: list):
+    for i in range(0, len(items), QUERY_BATCH_SIZE):
+        yield items[i:i + QUERY_BATCH_SIZE]
+
+
+def _delete_rows(cursor, segment_ids: list):
+    for batch in _batches(segment_ids):
+        placeholders = ", ".join("%s" for _ in batch)
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+
+
+def index_segments(segment_ids):
+    """
+    (Re)index the given segments from their current rows.
+    """
+    if not is_available():
+        return
+    Segment = apps.get_model("transcription", "Segment")
+    segment_ids = list(segment_ids)
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, segment_ids)
+        for batch in _batches(segment_ids):
+            rows = Segment.objects.filter(id__in=batch).values_list("id", "original", "english", "transcription_id")
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, original, english, transcription_id) VALUES (%s, %s, %s, %s)",
+                list(rows),
+            )
+
+
+def index_transcription(transcription_id: int):
+    Segment = apps.get_model("transcription", "Segment")
+    index_segments(Segment.objects.filter(transcription_id=transcription_id).values_list("id", flat=True))
+
+
+def remove_transcription(transcription_id: int):
+    """
+    Drop a transcription's segments from the index. Call before its segment
+    rows are deleted: the index is keyed by their ids.
+    """
+    if not is_available():
+        return
+    Segment = apps.get_model("transcription", "Segment")
+    segment_ids = list(Segment.objects.filter(transcription_id=transcription_id).values_list("id", flat=True))
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, segment_ids)
+
+
+def _segment_positions(segments) -> dict:
+    """
+    {segment id: index on its transcript page}, for all segments in one query.
+    Pages list segments by (start, id), so that is each segment's row number
+    among its transcription's segments.
+    """
+    if not segments:
+        return {}
+    Segment = apps.get_model("transcription", "Segment")
+    quote = connection.ops.quote_name
+    transcription_ids = sorted({segment.transcription_id for segment in segments})
+    segment_ids = [segment.id for segment in segments]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {quote('id')}, position FROM ("
+            f"SELECT {quote('id')}, ROW_NUMBER() OVER ("
+            f"PARTITION BY {quote('transcription_id')} ORDER BY {quote('start')}, {quote('id')}) - 1 AS position "
+            f"FROM {quote(Segment._meta.db_table)} "
+            f"WHERE {quote('transcription_id')} IN ({', '.join('%s' for _ in transcription_ids)})"
+            f") ranked WHERE {quote('id')} IN ({', '.join('%s' for _ in segment_ids)})",
+            [*transcription_ids, *segment_ids],
+        )
+        return dict(cursor.fetchall())
+
+
+def search(query: str, limit: int = DEFAULT_LIMIT, offset: int = 0) -> list[dict]:
+    """
+    Segments matching query, best first, as dicts with transcription_id,
+    segment_id, index (position in the transcript), start, end, original and english.
+    """
+    Segment = apps.get_model("transcription", "Segment")
+    fts_query = match_query(query)
+    if not fts_query:
+        return []
+
+    if is_available():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({FTS_TABLE}, %s, %s) AS score FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s ORDER BY score LIMIT %s OFFSET %s",
+                [*RANK_WEIGHTS, fts_query, limit, offset],
+            )
+            ranked = cursor.fetchall()
+        segments = Segment.objects.select_related("transcription").in_bulk([segment_id for segment_id, _score in ranked])
+        # Skip rows whose segment vanished without being removed from the index
+        hits = [(segments[segment_id], -score) for segment_id, score in ranked if segment_id in segments]
+    else:
+        matches = Segment.objects.select_related("transcription").order_by("transcription_id", "start", "id")
+        for term in _TERM_RE.findall(query):
+            matches = matches.filter(Q(original__icontains=term) | Q(english__icontains=term))
+        hits = [(segment, None) for segment in matches[offset:offset + limit]]
+
+    positions = _segment_positions([segment for segment, _score in hits])
+    return [
+        {
+            "transcription_id": segment.transcription_id,
+            "file_name": segment.transcription.audio_file.name,
+            "segment_id": segment.id,
+            "index": positions[segment.id],
+            "start": segment.start,
+            "end": segment.end,
+            "original": segment.original,
+            "english": segment.english,
+            "score": score,
+        }
+        for segment, score in hits
+    ]
+
+
+def rebuild():
+    """
+    Reindex every segment, e.g. after restoring a database backup.
+    """
+    if not is_available():
+        return 0
+    Segment = apps.get_model("transcription", "Segment")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    segment_ids = list(Segment.objects.values_list("id", flat=True))
+    index_segments(segment_ids)
+    logger.info(f"Search index rebuilt with {len(segment_ids)} segments")
+    return len(segment_ids)
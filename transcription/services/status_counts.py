@@ -0,0 +1,59 @@
+"""
+Transcription counts per status for the processing dashboards.
+
+One grouped query instead of a count() per status, cached for
+DASHBOARD_STATS_CACHE_SECONDS and dropped whenever a transcription changes
+status. With the default per-process cache, invalidations from Celery workers
+do not reach the web processes and the short timeout bounds how stale the
+counts get; a shared CACHES backend (e.g. Redis) makes them immediate.
+"""
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+CACHE_KEY = "transcription:status_counts"
+DEFAULT_CACHE_SECONDS = 5
+ACTIVE_STATUSES = ("UPLOADED", "PENDING", "PROCESSING")
+
+
+def get_cache_seconds() -> int:
+    seconds = getattr(settings, "DASHBOARD_STATS_CACHE_SECONDS", None)
+    if seconds is None:
+        seconds = os.environ.get("DASHBOARD_STATS_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+    return int(seconds)
+
+
+def get_status_counts() -> dict:
+    """
+    {status: number of transcriptions}, from the cache when fresh.
+    """
+    counts = cache.get(CACHE_KEY)
+    if counts is None:
+        Transcription = apps.get_model("transcription", "Transcription")
+        counts = dict(
+            Transcription.objects.order_by().values_list("status").annotate(count=Count("id"))
+        )
+        timeout = get_cache_seconds()
+        if timeout:
+            cache.set(CACHE_KEY, counts, timeout)
+    return counts
+
+
+def invalidate():
+    """
+    Call after creating, deleting or changing the status of a transcription.
+    """
+    cache.delete(CACHE_KEY)
+
+
+def dashboard_stats() -> dict:
+    counts = get_status_counts()
+    return {
+        "active": sum(counts.get(status, 0) for status in ACTIVE_STATUSES),
+        "done": counts.get("DONE", 0),
+        "error": counts.get("ERROR", 0),
+        "cancelled": counts.get("CANCELLED", 0),
+    }
@@ -0,0 +1,142 @@
+"""
+Process-pool transcription backend.
+
+Each worker process holds its own WhisperModel with cpu_threads = cores / N,
+so N chunks decode truly in parallel instead of sharing one CTranslate2
+instance. Chunks are sent as AudioChunk manifest entries; workers load the
+audio themselves from the memory-mapped wav.
+"""
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+from django.conf import settings
+
+from .transcriber import load_model, transcribe_chunk
+
+# Resident size of one faster-whisper medium int8 model plus decode buffers
+MODEL_RAM_BYTES = 2 * 1024 ** 3
+MIN_THREADS_PER_WORKER = 2
+
+logger = logging.getLogger("transcription")
+
+# Set inside each worker process by _init_worker
+_worker_model = None
+
+_pool = None
+_pool_workers = 0
+_pool_lock = Lock()
+
+
+def get_transcribe_backend() -> str:
+    backend = getattr(settings, "TRANSCRIBE_BACKEND", None) or os.environ.get("TRANSCRIBE_BACKEND", "thread")
+    backend = backend.strip().lower()
+    if backend == "process" and multiprocessing.current_process().daemon:
+        # Daemonic processes (e.g. Celery prefork children) cannot have children
+        logger.warning("Process transcription backend is unavailable in a daemonic worker; using threads")
+        return "thread"
+    return backend if backend in ("thread", "process") else "thread"
+
+
+def available_memory_bytes() -> int | None:
+    """
+    Memory available for new processes, or None if it cannot be determined.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def auto_worker_count(
+    cpu_count: int | None = None,
+    memory_bytes: int | None = None,
+    model_ram_bytes: int = MODEL_RAM_BYTES,
+) -> int:
+    """
+    As many workers as both the cores (MIN_THREADS_PER_WORKER each) and the
+    available RAM (one model of model_ram_bytes each) allow.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    by_cpu = max(1, cpu_count // MIN_THREADS_PER_WORKER)
+
+    if memory_bytes is None:
+        memory_bytes = available_memory_bytes()
+    by_memory = max(1, memory_bytes // model_ram_bytes) if memory_bytes else by_cpu
+
+    return min(by_cpu, by_memory)
+
+
+def get_pool_workers() -> int:
+    workers = getattr(settings, "TRANSCRIBE_POOL_WORKERS", None) or os.environ.get("TRANSCRIBE_POOL_WORKERS", "auto")
+    try:
+        return max(1, int(workers))
+    except (TypeError, ValueError):
+        return auto_worker_count()
+
+
+def _init_worker(cpu_threads: int):
+    global _worker_model
+    _worker_model = load_model(cpu_threads=cpu_threads, num_workers=1)
+
+
+def transcribe_in_worker(chunk, fast_mode: bool = True):
+    """
+    Runs inside a pool process.
+    """
+    return transcribe_chunk(chunk, fast_mode, model=_worker_model)
+
+
+def warm_up_worker(chunk, barrier):
+    """
+    Runs inside a pool process: transcribes chunk, then waits for every other
+    worker to do the same, so each of the pool's processes takes exactly one.
+    """
+    transcribe_in_worker(chunk)
+    barrier.wait()
+
+
+def create_pool(workers: int) -> ProcessPoolExecutor:
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn, not fork: the pipeline process is already running threads
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(cpu_threads,),
+    )
+
+
+def get_pool() -> tuple[ProcessPoolExecutor, int]:
+    """
+    The shared pool for this process, created on first use so each worker
+    loads its model once and keeps it warm across jobs.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = get_pool_workers()
+            logger.info(f"Starting transcription pool with {_pool_workers} workers")
+            _pool = create_pool(_pool_workers)
+        return _pool, _pool_workers
+
+
+def discard_pool():
+    """
+    Drop a broken pool (e.g. a worker was OOM-killed) so the next job starts a fresh one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,13 +1,19 @@
 from faster_whisper import WhisperModel
 import os
+import logging
 from threading import Lock
 from .interview_intelligence import is_question, detect_speaker
+from . import model_client
 from django.conf import settings
 
+logger = logging.getLogger("transcription")
+
+MODEL_NAME = "systran/faster-whisper-medium"
 _DEVICE = "cpu"
 _COMPUTE_TYPE = "int8"
 _CPU_THREADS = 3
 _NUM_WORKERS = 1
+LANGUAGE = "en"
 
 _PROFILES = {
     # Best for running multiple Celery workers in parallel
@@ -25,36 +31,74 @@ def _get_profile_settings():
 _model = None
 _model_lock = Lock()
 
+def load_model(cpu_threads: int, num_workers: int) -> WhisperModel:
+    return WhisperModel(
+        MODEL_NAME,
+        device=_DEVICE,
+        compute_type=_COMPUTE_TYPE,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+        local_files_only=True,
+    )
+
 def get_model():
     global _model
     if _model is None:
         with _model_lock:
             if _model is None:
                 profile_settings = _get_profile_settings()
-                _model = WhisperModel(
-                    "systran/faster-whisper-medium",
-                    device=_DEVICE,
-                    compute_type=_COMPUTE_TYPE,
+                _model = load_model(
                     cpu_threads=profile_settings["cpu_threads"],
                     num_workers=profile_settings["num_workers"],
-                    local_files_only=True,
                 )
     return _model
 
-def transcribe_chunk(audio_path: str, fast_mode: bool = False):
-    if not os.path.exists(audio_path):
-        raise FileNotFoundError(audio_path)
+def get_beam_size(fast_mode: bool) -> int:
+    return 1 if fast_mode else 5
+
+def word_timestamps_enabled() -> bool:
+    enabled = getattr(settings, "TRANSCRIBE_WORD_TIMESTAMPS", None) or os.environ.get("TRANSCRIBE_WORD_TIMESTAMPS", "")
+    return str(enabled).lower() in ("1", "true", "yes", "on")
+
+def transcribe_chunk(audio, fast_mode: bool = False, model=None, word_timestamps=None):
+    """
+    Transcribe one chunk, given as a wav path, a float32 16 kHz sample array
+    or an AudioChunk.
+    With word_timestamps (default TRANSCRIBE_WORD_TIMESTAMPS) every segment
+    also gets "words": [[start, end, word], ...], relative to the chunk.
+    Goes to the model server when one is configured, otherwise (or if it is
+    down) uses the shared in-process model unless a model is passed in.
+    """
+    if word_timestamps is None:
+        word_timestamps = word_timestamps_enabled()
+
+    if model is None and model_client.use_model_server():
+        try:
+            return model_client.request(
+                "transcribe",
+                audio=audio,
+                fast_mode=fast_mode,
+                word_timestamps=word_timestamps,
+            )
+        except model_client.ModelServerUnavailable as e:
+            logger.warning(f"{e}; transcribing in-process")
+
+    if hasattr(audio, "load"):
+        audio = audio.load()
+    if isinstance(audio, str) and not os.path.exists(audio):
+        raise FileNotFoundError(audio)
 
-    model = get_model()
-    beam_size = 1 if fast_mode else 5
+    model = model or get_model()
+    beam_size = get_beam_size(fast_mode)
 
     segments, _ = model.transcribe(
-        audio_path,
+        audio,
         beam_size=beam_size,
         temperature=0.0,
         vad_filter=False,
         condition_on_previous_text=False,
-        language="en", #force English
+        language=LANGUAGE, #force English
+        word_timestamps=word_timestamps,
     )
 
     results = []
@@ -63,13 +107,16 @@ def transcribe_chunk(audio_path: str, fast_mode: bool = False):
         if len(text) < 2:
             continue
 
-        results.append({
+        result = {
             "start": seg.start,
             "end": seg.end,
             "original": text,
             "english": "",  # will be filled by build_segments
             "speaker": detect_speaker(text),
             "type": "Question" if is_question(text) else "Answer",
-        })
+        }
+        if word_timestamps:
+            result["words"] = [[word.start, word.end, word.word.strip()] for word in seg.words or []]
+        results.append(result)
 
     return results
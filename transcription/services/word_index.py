@@ -0,0 +1,123 @@
+"""
+Word-level timestamps of a transcription, stored compactly.
+
+Whisper's per-word times are kept as parallel float32 start/end arrays, and
+the words themselves as one UTF-8 buffer with an int32 offset table (word i
+is text[offsets[i]:offsets[i + 1]]), instead of a dict per word. A second
+int32 array lists the words in alphabetical order, so both directions are
+binary searches: time -> word over the starts, word -> times over that order.
+Saved as an .npz file next to the media, a few bytes per word.
+"""
+import io
+import re
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+_TOKEN_STRIP_RE = re.compile(r"^\W+|\W+$")
+
+
+def normalize_token(word: str) -> str:
+    """
+    Search form of a word: lower case, without surrounding punctuation.
+    """
+    return _TOKEN_STRIP_RE.sub("", word.strip().lower())
+
+
+class WordIndex:
+    def __init__(self, starts, ends, offsets, text, order=None):
+        self.starts = np.asarray(starts, dtype=np.float32)
+        self.ends = np.asarray(ends, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.text = bytes(text)
+        if order is None:
+            order = sorted(range(len(self.starts)), key=lambda i: (self.token(i), i))
+        self.order = np.asarray(order, dtype=np.int32)
+
+    @classmethod
+    def build(cls, words) -> "WordIndex":
+        """
+        Index (start, end, word) triples, in any order.
+        """
+        words = sorted(words, key=lambda word: word[0])
+        encoded = [word.strip().encode("utf-8") for _start, _end, word in words]
+        offsets = np.zeros(len(words) + 1, dtype=np.int32)
+        np.cumsum([len(word) for word in encoded], out=offsets[1:])
+        return cls(
+            [start for start, _end, _word in words],
+            [end for _start, end, _word in words],
+            offsets,
+            b"".join(encoded),
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "WordIndex":
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(
+                arrays["starts"],
+                arrays["ends"],
+                arrays["offsets"],
+                arrays["text"].tobytes(),
+                arrays["order"],
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "WordIndex":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            starts=self.starts,
+            ends=self.ends,
+            offsets=self.offsets,
+            text=np.frombuffer(self.text, dtype=np.uint8),
+            order=self.order,
+        )
+        return buffer.getvalue()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def token(self, i: int) -> str:
+        return normalize_token(self.word(i))
+
+    def get(self, i: int) -> dict:
+        return {
+            "index": int(i),
+            "word": self.word(i),
+            # Milliseconds are all a seek needs, and hide float32 noise
+            "start": round(float(self.starts[i]), 3),
+            "end": round(float(self.ends[i]), 3),
+        }
+
+    def word_at(self, time: float) -> int | None:
+        """
+        Index of the word being spoken at time, or of the last word before it
+        when time falls in a pause. None before the first word.
+        """
+        i = int(np.searchsorted(self.starts, time, side="right")) - 1
+        return i if i >= 0 else None
+
+    def find(self, word: str) -> list[int]:
+        """
+        Indexes of every occurrence of word (case and punctuation insensitive), in time order.
+        """
+        token = normalize_token(word)
+        if not token:
+            return []
+        low = bisect_left(self.order, token, key=self.token)
+        high = bisect_right(self.order, token, lo=low, key=self.token)
+        return sorted(int(i) for i in self.order[low:high])
+
+    def time_of(self, word: str) -> float | None:
+        """
+        Start time of the first occurrence of word.
+        """
+        matches = self.find(word)
+        return float(self.starts[matches[0]]) if matches else None
@@ -12,6 +12,7 @@ const speakerFilter = document.getElementById("speakerFilter");
 const exportBtn = document.getElementById("exportBtn");
 const exportMenu = document.getElementById("exportMenu");
 const exportConfirmBtn = document.getElementById("exportConfirmBtn");
+const exportStatus = document.getElementById("exportStatus");
 const translateBtn = document.getElementById("translateBtn");
 const translateStatus = document.getElementById("translateStatus");
 const saveStatus = document.getElementById("saveStatus");
@@ -108,13 +109,34 @@ document.addEventListener("click", (e) => {
     }
 });
 
+// PDF and DOCX are pre-rendered when a transcription finishes; wait for
+// that render instead of downloading a 202 progress response
+async function downloadWhenReady(query) {
+    try {
+        const res = await fetch(`${detailConfig.exportStatusUrl}?${query}`);
+        const data = await res.json();
+        if (data.state === "rendering") {
+            exportStatus.textContent = data.total
+                ? `Preparing ${data.format.toUpperCase()}… ${data.done}/${data.total}`
+                : `Preparing ${data.format.toUpperCase()}…`;
+            const retryAfter = Number(res.headers.get("Retry-After")) || 2;
+            setTimeout(() => downloadWhenReady(query), retryAfter * 1000);
+            return;
+        }
+    } catch (err) {
+        console.error("Error checking export:", err);
+    }
+    exportStatus.textContent = "";
+    window.location.href = `${detailConfig.exportUrl}?${query}`;
+}
+
 exportConfirmBtn?.addEventListener("click", () => {
     const format = document.getElementById("exportFormat").value;
     const timestamps = document.getElementById("exportTimestamps").checked ? "1" : "0";
     const speakers = document.getElementById("exportSpeakers").checked ? "1" : "0";
 
-    const url = `${detailConfig.exportUrl}?format=${format}&timestamps=${timestamps}&speakers=${speakers}&filename=${encodeURIComponent(detailConfig.filename || "transcript")}`;
-    window.location.href = url;
+    const query = `format=${format}&timestamps=${timestamps}&speakers=${speakers}&filename=${encodeURIComponent(detailConfig.filename || "transcript")}`;
+    downloadWhenReady(query);
 });
 
 // ======================
@@ -281,9 +303,48 @@ document.querySelectorAll(".rename-speaker").forEach(btn => {
 // ======================
 // LLM Translate Button
 // ======================
+async function followTranslation(statusUrl) {
+    try {
+        const res = await fetch(statusUrl);
+        const data = await res.json();
+        if (data.state === "success") {
+            translateStatus.textContent = "Translation complete. Reloading…";
+            window.location.reload();
+            return;
+        }
+        if (data.state === "failure") {
+            translateStatus.textContent = `Translation failed: ${data.error || "unknown error"}`;
+            translateBtn.disabled = false;
+            return;
+        }
+        translateStatus.textContent = data.total
+            ? `Translating… ${data.done}/${data.total}`
+            : "Translating…";
+    } catch (err) {
+        console.error("Error checking translation:", err);
+    }
+    setTimeout(() => followTranslation(statusUrl), 1500);
+}
+
 translateBtn.addEventListener("click", async () => {
-    translateStatus.textContent = "Translation is not enabled yet.";
-    return;
+    if (!detailConfig.translateEnabled) {
+        translateStatus.textContent = "Translation is not enabled yet.";
+        return;
+    }
+    translateBtn.disabled = true;
+    translateStatus.textContent = "Starting translation…";
+    try {
+        const res = await fetch(detailConfig.translateUrl, {
+            method: "POST",
+            headers: { "X-CSRFToken": csrfToken || "" },
+        });
+        const data = await res.json();
+        if (!res.ok) throw new Error(data.error || res.statusText);
+        followTranslation(data.status_url);
+    } catch (err) {
+        translateStatus.textContent = `Translation failed: ${err.message}`;
+        translateBtn.disabled = false;
+    }
 });
 
 // ======================
@@ -354,6 +415,20 @@ audio?.addEventListener("timeupdate", () => {
     });
 });
 
+// Opened from a search result: start at ?t=<seconds>
+const startAt = parseFloat(new URLSearchParams(window.location.search).get("t"));
+if (audio && !Number.isNaN(startAt)) {
+    const seekToStart = () => {
+        audio.currentTime = Math.min(startAt, audio.duration || Infinity);
+        updateActiveSegment();
+    };
+    if (audio.readyState >= 1) {
+        seekToStart();
+    } else {
+        audio.addEventListener("loadedmetadata", seekToStart, { once: true });
+    }
+}
+
 jumpPrev.addEventListener("click", () => jumpToMatch(-1));
 jumpNext.addEventListener("click", () => jumpToMatch(1));
 
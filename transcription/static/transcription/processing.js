@@ -78,8 +78,7 @@ function tick(card) {
     }
 }
 
-async function pollOne(card) {
-    const id = card.dataset.transcriptionId;
+function applyStatus(card, data) {
     const statusText = card.querySelector(".status-text");
     const statusBadge = card.querySelector(".status-badge");
     const progressBar = card.querySelector(".progress-bar");
@@ -92,117 +91,120 @@ async function pollOne(card) {
     const elapsedText = card.querySelector(".elapsed-text");
     const stageText = card.querySelector(".stage-text");
 
-    try {
-        const res = await fetch(`/transcription/${id}/status/`);
-        const data = await res.json();
+    if (data.file_name) {
+        const fileNameEl = card.querySelector("p.font-semibold");
+        if (fileNameEl) fileNameEl.textContent = data.file_name;
+    }
+    if (data.uploaded_at && !card.dataset.uploadedAt) {
+        card.dataset.uploadedAt = data.uploaded_at;
+    }
+    if (data.status) {
+        card.dataset.status = data.status;
+    }
+
+    if (data.status === "done") {
+        progressBar.style.width = "100%";
+        progressText.textContent = "100%";
+        statusText.textContent = "Processing Complete!";
+        statusBadge.textContent = "Done";
+        statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-green-100 text-green-700";
+        progressBar.className = "progress-bar bg-green-500 h-4 rounded-full w-0 transition-all";
+        viewLink.classList.remove("hidden");
+        if (cancelBtn) cancelBtn.classList.add("hidden");
+        if (retryBtn) retryBtn.classList.add("hidden");
+        if (errorText) errorText.classList.add("hidden");
+        if (etaText) etaText.classList.add("hidden");
+        if (elapsedText) elapsedText.classList.add("hidden");
+        if (stageText) stageText.classList.add("hidden");
+        if (hideFinished) card.classList.add("hidden");
 
-        if (data.file_name) {
-            const fileNameEl = card.querySelector("p.font-semibold");
-            if (fileNameEl) fileNameEl.textContent = data.file_name;
+        if (!isMulti) {
+            setTimeout(() => (window.location.href = data.redirect_url), 500);
+            return;
         }
-        if (data.uploaded_at && !card.dataset.uploadedAt) {
-            card.dataset.uploadedAt = data.uploaded_at;
+    } else if (data.status === "cancelled") {
+        statusText.textContent = "Cancelled";
+        statusBadge.textContent = "Cancelled";
+        statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-gray-200 text-gray-700";
+        progressBar.className = "progress-bar bg-gray-300 h-4 rounded-full w-0 transition-all";
+        if (cancelBtn) cancelBtn.classList.add("hidden");
+        if (retryBtn) retryBtn.classList.remove("hidden");
+        if (errorText) errorText.classList.add("hidden");
+        if (etaText) etaText.classList.add("hidden");
+        if (elapsedText) elapsedText.classList.add("hidden");
+        if (stageText) stageText.classList.add("hidden");
+        if (hideFinished) card.classList.add("hidden");
+    } else if (data.status === "error") {
+        statusText.textContent = "Error";
+        statusBadge.textContent = "Error";
+        statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-red-100 text-red-700";
+        progressBar.className = "progress-bar bg-red-500 h-4 rounded-full w-0 transition-all";
+        if (cancelBtn) cancelBtn.classList.add("hidden");
+        if (retryBtn) retryBtn.classList.remove("hidden");
+        if (errorText) {
+            errorText.textContent = data.error_message || "An unexpected error occurred.";
+            errorText.classList.remove("hidden");
         }
-        if (data.status) {
-            card.dataset.status = data.status;
+        if (etaText) etaText.classList.add("hidden");
+        if (elapsedText) elapsedText.classList.add("hidden");
+        if (stageText) stageText.classList.add("hidden");
+        if (hideFinished) card.classList.add("hidden");
+    } else {
+        const realProgress = Math.min(Number(data.progress || 0), 99);
+        if (realProgress > 0) {
+            smoothToward(card, realProgress);
+        } else {
+            tick(card);
         }
+        statusText.textContent = "Processing your audio...";
+        statusBadge.textContent = "Processing";
+        statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-blue-100 text-blue-700";
+        progressBar.className = "progress-bar bg-blue-600 h-4 rounded-full w-0 transition-all";
+        if (retryBtn) retryBtn.classList.add("hidden");
+        if (errorText) errorText.classList.add("hidden");
+        card.classList.remove("hidden");
 
-        if (data.status === "done") {
-            progressBar.style.width = "100%";
-            progressText.textContent = "100%";
-            statusText.textContent = "Processing Complete!";
-            statusBadge.textContent = "Done";
-            statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-green-100 text-green-700";
-            progressBar.className = "progress-bar bg-green-500 h-4 rounded-full w-0 transition-all";
-            viewLink.classList.remove("hidden");
-            if (cancelBtn) cancelBtn.classList.add("hidden");
-            if (retryBtn) retryBtn.classList.add("hidden");
-            if (errorText) errorText.classList.add("hidden");
-            if (etaText) etaText.classList.add("hidden");
-            if (elapsedText) elapsedText.classList.add("hidden");
-            if (stageText) stageText.classList.add("hidden");
-            if (hideFinished) card.classList.add("hidden");
-
-            if (!isMulti) {
-                setTimeout(() => (window.location.href = data.redirect_url), 500);
-                return;
-            }
-        } else if (data.status === "cancelled") {
-            statusText.textContent = "Cancelled";
-            statusBadge.textContent = "Cancelled";
-            statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-gray-200 text-gray-700";
-            progressBar.className = "progress-bar bg-gray-300 h-4 rounded-full w-0 transition-all";
-            if (cancelBtn) cancelBtn.classList.add("hidden");
-            if (retryBtn) retryBtn.classList.remove("hidden");
-            if (errorText) errorText.classList.add("hidden");
-            if (etaText) etaText.classList.add("hidden");
-            if (elapsedText) elapsedText.classList.add("hidden");
-            if (stageText) stageText.classList.add("hidden");
-            if (hideFinished) card.classList.add("hidden");
-        } else if (data.status === "error") {
-            statusText.textContent = "Error";
-            statusBadge.textContent = "Error";
-            statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-red-100 text-red-700";
-            progressBar.className = "progress-bar bg-red-500 h-4 rounded-full w-0 transition-all";
-            if (cancelBtn) cancelBtn.classList.add("hidden");
-            if (retryBtn) retryBtn.classList.remove("hidden");
-            if (errorText) {
-                errorText.textContent = data.error_message || "An unexpected error occurred.";
-                errorText.classList.remove("hidden");
-            }
-            if (etaText) etaText.classList.add("hidden");
-            if (elapsedText) elapsedText.classList.add("hidden");
-            if (stageText) stageText.classList.add("hidden");
-            if (hideFinished) card.classList.add("hidden");
+        if (data.current_stage) {
+            stageText.textContent = data.current_stage.replace(/_/g, " ");
+            stageText.classList.remove("hidden");
         } else {
-            const realProgress = Math.min(Number(data.progress || 0), 99);
-            if (realProgress > 0) {
-                smoothToward(card, realProgress);
-            } else {
-                tick(card);
-            }
-            statusText.textContent = "Processing your audio...";
-            statusBadge.textContent = "Processing";
-            statusBadge.className = "status-badge text-xs font-semibold px-2 py-1 rounded bg-blue-100 text-blue-700";
-            progressBar.className = "progress-bar bg-blue-600 h-4 rounded-full w-0 transition-all";
-            if (retryBtn) retryBtn.classList.add("hidden");
-            if (errorText) errorText.classList.add("hidden");
-            card.classList.remove("hidden");
+            stageText.classList.add("hidden");
+        }
 
-            if (data.current_stage) {
-                stageText.textContent = data.current_stage.replace(/_/g, " ");
-                stageText.classList.remove("hidden");
-            } else {
-                stageText.classList.add("hidden");
+        if (data.progress && data.progress > 0) {
+            if (!card.dataset.startedAt) {
+                card.dataset.startedAt = String(Date.now());
             }
-
-            if (data.progress && data.progress > 0) {
-                if (!card.dataset.startedAt) {
-                    card.dataset.startedAt = String(Date.now());
-                }
-                const elapsedMs = Date.now() - (Number(card.dataset.startedAt) || Date.now());
-                const remainingPct = Math.max(0, 100 - Number(data.progress));
-                const etaMs = remainingPct > 0 ? (elapsedMs * (remainingPct / Number(data.progress))) : 0;
-                if (etaMs > 0) {
-                    const etaMin = Math.max(1, Math.round(etaMs / 60000));
-                    etaText.textContent = `Estimated time remaining: ${etaMin} min`;
-                    etaText.classList.remove("hidden");
-                } else {
-                    etaText.classList.add("hidden");
-                }
+            const elapsedMs = Date.now() - (Number(card.dataset.startedAt) || Date.now());
+            const remainingPct = Math.max(0, 100 - Number(data.progress));
+            const etaMs = remainingPct > 0 ? (elapsedMs * (remainingPct / Number(data.progress))) : 0;
+            if (etaMs > 0) {
+                const etaMin = Math.max(1, Math.round(etaMs / 60000));
+                etaText.textContent = `Estimated time remaining: ${etaMin} min`;
+                etaText.classList.remove("hidden");
             } else {
                 etaText.classList.add("hidden");
             }
+        } else {
+            etaText.classList.add("hidden");
+        }
 
-            if (card.dataset.uploadedAt) {
-                const elapsedMs = Date.now() - Date.parse(card.dataset.uploadedAt);
-                const elapsedMin = Math.max(1, Math.round(elapsedMs / 60000));
-                elapsedText.textContent = `Elapsed: ${elapsedMin} min`;
-                elapsedText.classList.remove("hidden");
-            } else {
-                elapsedText.classList.add("hidden");
-            }
+        if (card.dataset.uploadedAt) {
+            const elapsedMs = Date.now() - Date.parse(card.dataset.uploadedAt);
+            const elapsedMin = Math.max(1, Math.round(elapsedMs / 60000));
+            elapsedText.textContent = `Elapsed: ${elapsedMin} min`;
+            elapsedText.classList.remove("hidden");
+        } else {
+            elapsedText.classList.add("hidden");
         }
+    }
+}
+
+async function pollOne(card) {
+    const id = card.dataset.transcriptionId;
+    try {
+        const res = await fetch(`/transcription/${id}/status/`);
+        applyStatus(card, await res.json());
     } catch (err) {
         console.error("Error polling status:", err);
     } finally {
@@ -211,7 +213,57 @@ async function pollOne(card) {
     }
 }
 
-cards.forEach(card => pollOne(card));
+const finishedStatuses = ["done", "error", "cancelled"];
+// A server that buffers responses (plain WSGI) never delivers the first event
+const firstEventTimeout = 5000;
+
+function streamOne(card) {
+    // Polling never stops once started, so it already covers this card
+    if (card.dataset.live === "poll") return;
+    if (!window.EventSource) {
+        card.dataset.live = "poll";
+        pollOne(card);
+        return;
+    }
+
+    const id = card.dataset.transcriptionId;
+    const source = new EventSource(`/transcription/${id}/events/`);
+    let lastData = null;
+    let fellBack = false;
+
+    // Keep the simulated progress, ETA and elapsed time moving between events
+    const ticker = setInterval(() => {
+        if (lastData && !finishedStatuses.includes(lastData.status)) applyStatus(card, lastData);
+    }, 1000);
+
+    const stop = () => {
+        source.close();
+        clearInterval(ticker);
+        clearTimeout(firstEventTimer);
+    };
+    const fallBack = () => {
+        if (fellBack) return;
+        fellBack = true;
+        stop();
+        card.dataset.live = "poll";
+        pollOne(card);
+    };
+    const firstEventTimer = setTimeout(fallBack, firstEventTimeout);
+
+    source.onmessage = (e) => {
+        clearTimeout(firstEventTimer);
+        lastData = JSON.parse(e.data);
+        applyStatus(card, lastData);
+        if (finishedStatuses.includes(lastData.status)) stop();
+    };
+    source.addEventListener("fallback", fallBack);
+    source.onerror = () => {
+        // The browser reconnects by itself unless the server refused the stream
+        if (source.readyState === EventSource.CLOSED) fallBack();
+    };
+}
+
+cards.forEach(card => streamOne(card));
 
 function reorderCards() {
     const container = document.querySelector(".space-y-4");
@@ -271,6 +323,9 @@ document.querySelectorAll(".retry-btn").forEach(btn => {
                             "X-CSRFToken": csrfToken || "",
                         },
                     });
+                    // The stream closed when the job finished; follow the new run
+                    const card = btn.closest("[data-transcription-id]");
+                    if (card) streamOne(card);
                 } catch (err) {
                     console.error("Error retrying transcription:", err);
                 }
@@ -294,6 +349,7 @@ retryAllBtn?.addEventListener("click", async () => {
                             "X-CSRFToken": csrfToken || "",
                         },
                     });
+                    streamOne(card);
                 } catch (err) {
                     console.error("Error retrying transcription:", err);
                 }
@@ -1,8 +1,13 @@
 from celery import shared_task
 from django.db import transaction
 from django.apps import apps
+from django.db.models import F
 from .services.process_transcription import process_transcription
 from .services.cancel import cancel_transcription
+from .services.llm_normalizer import llm_normalize_batch
+from .services import search_index
+from .services import status_counts
+from .services.export_cache import prerender_exports
 
 
 @shared_task(
@@ -22,6 +27,7 @@ def process_transcription_task(self, transcription_id, fast_mode=True):
                 status="ERROR",
                 error_message=str(exc),
             )
+        status_counts.invalidate()
         raise
 
 
@@ -31,3 +37,39 @@ def cancel_transcription_task(self, transcription_id):
 
     Transcription = apps.get_model("transcription", "Transcription")
     Transcription.objects.filter(id=transcription_id).update(status="CANCELLED")
+    status_counts.invalidate()
+
+
+@shared_task(bind=True)
+def translate_transcription_task(self, transcription_id):
+    """
+    Normalize every segment's English with the LLM, reporting progress as
+    PROGRESS state with {"done", "total"} distinct texts.
+    """
+    Segment = apps.get_model("transcription", "Segment")
+    segments = list(Segment.objects.filter(transcription_id=transcription_id).only("id", "original", "english"))
+
+    def report(done, total):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta={"done": done, "total": total})
+
+    normalized = llm_normalize_batch(
+        [seg.english or seg.original or "" for seg in segments],
+        progress_callback=report,
+    )
+    for seg, english in zip(segments, normalized):
+        seg.english = english
+    Segment.objects.bulk_update(segments, ["english"])
+    Transcription = apps.get_model("transcription", "Transcription")
+    Transcription.objects.filter(id=transcription_id).update(content_version=F("content_version") + 1)
+    search_index.index_transcription(transcription_id)
+
+    return {"segments": len(segments)}
+
+
+@shared_task
+def prerender_exports_task(transcription_id, content_version):
+    """
+    Render a finished transcription's default exports into the export cache.
+    """
+    return prerender_exports(transcription_id, content_version)
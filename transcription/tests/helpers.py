@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from django.test import override_settings
+
+
+class TempMediaMixin:
+    """
+    Gives each test its own empty MEDIA_ROOT (self.media_root), with the
+    transcript and export caches inside it, removed again afterwards.
+    """
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        patch = override_settings(
+            MEDIA_ROOT=media.name,
+            TRANSCRIBE_CACHE_DIR=os.path.join(media.name, "cache", "transcripts"),
+            EXPORT_CACHE_DIR=os.path.join(media.name, "cache", "exports"),
+        )
+        patch.enable()
+        self.addCleanup(patch.disable)
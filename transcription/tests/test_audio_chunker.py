@@ -0,0 +1,80 @@
+import os
+import struct
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from transcription.services.audio_chunker import (
+    SAMPLE_RATE,
+    iter_pcm_chunks,
+    plan_chunk_boundaries,
+    read_pcm,
+)
+
+
+def write_wav(path, samples, extra_chunk=b""):
+    """
+    Write 16 kHz mono s16le samples, optionally with a chunk before "data"
+    the way ffmpeg writes a LIST chunk.
+    """
+    data = np.asarray(samples, dtype="<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra_chunk
+    body += b"data" + struct.pack("<I", len(data)) + data
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+class PcmChunkingTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        tmp.close()
+        self.path = tmp.name
+        self.addCleanup(os.remove, self.path)
+
+    def test_read_pcm_skips_extra_chunks(self):
+        info = b"ISFT" + struct.pack("<I", 3) + b"ffm\x00"
+        extra = b"LIST" + struct.pack("<I", len(info)) + info
+        write_wav(self.path, [0, 1000, -1000, 32767], extra_chunk=extra)
+
+        samples = read_pcm(self.path)
+
+        self.assertEqual(samples.tolist(), [0, 1000, -1000, 32767])
+
+    def test_pcm_chunks_follow_boundaries(self):
+        write_wav(self.path, np.arange(3 * SAMPLE_RATE) % 1000)
+
+        boundaries = [(0, SAMPLE_RATE), (SAMPLE_RATE, 3 * SAMPLE_RATE)]
+        chunks = [chunk.load() for chunk in iter_pcm_chunks(self.path, boundaries)]
+
+        self.assertEqual([len(c) for c in chunks], [SAMPLE_RATE, 2 * SAMPLE_RATE])
+        self.assertEqual(chunks[0].dtype, np.float32)
+        self.assertAlmostEqual(float(chunks[1][0]), (SAMPLE_RATE % 1000) / 32768.0)
+
+
+class ChunkBoundaryTests(SimpleTestCase):
+    def speech(self, seconds):
+        rng = np.random.default_rng(0)
+        return rng.integers(-10000, 10000, int(seconds * SAMPLE_RATE)).astype("<i2")
+
+    def test_cut_moves_to_nearest_pause(self):
+        samples = self.speech(10)
+        samples[int(5.5 * SAMPLE_RATE):int(6.5 * SAMPLE_RATE)] = 0
+
+        boundaries = plan_chunk_boundaries(samples, chunk_length=5, tolerance=2)
+
+        # Chunks meet in the middle of the pause, with no overlap
+        self.assertEqual(boundaries, [(0, 6 * SAMPLE_RATE), (6 * SAMPLE_RATE, 10 * SAMPLE_RATE)])
+
+    def test_falls_back_to_fixed_cut_with_overlap(self):
+        samples = self.speech(9)
+
+        boundaries = plan_chunk_boundaries(samples, chunk_length=5, overlap=1, tolerance=2)
+
+        self.assertEqual(boundaries, [(0, 5 * SAMPLE_RATE), (4 * SAMPLE_RATE, 9 * SAMPLE_RATE)])
+
+    def test_short_audio_is_one_chunk(self):
+        samples = self.speech(3)
+
+        self.assertEqual(plan_chunk_boundaries(samples, chunk_length=5), [(0, 3 * SAMPLE_RATE)])
@@ -0,0 +1,104 @@
+import os
+import mimetypes
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from transcription.models import Transcription
+from transcription.services.audio_serving import parse_range_header
+from transcription.tests.helpers import TempMediaMixin
+
+AUDIO = bytes(range(256)) * 40
+WAV_TYPE = mimetypes.guess_type("interview.wav")[0]
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_single_open_and_suffix_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), [(0, 99)])
+        self.assertEqual(parse_range_header("bytes=900-", 1000), [(900, 999)])
+        self.assertEqual(parse_range_header("bytes=-500", 1000), [(500, 999)])
+        self.assertEqual(parse_range_header("bytes=-5000", 1000), [(0, 999)])
+        self.assertEqual(parse_range_header("bytes=990-2000", 1000), [(990, 999)])
+
+    def test_multiple_ranges_are_sorted_and_merged(self):
+        self.assertEqual(
+            parse_range_header("bytes=500-599, 0-9, 10-19, 550-700", 1000),
+            [(0, 19), (500, 700)],
+        )
+
+    def test_unsatisfiable_and_ignored_headers(self):
+        self.assertEqual(parse_range_header("bytes=1000-", 1000), [])
+        self.assertEqual(parse_range_header("bytes=-0", 1000), [])
+        for header in ("", "items=0-1", "bytes=5-1", "bytes=a-b", "bytes=-", "bytes=1-2-3"):
+            self.assertIsNone(parse_range_header(header, 1000), header)
+        self.assertIsNone(parse_range_header("bytes=" + ",".join(f"{i * 10}-{i * 10}" for i in range(20)), 1000))
+
+
+class TranscriptionAudioTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.media_root, "audio"))
+        with open(os.path.join(self.media_root, "audio", "interview.wav"), "wb") as f:
+            f.write(AUDIO)
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        self.url = reverse("transcription:transcription_audio", args=[transcription.id])
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(AUDIO)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), AUDIO)
+
+    def test_suffix_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-500")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes {len(AUDIO) - 500}-{len(AUDIO) - 1}/{len(AUDIO)}")
+        self.assertEqual(response["Content-Length"], "500")
+        self.assertEqual(b"".join(response.streaming_content), AUDIO[-500:])
+
+    def test_multiple_ranges_are_multipart(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9,100-119")
+        body = b"".join(response.streaming_content)
+        boundary = response["Content-Type"].split("boundary=")[1]
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Length"], str(len(body)))
+        self.assertEqual(
+            body,
+            f"--{boundary}\r\nContent-Type: {WAV_TYPE}\r\nContent-Range: bytes 0-9/{len(AUDIO)}\r\n\r\n".encode()
+            + AUDIO[0:10]
+            + f"\r\n--{boundary}\r\nContent-Type: {WAV_TYPE}\r\nContent-Range: bytes 100-119/{len(AUDIO)}\r\n\r\n".encode()
+            + AUDIO[100:120]
+            + f"\r\n--{boundary}--\r\n".encode(),
+        )
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(AUDIO)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(AUDIO)}")
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.url)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+        current = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=first["ETag"])
+        changed = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"older"')
+        old_date = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=http_date(0))
+        self.assertEqual(current.status_code, 206)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(old_date.status_code, 200)
+
+    @override_settings(AUDIO_SENDFILE_HEADER="X-Accel-Redirect", AUDIO_ACCEL_REDIRECT_PREFIX="/protected-media/")
+    def test_proxy_offload(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/audio/interview.wav")
+        self.assertEqual(response.content, b"")
@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from transcription.models import Transcription
+from transcription.services import status_counts
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.delete(status_counts.CACHE_KEY)
+        self.addCleanup(cache.delete, status_counts.CACHE_KEY)
+        for status in ("PROCESSING", "UPLOADED", "DONE", "DONE", "ERROR"):
+            Transcription.objects.create(audio_file=f"audio/{status.lower()}.wav", status=status)
+
+    def test_counts_come_from_one_grouped_query_then_the_cache(self):
+        with self.assertNumQueries(1):
+            stats = status_counts.dashboard_stats()
+        with self.assertNumQueries(0):
+            status_counts.dashboard_stats()
+
+        self.assertEqual(stats, {"active": 2, "done": 2, "error": 1, "cancelled": 0})
+
+    def test_status_transitions_invalidate_the_counts(self):
+        status_counts.dashboard_stats()
+        processing = Transcription.objects.get(status="PROCESSING")
+
+        with mock.patch("transcription.views.cancel_transcription_task"):
+            self.client.post(reverse("transcription:cancel_transcription", args=[processing.id]))
+
+        self.assertEqual(status_counts.dashboard_stats()["cancelled"], 1)
+
+    @override_settings(DASHBOARD_STATS_CACHE_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        status_counts.dashboard_stats()
+
+        self.assertIsNone(cache.get(status_counts.CACHE_KEY))
+
+    def test_dashboard_loads_only_the_card_columns(self):
+        # Grouped counts plus the active rows
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("transcription:processing_dashboard"))
+
+        cards = response.context["processing_list"]
+        self.assertEqual(len(cards), 2)
+        self.assertIn("status", cards[0].get_deferred_fields())
+        self.assertEqual(response.context["stats"]["done"], 2)
@@ -0,0 +1,133 @@
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from transcription.services import diarizer
+from transcription.services.audio_chunker import SAMPLE_RATE
+from transcription.services.interview_intelligence import assign_speakers
+
+
+def voice(seed, noise=0.0, rng=None):
+    """
+    A 64-dim speaker embedding, slightly perturbed per chunk.
+    """
+    base = np.random.default_rng(seed).normal(size=64)
+    if noise:
+        base = base + (rng or np.random.default_rng(seed + 100)).normal(scale=noise, size=64)
+    return base
+
+
+class SpeakerStitchingTests(SimpleTestCase):
+    def test_chunk_local_labels_become_global_speakers(self):
+        interviewer, guest = voice(1), voice(2)
+        # pyannote numbers speakers per chunk, so the labels swap in chunk 1
+        results = [
+            {
+                "index": 0,
+                "tracks": [(0.0, 4.0, "SPEAKER_00"), (4.5, 9.0, "SPEAKER_01")],
+                "embeddings": {"SPEAKER_00": interviewer, "SPEAKER_01": guest},
+            },
+            {
+                "index": 1,
+                "tracks": [(10.0, 14.0, "SPEAKER_00"), (14.5, 19.0, "SPEAKER_01")],
+                "embeddings": {"SPEAKER_00": voice(2, 0.1), "SPEAKER_01": voice(1, 0.1)},
+            },
+        ]
+
+        segments = diarizer.stitch_speakers(results)
+
+        self.assertEqual(
+            [seg["speaker"] for seg in segments],
+            ["SPEAKER_00", "SPEAKER_01", "SPEAKER_01", "SPEAKER_00"],
+        )
+
+    def test_speakers_of_one_chunk_are_never_merged(self):
+        similar = voice(3)
+        results = [{
+            "index": 0,
+            "tracks": [(0.0, 1.0, "A"), (1.5, 2.0, "B")],
+            "embeddings": {"A": similar, "B": voice(3, 0.01)},
+        }]
+
+        self.assertEqual(len(set(diarizer.cluster_speakers(results).values())), 2)
+
+    def test_consecutive_turns_of_a_speaker_are_merged(self):
+        results = [{
+            "index": 0,
+            "tracks": [(0.0, 2.0, "A"), (1.5, 3.0, "A"), (5.0, 6.0, "B")],
+            "embeddings": {"A": voice(1)},
+        }]
+
+        self.assertEqual(
+            diarizer.stitch_speakers(results),
+            [
+                {"start": 0.0, "end": 3.0, "speaker": "SPEAKER_00"},
+                {"start": 5.0, "end": 6.0, "speaker": "SPEAKER_01"},
+            ],
+        )
+
+    def test_many_chunks_keep_a_stable_speaker_count(self):
+        rng = np.random.default_rng(0)
+        results = [
+            {
+                "index": i,
+                "tracks": [(i * 600.0, i * 600.0 + 10, "SPEAKER_00"), (i * 600.0 + 20, i * 600.0 + 30, "SPEAKER_01")],
+                "embeddings": {"SPEAKER_00": voice(1, 0.2, rng), "SPEAKER_01": voice(2, 0.2, rng)},
+            }
+            for i in range(18)
+        ]
+
+        speakers = {seg["speaker"] for seg in diarizer.stitch_speakers(results)}
+
+        self.assertEqual(speakers, {"SPEAKER_00", "SPEAKER_01"})
+
+
+class DiarizeAudioLocalTests(SimpleTestCase):
+    def test_chunks_are_diarized_from_the_normalized_wav(self):
+        samples = np.zeros(25 * SAMPLE_RATE, dtype="<i2")
+        seen = []
+
+        def fake_diarize(pipeline, chunk):
+            seen.append((chunk.in_memory, chunk.start))
+            return {"index": chunk.index, "tracks": [(chunk.start, chunk.start + 1, "S")], "embeddings": {"S": voice(1)}}
+
+        with mock.patch.object(diarizer, "read_pcm", return_value=samples), \
+                mock.patch.object(diarizer, "get_pipeline"), \
+                mock.patch.object(diarizer, "diarize_chunk", side_effect=fake_diarize):
+            segments = diarizer.diarize_audio_local(
+                "interview.m4a", chunk_length=10, workers=1, normalized_path="interview_normalized.wav"
+            )
+
+        # Cut at pauses like transcription chunks, read straight from the memory-mapped wav
+        self.assertEqual(len(seen), 3)
+        self.assertTrue(all(in_memory for in_memory, _start in seen))
+        self.assertEqual({seg["speaker"] for seg in segments}, {"SPEAKER_00"})
+
+
+class AssignSpeakersTests(SimpleTestCase):
+    def test_segment_gets_speaker_with_most_overlap(self):
+        turns = [
+            {"start": 5.0, "end": 9.0, "speaker": "SPEAKER_01"},
+            {"start": 0.0, "end": 5.0, "speaker": "SPEAKER_00"},
+            {"start": 9.0, "end": 9.2, "speaker": "SPEAKER_00"},
+            {"start": 9.3, "end": 9.6, "speaker": "SPEAKER_00"},
+        ]
+        segments = [
+            {"start": 4.0, "end": 8.0},
+            {"start": 0.5, "end": 2.0},
+            # 0.4 s of SPEAKER_01 against 0.2 s + 0.3 s of SPEAKER_00
+            {"start": 8.6, "end": 9.7},
+            {"start": 12.0, "end": 13.0},
+        ]
+
+        self.assertEqual(
+            assign_speakers(segments, turns),
+            ["SPEAKER_01", "SPEAKER_00", "SPEAKER_00", None],
+        )
+
+    def test_nested_segments_still_see_earlier_turns(self):
+        turns = [{"start": 0.0, "end": 1.0, "speaker": "A"}, {"start": 2.0, "end": 10.0, "speaker": "B"}]
+        segments = [{"start": 0.0, "end": 10.0}, {"start": 0.2, "end": 0.8}]
+
+        self.assertEqual(assign_speakers(segments, turns), ["B", "A"])
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from transcription.services import disk_cache
+from transcription.services.disk_cache import DiskCache
+
+
+class DiskCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        cache = DiskCache(self.directory, max_bytes=1024)
+        cache.put_json("ab12", [{"start": 0.5, "original": "I na know"}])
+
+        self.assertEqual(cache.get_json("ab12"), [{"start": 0.5, "original": "I na know"}])
+        self.assertIsNone(cache.get_json("cd34"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = DiskCache(self.directory, max_bytes=250)
+        cache.put_bytes("aa", b"x" * 100)
+        cache.put_bytes("bb", b"x" * 100)
+        os.utime(cache.path_for("aa"), (1, 1))
+        os.utime(cache.path_for("bb"), (2, 2))
+
+        # Reading "aa" makes "bb" the least recently used entry
+        cache.get_bytes("aa")
+        cache.put_bytes("cc", b"x" * 100)
+
+        self.assertIsNotNone(cache.get_bytes("aa"))
+        self.assertIsNone(cache.get_bytes("bb"))
+        self.assertIsNotNone(cache.get_bytes("cc"))
+
+    def test_puts_only_walk_the_directory_when_over_the_limit(self):
+        cache = DiskCache(self.directory, max_bytes=1000)
+        with mock.patch.object(disk_cache.os, "walk", wraps=os.walk) as walk:
+            for i in range(8):
+                DiskCache(self.directory, max_bytes=1000).put_bytes(f"k{i}", b"x" * 100)
+            # Counted once for the directory, shared by every instance
+            self.assertEqual(walk.call_count, 1)
+
+            cache.delete("k0")
+            cache.put_bytes("k8", b"x" * 100)
+            cache.put_bytes("k9", b"x" * 100)
+            cache.put_bytes("k10", b"x" * 100)
+            self.assertEqual(walk.call_count, 1)
+
+            os.utime(cache.path_for("k1"), (1, 1))
+            cache.put_bytes("k11", b"x" * 100)
+            self.assertEqual(walk.call_count, 2)
+
+        self.assertIsNone(cache.get_bytes("k1"))
+        self.assertIsNotNone(cache.get_bytes("k11"))
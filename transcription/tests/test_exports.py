@@ -0,0 +1,256 @@
+import io
+import json
+import random
+import zipfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from transcription.exports.manager import ExportManager
+from transcription.exports.pdf import PdfExporter
+from transcription.exports.utils import format_timestamp
+from transcription.models import Segment, Transcription
+from transcription.services import bulk_export, export_cache
+from transcription.tests.helpers import TempMediaMixin
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.5, "speaker": "P1", "english": "How is the family?"},
+    {"start": 3661.25, "end": 3663.0, "speaker": "P2", "english": "The family is fine."},
+]
+
+
+class ExporterTests(SimpleTestCase):
+    def test_timestamps_have_milliseconds(self):
+        self.assertEqual(format_timestamp(3661.25), "01:01:01.250")
+        self.assertEqual(format_timestamp(59.9996, ","), "00:01:00,000")
+
+    def test_vtt(self):
+        document = ExportManager.get_exporter("vtt").export(SEGMENTS, {"include_speakers": True}).decode("utf-8")
+
+        self.assertEqual(
+            document,
+            "WEBVTT\n\n"
+            "00:00:00.000 --> 00:00:02.500\n<v P1>How is the family?\n\n"
+            "01:01:01.250 --> 01:01:03.000\n<v P2>The family is fine.\n\n",
+        )
+
+    def test_vtt_escapes_cue_text(self):
+        segments = [{"start": 0.0, "end": 1.0, "speaker": "P1", "english": "Rice & <b>soup</b> --> market"}]
+        document = ExportManager.get_exporter("vtt").export(segments, {}).decode("utf-8")
+
+        self.assertIn("\nRice &amp; &lt;b&gt;soup&lt;/b&gt; --&gt; market\n", document)
+
+    def test_srt_uses_comma_milliseconds(self):
+        document = ExportManager.get_exporter("srt").export(SEGMENTS, {}).decode("utf-8")
+
+        self.assertTrue(document.startswith("1\n00:00:00,000 --> 00:00:02,500\nHow is the family?\n\n2\n"))
+
+    def test_txt_is_unchanged(self):
+        document = ExportManager.get_exporter("txt").export(SEGMENTS, {"include_speakers": True})
+
+        self.assertEqual(document, b"P1: How is the family?\nP2: The family is fine.")
+
+    def test_text_formats_stream_bounded_chunks_from_a_generator(self):
+        exporter = ExportManager.get_exporter("txt")
+        segments = ({"start": i, "end": i + 1, "speaker": "P1", "english": "word " * 20} for i in range(50_000))
+
+        sizes = [len(chunk) for chunk in exporter.iter_export(segments, {})]
+
+        self.assertGreater(len(sizes), 50)
+        self.assertLess(max(sizes), exporter.chunk_size + 200)
+
+
+class ExportViewTests(TestCase):
+    def test_text_exports_stream_from_segment_rows(self):
+        transcription = Transcription.objects.create(audio_file="audio/my interview.m4a")
+        Segment.objects.bulk_create(
+            Segment(transcription=transcription, start=i, end=i + 1, speaker="P1", english=f"line {i}")
+            for i in range(3)
+        )
+
+        response = self.client.get(reverse("transcription:export_transcript", args=[transcription.id]), {"format": "vtt"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/vtt; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="my_interview.vtt"')
+        body = b"".join(response.streaming_content).decode("utf-8")
+        self.assertIn("00:00:02.000 --> 00:00:03.000\nline 2\n", body)
+
+
+@override_settings(EXPORT_CACHE_MAX_BYTES=10 * 1024 ** 2)
+class ExportCacheTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transcription = Transcription.objects.create(audio_file="audio/interview.wav", status="DONE")
+        Segment.objects.create(transcription=self.transcription, start=0, end=1, speaker="P1", original="i na know",
+                               english="I do not know")
+        self.url = reverse("transcription:export_transcript", args=[self.transcription.id])
+
+    def test_repeat_download_is_not_modified(self):
+        first = self.client.get(self.url, {"format": "txt"})
+        repeat = self.client.get(self.url, {"format": "txt"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        other_options = self.client.get(self.url, {"format": "txt", "speakers": "1"}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(other_options.status_code, 200)
+
+    def test_pdf_is_rendered_once_per_content_version(self):
+        with mock.patch.object(PdfExporter, "export", autospec=True, side_effect=lambda *a: b"%PDF-1") as render:
+            first = self.client.get(self.url, {"format": "pdf"})
+            cached = self.client.get(self.url, {"format": "pdf"})
+            self.assertEqual(b"".join(cached.streaming_content), b"%PDF-1")
+            self.assertEqual(render.call_count, 1)
+
+            self.client.post(
+                reverse("transcription:save_segment", args=[self.transcription.id]),
+                json.dumps({"index": 0, "field": "english", "value": "I don't know"}),
+                content_type="application/json",
+            )
+            edited = self.client.get(self.url, {"format": "pdf"}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(edited.status_code, 200)
+        self.assertNotEqual(edited["ETag"], first["ETag"])
+        self.assertEqual(render.call_count, 2)
+
+    def test_entry_evicted_before_it_is_opened_is_rendered_again(self):
+        evicted = f"{export_cache.get_export_cache().directory}/evicted.pdf"
+        with mock.patch.object(PdfExporter, "export", autospec=True, side_effect=lambda *a: b"%PDF-1") as render, \
+                mock.patch.object(export_cache.DiskCache, "get_path", return_value=evicted):
+            response = self.client.get(self.url, {"format": "pdf"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"%PDF-1")
+        self.assertEqual(render.call_count, 1)
+
+    def test_unfinished_transcriptions_are_not_cached(self):
+        Transcription.objects.filter(pk=self.transcription.pk).update(status="PROCESSING")
+
+        response = self.client.get(self.url, {"format": "txt"})
+
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(EXPORT_CACHE_MAX_BYTES=10 * 1024 ** 2, EXPORT_PRERENDER_FORMATS="pdf,txt")
+class PrerenderTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transcription = Transcription.objects.create(
+            audio_file="audio/interview.wav", status="DONE", segment_count=1, content_version=1
+        )
+        Segment.objects.create(transcription=self.transcription, start=0, end=1, speaker="P1", english="I do not know")
+        self.url = reverse("transcription:export_transcript", args=[self.transcription.id])
+        self.status_url = reverse("transcription:export_status", args=[self.transcription.id])
+
+    def test_queued_render_does_not_hold_up_downloads(self):
+        with mock.patch("transcription.tasks.prerender_exports_task.delay") as delay:
+            export_cache.schedule_prerender(self.transcription)
+        delay.assert_called_once_with(self.transcription.id, 1)
+
+        with mock.patch.object(PdfExporter, "export", return_value=b"%PDF-1") as render:
+            response = self.client.get(self.url, {"format": "pdf"})
+            # The task finds the download's render in the cache
+            self.assertEqual(export_cache.prerender_exports(self.transcription.id, 1), [])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(render.call_count, 1)
+
+    def test_download_waits_for_a_running_render(self):
+        seen = {}
+
+        def render(segments, options):
+            list(segments)
+            seen["pending"] = self.client.get(self.url, {"format": "pdf"})
+            seen["status"] = self.client.get(self.status_url, {"format": "pdf"})
+            seen["text"] = self.client.get(self.url, {"format": "txt"})
+            return b"%PDF-1"
+
+        with mock.patch.object(PdfExporter, "export", side_effect=render) as exporter:
+            export_cache.prerender_exports(self.transcription.id, 1)
+        self.assertEqual(exporter.call_count, 1)
+
+        self.assertEqual(seen["pending"].status_code, 202)
+        self.assertEqual(seen["pending"].json(), {"state": "rendering", "format": "pdf", "done": 0, "total": 1})
+        self.assertEqual(seen["status"].status_code, 202)
+        self.assertEqual(seen["text"].status_code, 200)
+
+    def test_prerendered_pdf_is_served_from_the_cache(self):
+        with mock.patch.object(PdfExporter, "export", return_value=b"%PDF-1") as render:
+            rendered = export_cache.prerender_exports(self.transcription.id, 1)
+            status = self.client.get(self.status_url, {"format": "pdf"})
+            response = self.client.get(self.url, {"format": "pdf"})
+
+        self.assertEqual(rendered, ["pdf"])
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(status.json(), {"state": "ready"})
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1")
+
+    def test_edited_transcriptions_are_not_prerendered(self):
+        Transcription.objects.filter(pk=self.transcription.pk).update(content_version=2)
+
+        with mock.patch.object(PdfExporter, "export") as render:
+            self.assertEqual(export_cache.prerender_exports(self.transcription.id, 1), [])
+        render.assert_not_called()
+
+    def test_stale_render_markers_are_ignored(self):
+        key = export_cache.export_key(self.transcription.id, 1, "pdf", export_cache.PRERENDER_OPTIONS)
+        export_cache._write_progress(export_cache.get_export_cache(), key, "pdf", 0, 1)
+
+        later = export_cache.time.time() + export_cache.RENDER_STALE_SECONDS + 1
+        with mock.patch.object(export_cache.time, "time", return_value=later), \
+                mock.patch.object(PdfExporter, "export", return_value=b"%PDF-1"):
+            response = self.client.get(self.url, {"format": "pdf"})
+
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(EXPORT_CACHE_MAX_BYTES=10 * 1024 ** 2)
+class BulkExportTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transcriptions = []
+        for i, name in enumerate(["audio/market.wav", "audio/market.m4a", "audio/farm.wav"]):
+            transcription = Transcription.objects.create(audio_file=name, status="DONE")
+            Segment.objects.create(transcription=transcription, start=0, end=1, speaker="P1", english=f"line {i}")
+            self.transcriptions.append(transcription)
+        self.url = reverse("transcription:export_transcriptions_bulk")
+        self.ids = [t.id for t in self.transcriptions]
+
+    def download(self, **fields):
+        response = self.client.post(self.url, {"selected_ids": self.ids, **fields})
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_text_exports_are_zipped_with_unique_names(self):
+        archive = self.download(format="txt")
+
+        self.assertEqual(archive.namelist(), ["market.txt", "market_2.txt", "farm.txt"])
+        self.assertEqual(archive.read("farm.txt"), b"line 2")
+
+    def test_invalid_and_unknown_ids_are_dropped(self):
+        self.ids = ["abc", "", "99999", str(self.ids[2])]
+        self.assertEqual(self.download(format="txt").namelist(), ["farm.txt"])
+
+        response = self.client.post(self.url, {"selected_ids": ["abc", "99999"], "format": "txt"})
+        self.assertRedirects(response, reverse("transcription:list_transcriptions"), fetch_redirect_response=False)
+
+    def test_documents_render_in_the_pool_and_reuse_the_cache(self):
+        with mock.patch.object(PdfExporter, "export", autospec=True,
+                               side_effect=lambda _self, segments, _options: segments[0]["english"].encode()) as render:
+            first = self.download(format="pdf")
+            again = self.download(format="pdf")
+
+        self.assertEqual([first.read(name) for name in first.namelist()], [b"line 0", b"line 1", b"line 2"])
+        self.assertEqual([again.read(name) for name in again.namelist()], [b"line 0", b"line 1", b"line 2"])
+        self.assertEqual(render.call_count, 3)
+
+    def test_archive_is_streamed_in_bounded_chunks(self):
+        # Incompressible, so deflate output keeps pace with the input
+        rng = random.Random(0)
+        blocks = [rng.randbytes(16 * 1024) for _ in range(32)]
+
+        chunks = list(bulk_export.iter_zip([("audio.pdf", iter(blocks))]))
+
+        self.assertGreater(len(chunks), 5)
+        self.assertLess(max(map(len, chunks)), bulk_export.FLUSH_BYTES * 2)
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(b"".join(chunks))).read("audio.pdf"), b"".join(blocks))
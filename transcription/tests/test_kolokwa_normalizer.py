@@ -1,6 +1,11 @@
+from unittest import mock
+
 from django.test import SimpleTestCase
 
+from transcription.management.commands.benchmark_normalizer import synthetic_corpus
 from transcription.services.kolokwa_normalizer import normalize
+from transcription.services.interview_intelligence import build_segments
+from transcription.services.regex_normalizer import DEFAULT_ENGINE, NormalizationRule, NormalizerEngine
 
 
 class KolokwaNormalizerTests(SimpleTestCase):
@@ -20,3 +25,71 @@ class KolokwaNormalizerTests(SimpleTestCase):
         # Ensure short tokens don't match inside other words
         self.assertEqual(normalize("koala"), "Koala")
         self.assertEqual(normalize("people"), "People")
+
+
+class NormalizerEngineTests(SimpleTestCase):
+    def test_single_pass_matches_rule_by_rule_output(self):
+        for text in synthetic_corpus(2000):
+            self.assertEqual(DEFAULT_ENGINE.normalize_fast(text), DEFAULT_ENGINE.normalize_sequential(text))
+
+    def test_replacements_are_not_rewritten_again(self):
+        # "la me" -> "It is I"; the old engine then also rewrote "I alright"
+        self.assertEqual(DEFAULT_ENGINE.normalize_fast("la me alright"), "It is I alright")
+
+    def test_overlapping_rules_take_the_leftmost_match(self):
+        engine = NormalizerEngine([
+            NormalizationRule(patterns=[r"\bna know\b"], replacement="not know", priority=2),
+            NormalizationRule(patterns=[r"\bI na\b"], replacement="I am not", priority=1),
+        ])
+
+        # Rule by rule, "na know" fires first and "I na" no longer matches
+        self.assertEqual(engine.normalize_sequential("I na know"), "I not know")
+        self.assertEqual(engine.normalize_fast("I na know"), "I am not know")
+        # Rules starting at the same word still go by priority
+        self.assertEqual(engine.normalize_fast("na know"), engine.normalize_sequential("na know"))
+
+    def test_report_marks_fired_rules(self):
+        text, confidence, report = DEFAULT_ENGINE.normalize("wetin happen")
+
+        self.assertEqual(text, "What happen")
+        fired = [r["replacement"] for r in report if r["confidence"] == 1]
+        self.assertEqual(fired, ["what"])
+        self.assertEqual(confidence, 1 / len(report))
+
+    def test_non_literal_rules_use_merged_pattern(self):
+        engine = NormalizerEngine([
+            NormalizationRule(patterns=[r"\b(\w+)-self\b"], replacement=r"\1self", priority=2),
+            NormalizationRule(patterns=[r"\bda\b"], replacement="that", priority=1),
+        ])
+
+        self.assertEqual(engine.normalize_fast("da man-self"), "That manself")
+
+
+class NormalizeBatchTests(SimpleTestCase):
+    def test_each_distinct_text_is_normalized_once(self):
+        engine = NormalizerEngine([NormalizationRule(patterns=[r"\bna\b"], replacement="not", priority=1)])
+        texts = ["I na go", "yes", "I na go", "yes", "okay"]
+
+        with mock.patch.object(engine, "normalize_fast", wraps=engine.normalize_fast) as normalize:
+            self.assertEqual(engine.normalize_batch(texts), ["I not go", "Yes", "I not go", "Yes", "Okay"])
+            self.assertEqual(normalize.call_count, 3)
+
+            # A second transcript reuses the memoized results
+            engine.normalize_batch(["yes", "okay"])
+            self.assertEqual(normalize.call_count, 3)
+
+    def test_rule_sets_do_not_share_cached_results(self):
+        first = NormalizerEngine([NormalizationRule(patterns=[r"\bna\b"], replacement="not")])
+        second = NormalizerEngine([NormalizationRule(patterns=[r"\bna\b"], replacement="no")])
+
+        self.assertEqual(first.normalize_batch(["na"]), ["Not"])
+        self.assertEqual(second.normalize_batch(["na"]), ["No"])
+
+    def test_build_segments_normalizes_in_one_batch(self):
+        raw = [{"start": 0, "end": 1, "text": "I na know"}, {"start": 1, "end": 2, "text": "I na know"}]
+        batch = mock.Mock(side_effect=lambda texts: [text.upper() for text in texts])
+
+        segments = build_segments(raw, batch_normalizer_func=batch)
+
+        batch.assert_called_once_with(["I na know", "I na know"])
+        self.assertEqual([seg["english"] for seg in segments], ["I NA KNOW", "I NA KNOW"])
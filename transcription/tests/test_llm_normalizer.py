@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from transcription import tasks
+from transcription.models import LLMCacheEntry, Segment, Transcription
+from transcription.services import llm_normalizer
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """
+    Answers chat-completion requests by upper-casing each numbered input.
+    server.failures: status codes to answer with before succeeding.
+    server.drop_inputs: inputs left out of batch replies.
+    """
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = payload["messages"][-1]["content"]
+
+        with server.lock:
+            server.prompts.append(prompt)
+            status = server.failures.pop(0) if server.failures else 200
+        if status != 200:
+            self.send_response(status)
+            self.end_headers()
+            return
+
+        if "Inputs:" in prompt:
+            inputs = re.findall(r"^(\d+)\. (.*)$", prompt.split("Inputs:", 1)[1], flags=re.MULTILINE)
+            content = json.dumps({i: text.upper() for i, text in inputs if text not in server.drop_inputs})
+        else:
+            content = prompt.rsplit("Input: ", 1)[1].split("\n", 1)[0].upper()
+
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubLLMMixin:
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+        self.server.lock = threading.Lock()
+        self.server.prompts = []
+        self.server.failures = []
+        self.server.drop_inputs = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        env = {
+            "LLM_API_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions",
+            "LLM_API_KEY": "test-key",
+        }
+        for patch in (
+            mock.patch.dict("os.environ", env),
+            mock.patch.object(llm_normalizer, "LLM_BACKOFF_SECONDS", 0),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+
+@override_settings(LLM_CACHE_MAX_ENTRIES=0)
+class LLMBatchTests(StubLLMMixin, SimpleTestCase):
+    def test_distinct_texts_are_packed_into_batches(self):
+        texts = [f"line {i}" for i in range(45)] + ["line 0", "line 1"]
+        progress = []
+
+        result = llm_normalizer.llm_normalize_batch(texts, progress_callback=lambda d, t: progress.append((d, t)))
+
+        self.assertEqual(result, [text.upper() for text in texts])
+        # 45 distinct texts, 20 to a prompt
+        self.assertEqual(len(self.server.prompts), 3)
+        self.assertEqual(max(progress), (45, 45))
+
+    def test_transient_errors_are_retried(self):
+        self.server.failures = [503, 429]
+
+        self.assertEqual(llm_normalizer.llm_normalize_batch(["I na know"]), ["I NA KNOW"])
+        self.assertEqual(len(self.server.prompts), 3)
+
+    def test_segments_missing_from_batch_reply_are_retried_alone(self):
+        self.server.drop_inputs = {"two"}
+
+        self.assertEqual(llm_normalizer.llm_normalize_batch(["one", "two", "three"]), ["ONE", "TWO", "THREE"])
+        self.assertEqual(len(self.server.prompts), 2)
+        self.assertIn("Input: two", self.server.prompts[1])
+
+    def test_gives_up_after_retry_budget(self):
+        self.server.failures = [500] * 20
+
+        with self.assertRaises(llm_normalizer.LLMError):
+            llm_normalizer.llm_normalize_to_standard_english("hello")
+        self.assertEqual(len(self.server.prompts), llm_normalizer.LLM_MAX_ATTEMPTS)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.failures = [400]
+
+        with self.assertRaises(llm_normalizer.LLMError):
+            llm_normalizer.llm_normalize_to_standard_english("hello")
+        self.assertEqual(len(self.server.prompts), 1)
+
+    def test_parse_indexed_outputs_accepts_numbered_lines(self):
+        self.assertEqual(
+            llm_normalizer.parse_indexed_outputs("1. I do not know\n2) Yes\n7. out of range", 2),
+            {1: "I do not know", 2: "Yes"},
+        )
+
+
+class LLMCacheTests(StubLLMMixin, TestCase):
+    def test_only_new_texts_are_sent_again(self):
+        llm_normalizer.llm_normalize_batch(["yes", "I na know"])
+        self.server.prompts.clear()
+
+        result = llm_normalizer.llm_normalize_batch(["I na know", "okay", "yes"])
+
+        self.assertEqual(result, ["I NA KNOW", "OKAY", "YES"])
+        self.assertEqual(len(self.server.prompts), 1)
+        self.assertTrue(self.server.prompts[0].endswith("Inputs:\n1. okay"))
+        self.assertEqual(LLMCacheEntry.objects.get(key=llm_normalizer.get_cache().key("yes")).hits, 1)
+
+    def test_model_is_part_of_the_key(self):
+        llm_normalizer.llm_normalize_to_standard_english("yes")
+        with mock.patch.dict("os.environ", {"LLM_MODEL": "other-model"}):
+            llm_normalizer.llm_normalize_to_standard_english("yes")
+
+        self.assertEqual(len(self.server.prompts), 2)
+
+    @override_settings(LLM_CACHE_TTL_SECONDS=60)
+    def test_expired_entries_are_misses(self):
+        cache = llm_normalizer.get_cache()
+        cache.put("yes", "Yes.")
+        LLMCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertIsNone(cache.get("yes"))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 1})
+
+    @override_settings(LLM_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = llm_normalizer.get_cache()
+        cache.put("one", "One.")
+        cache.put("two", "Two.")
+        LLMCacheEntry.objects.filter(key=cache.key("one")).update(last_used_at=timezone.now() - timedelta(hours=1))
+        cache.put("three", "Three.")
+
+        self.assertEqual(cache.get_many(["one", "two", "three"]), {"two": "Two.", "three": "Three."})
+
+
+class TranslateTaskTests(StubLLMMixin, TestCase):
+    def test_task_updates_segment_english(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        Segment.objects.bulk_create([
+            Segment(transcription=transcription, start=0, end=1, original="i na know"),
+            Segment(transcription=transcription, start=1, end=2, original="yes", english="Yes"),
+        ])
+
+        tasks.translate_transcription_task.run(transcription.id)
+
+        self.assertEqual(list(transcription.segments.values_list("english", flat=True)), ["I NA KNOW", "YES"])
+
+    def test_view_starts_task_only_when_configured(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        url = reverse("transcription:translate_transcription", args=[transcription.id])
+
+        with mock.patch.object(tasks.translate_transcription_task, "delay") as delay:
+            delay.return_value.id = "task-1"
+            response = self.client.post(url)
+            with mock.patch.dict("os.environ", {"LLM_API_KEY": ""}):
+                unconfigured = self.client.post(url)
+
+        delay.assert_called_once_with(transcription.id)
+        self.assertEqual(response.json()["status_url"], f"/{transcription.id}/translate/task-1/")
+        self.assertEqual(unconfigured.status_code, 400)
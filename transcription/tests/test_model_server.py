@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from transcription.services import model_client, model_server
+
+
+class ModelServerTests(SimpleTestCase):
+    def setUp(self):
+        # The listener removes its socket file itself when the process exits
+        self.address = os.path.join(tempfile.mkdtemp(), "models.sock")
+
+    def test_unreachable_server_is_reported_for_fallback(self):
+        with override_settings(MODEL_SERVER_ADDRESS=self.address):
+            with self.assertRaises(model_client.ModelServerUnavailable):
+                model_client.request("ping")
+
+    def test_dropped_connection_is_reported_for_fallback(self):
+        conn = mock.MagicMock()
+        conn.__enter__.return_value = conn
+        conn.recv.side_effect = EOFError
+        with override_settings(MODEL_SERVER_ADDRESS=self.address), \
+                mock.patch.object(model_client, "Client", return_value=conn):
+            with self.assertRaises(model_client.ModelServerUnavailable):
+                model_client.request("ping")
+
+    def test_transcribe_request_runs_on_server_model(self):
+        segments = [{"start": 0.0, "end": 1.0, "original": "I na know"}]
+        patches = [
+            mock.patch.object(model_server, "load_model", return_value="model"),
+            mock.patch.object(model_server, "transcribe_chunk", return_value=segments),
+        ]
+        for patch in patches:
+            transcribe = patch.start()
+            self.addCleanup(patch.stop)
+
+        with override_settings(MODEL_SERVER_ADDRESS=self.address):
+            threading.Thread(target=model_server.serve, daemon=True).start()
+            for _ in range(50):
+                if os.path.exists(self.address):
+                    break
+                time.sleep(0.05)
+
+            self.assertEqual(model_client.request("ping"), "pong")
+            self.assertEqual(model_client.request("transcribe", audio="chunk.wav", fast_mode=True), segments)
+
+        transcribe.assert_called_once_with("chunk.wav", True, model="model", word_timestamps=False)
@@ -0,0 +1,209 @@
+import sqlite3
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from transcription.services import process_transcription as pipeline
+from transcription.services import transcribe_pool
+from transcription.models import Transcription, TranscriptionChunk
+from transcription.services.audio_chunker import SAMPLE_RATE, build_manifest
+from transcription.services.word_index import WordIndex
+from transcription.tests.helpers import TempMediaMixin
+
+
+def make_chunks(count, seconds=10):
+    step = seconds * SAMPLE_RATE
+    return build_manifest([(i * step, (i + 1) * step) for i in range(count)], "audio.wav")
+
+
+def fake_transcribe(audio, fast_mode=True):
+    return [{"start": 0.0, "end": 1.0, "original": audio}]
+
+
+class StreamTranscriptionsTests(SimpleTestCase):
+    def test_every_chunk_is_transcribed_once(self):
+        chunks = make_chunks(5)
+
+        with mock.patch.object(pipeline, "transcribe_chunk", side_effect=fake_transcribe):
+            results = list(pipeline.stream_transcriptions(iter(chunks)))
+
+        self.assertEqual(sorted(chunk.index for chunk, _segments in results), [0, 1, 2, 3, 4])
+
+    def test_cached_chunks_skip_whisper(self):
+        chunks = make_chunks(3)
+
+        class FakeCache:
+            stored = {}
+
+            def get(self, chunk):
+                return [{"cached": True}] if chunk.index == 1 else None
+
+            def put(self, chunk, raw_segments):
+                self.stored[chunk.index] = raw_segments
+
+        cache = FakeCache()
+        with mock.patch.object(pipeline, "transcribe_chunk", side_effect=fake_transcribe) as transcribe:
+            results = {
+                chunk.index: segments
+                for chunk, segments in pipeline.stream_transcriptions(iter(chunks), cache=cache)
+            }
+
+        self.assertEqual(transcribe.call_count, 2)
+        self.assertEqual(results[1], [{"cached": True}])
+        self.assertEqual(sorted(cache.stored), [0, 2])
+
+    def test_transcription_starts_before_chunking_finishes(self):
+        first_transcribed = threading.Event()
+        chunks = make_chunks(2)
+
+        def produce():
+            yield chunks[0]
+            # Chunk 1 is only cut once chunk 0 is already being transcribed
+            self.assertTrue(first_transcribed.wait(timeout=5))
+            yield chunks[1]
+
+        def transcribe(audio, fast_mode=True):
+            first_transcribed.set()
+            return fake_transcribe(audio)
+
+        with mock.patch.object(pipeline, "transcribe_chunk", side_effect=transcribe):
+            results = list(pipeline.stream_transcriptions(produce()))
+
+        self.assertEqual(len(results), 2)
+
+    def test_chunking_errors_are_raised_to_consumer(self):
+        chunks = make_chunks(1)
+
+        def produce():
+            yield chunks[0]
+            raise RuntimeError("ffmpeg failed")
+
+        with mock.patch.object(pipeline, "transcribe_chunk", side_effect=fake_transcribe):
+            with self.assertRaisesMessage(RuntimeError, "ffmpeg failed"):
+                list(pipeline.stream_transcriptions(produce()))
+
+
+class ChunkManifestTests(SimpleTestCase):
+    def test_overlap_is_split_between_neighbours(self):
+        # Chunk 1 starts 2 s before chunk 0 ends
+        first, second = build_manifest([(0, 10 * SAMPLE_RATE), (8 * SAMPLE_RATE, 20 * SAMPLE_RATE)], "audio.wav")
+
+        self.assertEqual(second.start, 8.0)
+        # A segment inside the overlap is kept exactly once
+        self.assertTrue(first.owns(8.2, 8.8))
+        self.assertFalse(second.owns(8.2, 8.8))
+        self.assertFalse(first.owns(9.2, 9.8))
+        self.assertTrue(second.owns(9.2, 9.8))
+        # Segments past the last cut always belong to the last chunk
+        self.assertTrue(second.owns(19.5, 21.0))
+
+
+class PoolSizingTests(SimpleTestCase):
+    def test_auto_worker_count_is_limited_by_cores_and_memory(self):
+        gib = 1024 ** 3
+        self.assertEqual(transcribe_pool.auto_worker_count(cpu_count=32, memory_bytes=64 * gib), 16)
+        self.assertEqual(transcribe_pool.auto_worker_count(cpu_count=32, memory_bytes=5 * gib), 2)
+        self.assertEqual(transcribe_pool.auto_worker_count(cpu_count=1, memory_bytes=64 * gib), 1)
+
+
+class ResumeTranscriptionTests(TempMediaMixin, TestCase):
+    def run_pipeline(self, transcription, chunks, transcribe, extra_patches=()):
+        patches = [*extra_patches,
+            mock.patch.object(pipeline, "prepare_chunks", return_value=(len(chunks), iter(chunks))),
+            mock.patch.object(pipeline, "get_chunk_cache", return_value=None),
+            mock.patch.object(pipeline, "transcribe_chunk", side_effect=transcribe),
+            mock.patch.object(pipeline, "schedule_prerender"),
+        ]
+        for patch in patches:
+            patch.start()
+        try:
+            pipeline.process_transcription(transcription.id)
+        finally:
+            for patch in patches:
+                patch.stop()
+        transcription.refresh_from_db()
+
+    def test_rerun_only_transcribes_missing_chunks(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        chunks = make_chunks(4)
+
+        def crash_on_last_chunk(chunk, fast_mode=True):
+            if chunk.index == 3:
+                raise MemoryError("worker ran out of memory")
+            return [{"start": 1.0, "end": 2.0, "text": f"chunk {chunk.index}"}]
+
+        self.run_pipeline(transcription, chunks, crash_on_last_chunk)
+        self.assertEqual(transcription.status, "ERROR")
+        self.assertEqual(TranscriptionChunk.objects.filter(transcription=transcription).count(), 3)
+
+        transcribed = []
+
+        def record(chunk, fast_mode=True):
+            transcribed.append(chunk.index)
+            return [{"start": 1.0, "end": 2.0, "text": f"chunk {chunk.index}"}]
+
+        self.run_pipeline(transcription, chunks, record)
+
+        self.assertEqual(transcribed, [3])
+        self.assertEqual(transcription.status, "DONE")
+        segments = transcription.get_segments()
+        self.assertEqual([seg["original"] for seg in segments], [f"chunk {i}" for i in range(4)])
+        self.assertEqual([seg["start"] for seg in segments], [1.0, 11.0, 21.0, 31.0])
+        self.assertFalse(TranscriptionChunk.objects.filter(transcription=transcription).exists())
+
+    def test_follow_up_failures_do_not_fail_a_finished_job(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+
+        def transcribe(chunk, fast_mode=True):
+            return [{"start": 1.0, "end": 2.0, "text": f"chunk {chunk.index}"}]
+
+        broken_index = mock.patch.object(
+            pipeline.search_index, "index_transcription", side_effect=sqlite3.OperationalError("database is locked")
+        )
+        self.run_pipeline(transcription, make_chunks(2), transcribe, extra_patches=[broken_index])
+
+        self.assertEqual(transcription.status, "DONE")
+        self.assertEqual(transcription.error_message or "", "")
+        self.assertFalse(TranscriptionChunk.objects.filter(transcription=transcription).exists())
+
+    @override_settings(TRANSCRIBE_DIARIZE=True)
+    def test_diarized_speakers_replace_heuristic_ones(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        turns = [
+            {"start": 0.0, "end": 10.5, "speaker": "SPEAKER_00"},
+            {"start": 10.5, "end": 20.0, "speaker": "SPEAKER_01"},
+        ]
+
+        def transcribe(chunk, fast_mode=True):
+            return [{"start": 1.0, "end": 2.0, "text": f"P4: chunk {chunk.index}"}]
+
+        diarize = mock.patch.object(pipeline, "diarize_audio", return_value=turns)
+        self.run_pipeline(transcription, make_chunks(3), transcribe, extra_patches=[diarize])
+
+        self.assertEqual(transcription.status, "DONE")
+        self.assertEqual(
+            [(seg["speaker"], seg["speaker_color"]) for seg in transcription.get_segments()],
+            [
+                ("SPEAKER_00", "bg-red-100 text-red-800"),
+                ("SPEAKER_01", "bg-green-100 text-green-800"),
+                # No turn covers the last chunk: the "P4:" tag stands
+                ("P4", "bg-purple-100 text-purple-800"),
+            ],
+        )
+
+    @override_settings(TRANSCRIBE_WORD_TIMESTAMPS=True)
+    def test_word_timestamps_are_indexed_in_recording_time(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+
+        def transcribe(chunk, fast_mode=True):
+            return [{"start": 1.0, "end": 2.0, "text": "we dey go", "words": [
+                [1.0, 1.3, "we"], [1.3, 1.6, "dey"], [1.6, 2.0, f"go{chunk.index}"],
+            ]}]
+
+        self.run_pipeline(transcription, make_chunks(2), transcribe)
+
+        words = WordIndex.load(transcription.word_index.path)
+        self.assertEqual(len(words), 6)
+        self.assertEqual(words.word(words.word_at(11.7)), "go1")
+        self.assertAlmostEqual(words.time_of("go0"), 1.6, places=5)
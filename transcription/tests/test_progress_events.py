@@ -0,0 +1,90 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from redis import RedisError
+
+from transcription import views
+from transcription.models import Transcription
+
+
+class FakeSubscription:
+    def __init__(self, events):
+        self.events = list(events)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def get(self, timeout=None):
+        return self.events.pop(0)
+
+
+def parse_events(chunks):
+    events = []
+    for block in b"".join(chunks).decode().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "data" in lines:
+            events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+
+class ProgressEventsTests(TestCase):
+    def setUp(self):
+        self.transcription = Transcription.objects.create(audio_file="audio/interview.wav", status="PROCESSING")
+        self.url = reverse("transcription:transcription_events", args=[self.transcription.id])
+
+    async def read_stream(self, subscription):
+        with mock.patch.object(views.progress_channel, "Subscription", side_effect=subscription):
+            response = await self.async_client.get(self.url)
+            return response, [chunk async for chunk in response.streaming_content]
+
+    async def test_streams_snapshot_then_worker_events_until_done(self):
+        events = [
+            None,
+            {"status": "PROCESSING", "progress": 50, "segments": [{"start": 1.0, "original": "hello"}]},
+            {"status": "DONE", "progress": 100},
+        ]
+
+        response, chunks = await self.read_stream(lambda pk: FakeSubscription(events))
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = parse_events(chunks)
+        self.assertEqual([data["status"] for _event, data in events], ["processing", "processing", "done"])
+        self.assertEqual(events[1][1]["progress"], 50)
+        self.assertEqual(events[1][1]["segments"], [{"start": 1.0, "original": "hello"}])
+        self.assertEqual(events[0][1]["file_name"], "interview.wav")
+
+    async def test_tells_client_to_poll_without_redis(self):
+        def unavailable(pk):
+            raise RedisError("connection refused")
+
+        _response, chunks = await self.read_stream(unavailable)
+
+        self.assertEqual(parse_events(chunks), [("fallback", {})])
+
+    async def test_stream_ends_after_max_duration(self):
+        subscription = FakeSubscription([None] * 10)
+
+        with mock.patch.object(views.progress_channel, "STREAM_MAX_SECONDS", 0):
+            _response, chunks = await self.read_stream(lambda pk: subscription)
+
+        # Only the snapshot; the browser reconnects for the rest
+        self.assertEqual([data["status"] for _event, data in parse_events(chunks)], ["processing"])
+        self.assertEqual(len(subscription.events), 10)
+
+    def test_wsgi_requests_are_told_to_poll(self):
+        with mock.patch.object(views.progress_channel, "Subscription") as subscription:
+            response = self.client.get(self.url)
+
+        subscription.assert_not_called()
+        self.assertEqual(parse_events([response.content]), [("fallback", {})])
+
+    def test_status_endpoint_still_answers_polls(self):
+        response = self.client.get(reverse("transcription:transcription_status", args=[self.transcription.id]))
+
+        self.assertEqual(response.json()["status"], "processing")
+        self.assertEqual(self.client.get("/transcription/999/status/").status_code, 404)
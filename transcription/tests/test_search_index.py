@@ -0,0 +1,79 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from transcription.models import Segment, Transcription
+from transcription.services import search_index
+
+
+def make_transcription(name, lines):
+    transcription = Transcription.objects.create(audio_file=f"audio/{name}.wav", status="DONE")
+    Segment.objects.bulk_create(
+        Segment(transcription=transcription, start=start, end=start + 2, original=text, english=english)
+        for start, text, english in lines
+    )
+    search_index.index_transcription(transcription.id)
+    return transcription
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.first = make_transcription("first", [
+            (0.0, "We dey go market", "We are going to the market"),
+            (5.0, "Di market in Monrovia too crowded", "The market in Monrovia is too crowded"),
+        ])
+        self.second = make_transcription("second", [
+            (3.0, "I na know", "I do not know"),
+            (9.0, "My ma sell fish for Waterside", "My mother sells fish at Waterside"),
+        ])
+
+    def test_results_point_at_transcript_segment_and_time(self):
+        results = search_index.search("monrovia")
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["transcription_id"], self.first.id)
+        self.assertEqual((results[0]["index"], results[0]["start"]), (1, 5.0))
+
+    def test_positions_of_all_hits_come_from_one_query(self):
+        # Same start time: the page orders ties by id
+        Segment.objects.create(transcription=self.first, start=0.0, end=1.0, original="Market day", english="")
+        search_index.index_transcription(self.first.id)
+
+        # Ranked ids, the hit segments, their positions
+        with self.assertNumQueries(3):
+            results = search_index.search("market")
+
+        self.assertEqual(sorted((r["start"], r["index"]) for r in results), [(0.0, 0), (0.0, 1), (5.0, 2)])
+
+    def test_all_words_must_match_and_last_is_a_prefix(self):
+        self.assertEqual([r["start"] for r in search_index.search("market crowd")], [5.0])
+        self.assertEqual([r["transcription_id"] for r in search_index.search("mother")], [self.second.id])
+        # FTS5 syntax in user input is treated as plain words
+        self.assertEqual(search_index.search('" OR *'), [])
+
+    def test_original_text_ranks_above_english(self):
+        # "mother" is only in the English of the segment at 9 s
+        Segment.objects.create(transcription=self.second, start=20.0, end=21.0, original="Mother come", english="")
+        search_index.index_transcription(self.second.id)
+
+        self.assertEqual([r["start"] for r in search_index.search("mother")], [20.0, 9.0])
+
+    def test_edits_are_reindexed(self):
+        url = reverse("transcription:save_segment", args=[self.second.id])
+        self.client.post(url, json.dumps({"index": 0, "field": "original", "value": "I na know Gbarnga"}),
+                         content_type="application/json")
+
+        self.assertEqual([r["start"] for r in search_index.search("gbarnga")], [3.0])
+
+    def test_deleted_transcriptions_leave_the_index(self):
+        self.client.post(reverse("transcription:delete_transcription", args=[self.first.id]))
+
+        self.assertEqual(search_index.search("market"), [])
+        self.assertEqual(search_index.rebuild(), 2)
+
+    def test_search_page_links_to_the_moment(self):
+        response = self.client.get(reverse("transcription:search_transcripts"), {"q": "waterside"})
+
+        detail = reverse("transcription:transcription_detail", args=[self.second.id])
+        self.assertContains(response, f"{detail}?t=9.0")
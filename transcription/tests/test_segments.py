@@ -0,0 +1,90 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from transcription.models import Segment, Transcription
+
+
+class SegmentStorageTests(TestCase):
+    def setUp(self):
+        self.transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        Segment.objects.bulk_create([
+            Segment.from_dict(self.transcription, {"start": 5.0, "end": 6.0, "type": "Answer", "original": "second"}),
+            Segment.from_dict(self.transcription, {"start": 1.0, "end": 2.0, "type": "Question", "original": "first"}),
+        ])
+
+    def test_get_segments_returns_dicts_in_time_order(self):
+        segments = self.transcription.get_segments()
+
+        self.assertEqual([seg["original"] for seg in segments], ["first", "second"])
+        self.assertEqual(segments[0]["type"], "Question")
+
+    def test_legacy_json_is_used_when_there_are_no_rows(self):
+        legacy = Transcription.objects.create(
+            audio_file="audio/old.wav",
+            structured_segments=[{"start": 0.0, "end": 1.0, "original": "old"}],
+        )
+
+        self.assertEqual(legacy.get_segments(), [{"start": 0.0, "end": 1.0, "original": "old"}])
+
+    def test_save_segment_updates_one_row(self):
+        response = self.client.post(
+            reverse("transcription:save_segment", args=[self.transcription.id]),
+            data=json.dumps({"index": 1, "field": "english", "value": "Second."}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(self.transcription.segments.values_list("english", flat=True)),
+            ["", "Second."],
+        )
+
+    def test_save_segment_rejects_unknown_index(self):
+        response = self.client.post(
+            reverse("transcription:save_segment", args=[self.transcription.id]),
+            data=json.dumps({"index": 2, "field": "english", "value": "x"}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TranscriptionSummaryTests(TestCase):
+    def setUp(self):
+        self.transcription = Transcription.objects.create(audio_file="audio/interview.wav", status="DONE")
+        Segment.objects.bulk_create([
+            Segment(transcription=self.transcription, start=0.0, end=2.0, speaker="P1", original="How di family?"),
+            Segment(transcription=self.transcription, start=2.0, end=5.5, speaker="P2", original="Di family fine oh"),
+            Segment(transcription=self.transcription, start=6.0, end=7.0, speaker="UNKNOWN", original="Okay"),
+        ])
+        self.transcription.update_summary()
+
+    def test_summary_is_computed_from_segments(self):
+        self.transcription.refresh_from_db()
+
+        self.assertEqual(self.transcription.duration, 7.0)
+        self.assertEqual(self.transcription.segment_count, 3)
+        self.assertEqual(self.transcription.speaker_count, 2)
+        self.assertEqual(self.transcription.word_count, 8)
+        self.assertEqual(self.transcription.preview, "How di family? Di family fine oh Okay")
+
+    def test_segment_edits_keep_summary_current(self):
+        url = reverse("transcription:save_segment", args=[self.transcription.id])
+        self.client.post(url, json.dumps({"index": 0, "field": "original", "value": "How you doing?"}),
+                         content_type="application/json")
+
+        self.transcription.refresh_from_db()
+        self.assertEqual(self.transcription.word_count, 8)
+        self.assertTrue(self.transcription.preview.startswith("How you doing? Di family"))
+
+    def test_list_page_does_not_load_transcript_text(self):
+        Transcription.objects.filter(pk=self.transcription.pk).update(raw_transcript="x" * 100_000)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("transcription:list_transcriptions"))
+
+        page = response.context["transcriptions"]
+        self.assertLessEqual({"raw_transcript", "normalized_english", "structured_segments"}, page[0].get_deferred_fields())
+        self.assertContains(response, "3 segments")
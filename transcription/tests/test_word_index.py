@@ -0,0 +1,62 @@
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from transcription.models import Transcription
+from transcription.services.word_index import WordIndex
+from transcription.tests.helpers import TempMediaMixin
+
+WORDS = [
+    (2.0, 2.4, "market,"),
+    (0.0, 0.3, "We"),
+    (0.3, 0.6, "dey"),
+    (0.6, 1.0, "go"),
+    (1.2, 1.8, "Market"),
+]
+
+
+class WordIndexTests(SimpleTestCase):
+    def test_time_maps_to_word(self):
+        words = WordIndex.build(WORDS)
+
+        self.assertIsNone(words.word_at(-1))
+        self.assertEqual(words.word(words.word_at(0.45)), "dey")
+        # In the pause after "go" the last word spoken is still "go"
+        self.assertEqual(words.word(words.word_at(1.1)), "go")
+        self.assertEqual(words.word(words.word_at(60)), "market,")
+
+    def test_word_maps_to_times(self):
+        words = WordIndex.build(WORDS)
+
+        self.assertEqual([words.get(i)["start"] for i in words.find("MARKET")], [1.2, 2.0])
+        self.assertAlmostEqual(words.time_of("go"), 0.6, places=5)
+        self.assertIsNone(words.time_of("school"))
+        self.assertEqual(words.find("?"), [])
+
+    def test_round_trip_keeps_compact_arrays(self):
+        words = WordIndex.from_bytes(WordIndex.build(WORDS + [(3.0, 3.5, "Kɔlɔkwa")]).to_bytes())
+
+        self.assertEqual(words.starts.dtype.name, "float32")
+        self.assertEqual(words.offsets.dtype.name, "int32")
+        self.assertEqual(len(words), 6)
+        self.assertEqual(words.word(5), "Kɔlɔkwa")
+        self.assertEqual(words.find("kɔlɔkwa"), [5])
+
+
+class TranscriptionWordsViewTests(TempMediaMixin, TestCase):
+    def test_lookup_by_time_and_by_word(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+        transcription.word_index.save("1.npz", ContentFile(WordIndex.build(WORDS).to_bytes()))
+        url = reverse("transcription:transcription_words", args=[transcription.id])
+
+        self.assertEqual(self.client.get(url, {"t": "0.7"}).json()["word"]["word"], "go")
+        matches = self.client.get(url, {"q": "market"}).json()["matches"]
+        self.assertEqual([match["index"] for match in matches], [3, 4])
+        self.assertEqual(self.client.get(url, {"t": "soon"}).status_code, 400)
+
+    def test_missing_index_is_404(self):
+        transcription = Transcription.objects.create(audio_file="audio/interview.wav")
+
+        response = self.client.get(reverse("transcription:transcription_words", args=[transcription.id]))
+
+        self.assertEqual(response.status_code, 404)
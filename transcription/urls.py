@@ -6,15 +6,21 @@ app_name = "transcription"
 urlpatterns = [
     path("", upload_audio, name="upload_audio"),
     path("list/", list_transcriptions, name="list_transcriptions"),
+    path("search/", search_transcripts, name="search_transcripts"),
     path("transcription/<int:pk>/", transcription_detail, name="transcription_detail"),
     path("transcription/<int:pk>/audio/", transcription_audio, name="transcription_audio"),
+    path("transcription/<int:pk>/words/", transcription_words, name="transcription_words"),
     path("export/<int:transcript_id>/", export_transcript, name="export_transcript"),
+    path("export/<int:transcript_id>/status/", export_status, name="export_status"),
     path("transcription/processing/", processing_dashboard, name="processing_dashboard"),
     path("transcription/<int:pk>/processing/", transcription_processing, name="transcription_processing"),
     path("transcription/<int:pk>/status/", transcription_status, name="transcription_status"),
+    path("transcription/<int:pk>/events/", transcription_events, name="transcription_events"),
     path('transcription/<int:pk>/save_segment/', save_segment, name='save_segment'),
     path("transcription/<int:pk>/cancel/", cancel_transcription, name="cancel_transcription"),
     path("transcription/<int:pk>/delete/", delete_transcription, name="delete_transcription"),
     path("transcriptions/delete/", delete_transcriptions_bulk, name="delete_transcriptions_bulk"),
+    path("transcriptions/export/", export_transcriptions_bulk, name="export_transcriptions_bulk"),
     path("<int:pk>/translate/", translate_transcription, name="translate_transcription"),
+    path("<int:pk>/translate/<str:task_id>/", translate_status, name="translate_status"),
 ]
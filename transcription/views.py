@@ -1,18 +1,34 @@
 import json
+import time
 
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
+from django.db.models import F
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 import mimetypes
-from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from celery.result import AsyncResult
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
+from redis import RedisError
 
-from .models import Transcription
+from .models import Transcription, Segment, PREVIEW_LENGTH, count_words
 from .forms import TranscriptionUploadForm
-from .tasks import process_transcription_task, cancel_transcription_task
-from .services.llm_normalizer import llm_normalize_to_standard_english
+from .tasks import process_transcription_task, cancel_transcription_task, translate_transcription_task
+from .services.llm_normalizer import llm_is_configured
+from .services import progress_channel
+from .services import search_index
+from .services import status_counts
+from .services.audio_serving import serve_file
+from .services.bulk_export import iter_bulk_export
+from .services.word_index import WordIndex
 from .exports.manager import ExportManager
 
+SEARCH_PAGE_SIZE = 25
+# All the processing page renders per card; progress is fetched live
+PROCESSING_LIST_FIELDS = ("id", "audio_file")
+
 
 def upload_audio(request):
     if request.method == "POST":
@@ -22,6 +38,7 @@ def upload_audio(request):
             transcription.status = "UPLOADED"
             transcription.progress = 0
             transcription.save()
+            status_counts.invalidate()
             return redirect("transcription:transcription_processing", transcription.id)
     else:
         form = TranscriptionUploadForm()
@@ -38,21 +55,18 @@ def transcription_processing(request, pk):
         transcription.error_message = ""
         transcription.status = "PROCESSING"
         transcription.save(update_fields=["status", "progress", "error_message"])
+        status_counts.invalidate()
         process_transcription_task.delay(transcription.id)
 
     processing_list = list(
         Transcription.objects.filter(status__in=["UPLOADED", "PENDING", "PROCESSING"])
+        .only(*PROCESSING_LIST_FIELDS)
         .order_by("-uploaded_at")
     )
     if transcription not in processing_list:
         processing_list.insert(0, transcription)
 
-    stats = {
-        "active": len(processing_list),
-        "done": Transcription.objects.filter(status="DONE").count(),
-        "error": Transcription.objects.filter(status="ERROR").count(),
-        "cancelled": Transcription.objects.filter(status="CANCELLED").count(),
-    }
+    stats = status_counts.dashboard_stats()
 
     return render(
         request,
@@ -69,14 +83,10 @@ def transcription_processing(request, pk):
 def processing_dashboard(request):
     processing_list = list(
         Transcription.objects.filter(status__in=["UPLOADED", "PENDING", "PROCESSING"])
+        .only(*PROCESSING_LIST_FIELDS)
         .order_by("-uploaded_at")
     )
-    stats = {
-        "active": len(processing_list),
-        "done": Transcription.objects.filter(status="DONE").count(),
-        "error": Transcription.objects.filter(status="ERROR").count(),
-        "cancelled": Transcription.objects.filter(status="CANCELLED").count(),
-    }
+    stats = status_counts.dashboard_stats()
     return render(
         request,
         "transcription/processing.html",
@@ -88,36 +98,135 @@ def processing_dashboard(request):
     )
 
 
+STATUS_FIELDS = ("id", "status", "progress", "audio_file", "error_message", "current_stage", "uploaded_at")
+FINISHED_STATUSES = ("DONE", "ERROR", "CANCELLED")
+
+
+def _status_payload(values: dict) -> dict:
+    return {
+        "status": values["status"].lower(),
+        "redirect_url": f"/transcription/{values['id']}",
+        "progress": values["progress"] or 0,
+        "file_name": os.path.basename(values["audio_file"]) if values["audio_file"] else f"transcript_{values['id']}",
+        "error_message": values["error_message"] or "",
+        "current_stage": values["current_stage"] or "",
+        "uploaded_at": values["uploaded_at"].isoformat() if values["uploaded_at"] else "",
+    }
+
+
+def _sse(payload: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
 def transcription_status(request, pk):
-    transcription = get_object_or_404(Transcription, pk=pk)
+    # Only the status columns, not the whole row
+    values = Transcription.objects.filter(pk=pk).values(*STATUS_FIELDS).first()
+    if values is None:
+        raise Http404("No Transcription matches the given query.")
     # Return real status and redirect URL
-    return JsonResponse({
-        "status": transcription.status.lower(),
-        "redirect_url": f"/transcription/{transcription.id}",
-        "progress": transcription.progress or 0,
-        "file_name": os.path.basename(transcription.audio_file.name) if transcription.audio_file else f"transcript_{transcription.id}",
-        "error_message": transcription.error_message or "",
-        "current_stage": transcription.current_stage or "",
-        "uploaded_at": transcription.uploaded_at.isoformat() if transcription.uploaded_at else "",
-    })
+    return JsonResponse(_status_payload(values))
+
+
+async def _progress_events(pk):
+    deadline = time.monotonic() + progress_channel.STREAM_MAX_SECONDS
+    try:
+        # Closed when the stream ends or the server closes the generator
+        async with progress_channel.Subscription(pk) as subscription:
+            # Read the current state only once subscribed, so no event is missed in between
+            state = await Transcription.objects.filter(pk=pk).values(*STATUS_FIELDS).afirst()
+            if state is None:
+                return
+            yield _sse(_status_payload(state))
+
+            while state["status"] not in FINISHED_STATUSES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # The client reconnects and gets a fresh snapshot
+                    return
+                event = await subscription.get(timeout=min(progress_channel.HEARTBEAT_SECONDS, remaining))
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                segments = event.pop("segments", None)
+                state.update(event)
+                payload = _status_payload(state)
+                if segments:
+                    payload["segments"] = segments
+                yield _sse(payload)
+    except RedisError:
+        # No live channel; the page polls transcription_status instead
+        yield _sse({}, event="fallback")
+
+
+async def transcription_events(request, pk):
+    """
+    Server-Sent Events stream of progress, stage and newly finished segments,
+    pushed by the worker through progress_channel. Needs an ASGI server.
+    """
+    if not await Transcription.objects.filter(pk=pk).aexists():
+        raise Http404("No Transcription matches the given query.")
+    if not isinstance(request, ASGIRequest):
+        # WSGI buffers the whole stream and holds a worker thread for the job's
+        # duration; tell the page to poll transcription_status instead
+        return HttpResponse(_sse({}, event="fallback"), content_type="text/event-stream")
+
+    response = StreamingHttpResponse(_progress_events(pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 @require_POST
 def translate_transcription(request, pk):
     transcription = get_object_or_404(Transcription, pk=pk)
+    if not llm_is_configured():
+        return JsonResponse({"error": "LLM normalization is not configured."}, status=400)
 
-    segments = transcription.structured_segments or []
-    updated = []
-    for seg in segments:
-        source_text = seg.get("english") or seg.get("original") or ""
-        normalized = llm_normalize_to_standard_english(source_text)
-        seg["english"] = normalized
-        updated.append(seg)
+    # Runs in Celery; the page follows it through translate_status
+    result = translate_transcription_task.delay(transcription.id)
+    return JsonResponse({
+        "ok": True,
+        "task_id": result.id,
+        "status_url": reverse("transcription:translate_status", args=[transcription.id, result.id]),
+    })
 
-    transcription.structured_segments = updated
-    transcription.save(update_fields=["structured_segments"])
 
-    return JsonResponse({"ok": True})
+def translate_status(request, pk, task_id):
+    result = AsyncResult(task_id)
+    data = {"state": result.state.lower(), "done": 0, "total": 0}
+    if result.state == "PROGRESS" and isinstance(result.info, dict):
+        data.update(done=result.info.get("done", 0), total=result.info.get("total", 0))
+    elif result.state == "FAILURE":
+        data["error"] = str(result.info)
+    return JsonResponse(data)
+
+
+def search_transcripts(request):
+    """
+    Ranked full-text search over every transcript's segments.
+    """
+    q = request.GET.get("q", "").strip()
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    page_size = SEARCH_PAGE_SIZE
+
+    # One extra row tells whether there is a next page
+    results = search_index.search(q, limit=page_size + 1, offset=(page - 1) * page_size) if q else []
+
+    return render(
+        request,
+        "transcription/search.html",
+        {
+            "q": q,
+            "results": results[:page_size],
+            "page": page,
+            "has_next": len(results) > page_size,
+        },
+    )
 
 
 def list_transcriptions(request):
@@ -125,7 +234,8 @@ def list_transcriptions(request):
     status = request.GET.get("status", "all").strip()
     sort = request.GET.get("sort", "newest").strip()
 
-    transcriptions = Transcription.objects.all()
+    # Summary columns only: the segment and transcript text can be megabytes per row
+    transcriptions = Transcription.objects.only(*Transcription.SUMMARY_FIELDS)
 
     if q:
         transcriptions = transcriptions.filter(audio_file__icontains=q)
@@ -168,7 +278,10 @@ def list_transcriptions(request):
 def delete_transcription(request, pk):
     transcription = get_object_or_404(Transcription, pk=pk)
     transcription.audio_file.delete(save=False)
+    transcription.word_index.delete(save=False)
+    search_index.remove_transcription(transcription.id)
     transcription.delete()
+    status_counts.invalidate()
     return redirect("transcription:list_transcriptions")
 
 
@@ -178,20 +291,52 @@ def delete_transcriptions_bulk(request):
     if ids:
         for transcription in Transcription.objects.filter(id__in=ids):
             transcription.audio_file.delete(save=False)
+            transcription.word_index.delete(save=False)
+            search_index.remove_transcription(transcription.id)
             transcription.delete()
+        status_counts.invalidate()
     return redirect("transcription:list_transcriptions")
 
 
+@require_POST
+def export_transcriptions_bulk(request):
+    """
+    The selected transcriptions exported in one format, as a ZIP streamed
+    while it is built (same format/timestamps/speakers fields as export_transcript).
+    """
+    fmt, options = _export_params(request.POST)
+    try:
+        ExportManager.get_exporter(fmt)
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
+
+    # Checked before the response starts: errors cannot be reported mid-stream
+    ids = [value for value in request.POST.getlist("selected_ids") if value.isdecimal()]
+    ids = list(Transcription.objects.filter(id__in=ids).order_by("id").values_list("id", flat=True))
+    if not ids:
+        return redirect("transcription:list_transcriptions")
+
+    response = StreamingHttpResponse(iter_bulk_export(ids, fmt, options), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="transcripts_{fmt}.zip"'
+    return response
+
+
 def transcription_detail(request, pk):
     transcription = get_object_or_404(Transcription, pk=pk)
     audio_exists = bool(transcription.audio_file and os.path.exists(transcription.audio_file.path))
 
     if request.method == "POST":
-        segments = transcription.structured_segments or []
-        for i, seg in enumerate(segments):
-            seg["text"] = request.POST.get(f"text_{i}", seg.get("text"))
-        transcription.structured_segments = segments
-        transcription.save(update_fields=["structured_segments"])
+        changed = []
+        for i, seg in enumerate(transcription.segments.only("id", "original")):
+            text = request.POST.get(f"text_{i}")
+            if text is not None and text != seg.original:
+                seg.original = text
+                changed.append(seg)
+        Segment.objects.bulk_update(changed, ["original"])
+        search_index.index_segments(seg.id for seg in changed)
+        if changed:
+            transcription.update_summary()
+            transcription.bump_content_version()
         return redirect("transcription:transcription_detail", pk=pk)
 
     return render(
@@ -199,69 +344,49 @@ def transcription_detail(request, pk):
         "transcription/detail.html",
         {
             "transcription": transcription,
+            "segments": transcription.get_segments(),
             "audio_exists": audio_exists,
+            "translate_enabled": llm_is_configured(),
         },
     )
 
 
 def transcription_audio(request, pk):
+    """
+    The uploaded audio for the player, with range and conditional request
+    support (see services.audio_serving).
+    """
     transcription = get_object_or_404(Transcription, pk=pk)
     if not transcription.audio_file or not os.path.exists(transcription.audio_file.path):
         return HttpResponse(status=404)
 
     file_path = transcription.audio_file.path
-    file_size = os.path.getsize(file_path)
-    range_header = request.headers.get("Range", "").strip()
-
-    def file_iter(start, length, chunk_size=8192):
-        with open(file_path, "rb") as f:
-            f.seek(start)
-            remaining = length
-            while remaining > 0:
-                read_size = min(chunk_size, remaining)
-                data = f.read(read_size)
-                if not data:
-                    break
-                remaining -= len(data)
-                yield data
-
     content_type, _ = mimetypes.guess_type(file_path)
     if content_type is None:
         content_type = "application/octet-stream"
+    return serve_file(request, file_path, content_type, transcription.audio_file.name)
+
+
+def transcription_words(request, pk):
+    """
+    Word-level lookups for click-to-seek and search:
+    ?t=12.5 returns the word spoken at 12.5 s, ?q=market every occurrence of "market".
+    """
+    transcription = get_object_or_404(Transcription, pk=pk)
+    if not transcription.word_index or not os.path.exists(transcription.word_index.path):
+        raise Http404("No word timestamps for this transcription")
+    words = WordIndex.load(transcription.word_index.path)
 
-    if range_header.startswith("bytes="):
+    if "t" in request.GET:
         try:
-            range_value = range_header.replace("bytes=", "")
-            start_str, end_str = range_value.split("-", 1)
-            start = int(start_str) if start_str else 0
-            end = int(end_str) if end_str else file_size - 1
-        except Exception:
-            return HttpResponse(status=416)
-
-        if start >= file_size:
-            return HttpResponse(status=416)
-
-        end = min(end, file_size - 1)
-        length = end - start + 1
-        response = StreamingHttpResponse(
-            file_iter(start, length),
-            status=206,
-            content_type=content_type,
-        )
-        response["Content-Range"] = f"bytes {start}-{end}/{file_size}"
-        response["Accept-Ranges"] = "bytes"
-        response["Content-Length"] = str(length)
-        response["Cache-Control"] = "private, max-age=3600"
-        return response
-
-    response = StreamingHttpResponse(
-        file_iter(0, file_size),
-        content_type=content_type,
-    )
-    response["Accept-Ranges"] = "bytes"
-    response["Content-Length"] = str(file_size)
-    response["Cache-Control"] = "private, max-age=3600"
-    return response
+            seconds = float(request.GET["t"])
+        except ValueError:
+            return JsonResponse({"error": "Invalid time"}, status=400)
+        index = words.word_at(seconds)
+        return JsonResponse({"word": words.get(index) if index is not None else None})
+
+    query = request.GET.get("q", "")
+    return JsonResponse({"query": query, "matches": [words.get(i) for i in words.find(query)]})
 
 
 @csrf_exempt
@@ -283,45 +408,114 @@ def save_segment(request, pk):
         field = data["field"]  # 'original' or 'english'
         value = data["value"]
 
-        segments = transcription.structured_segments or []
-        if 0 <= index < len(segments) and field in ("original", "english"):
-            segments[index][field] = value
-            transcription.structured_segments = segments
-            transcription.save(update_fields=["structured_segments"])
-            return JsonResponse({"ok": True})
-        else:
+        if index < 0 or field not in ("original", "english"):
+            return JsonResponse({"error": "Invalid index/field"}, status=400)
+
+        # The page numbers segments by their position in time order
+        segment_ids = transcription.segments.order_by("start", "id").values_list("id", flat=True)
+        try:
+            segment_id = segment_ids[index]
+        except IndexError:
             return JsonResponse({"error": "Invalid index/field"}, status=400)
+
+        old_value = Segment.objects.filter(id=segment_id).values_list(field, flat=True).first()
+        Segment.objects.filter(id=segment_id).update(**{field: value})
+        search_index.index_segments([segment_id])
+        if value != old_value:
+            summary = {"content_version": F("content_version") + 1}
+            if field == "original":
+                # Keep the list page summary in step without recounting every segment
+                summary["word_count"] = F("word_count") + count_words(value) - count_words(old_value)
+                if index < PREVIEW_LENGTH // 2:
+                    summary["preview"] = transcription.refresh_preview()
+            Transcription.objects.filter(pk=pk).update(**summary)
+        return JsonResponse({"ok": True})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
 import os
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 from .models import Transcription
 from .exports.manager import ExportManager
+from .exports.utils import export_basename
+from .services.export_cache import export_key, get_export_cache, get_render_progress
+
+# Seconds a client should wait before asking again for an export still rendering
+EXPORT_RETRY_AFTER = 2
+
+
+def _export_params(params) -> tuple[str, dict]:
+    fmt = params.get("format", "txt").lower()
+    options = {
+        "include_timestamps": params.get("timestamps") == "1",
+        "include_speakers": params.get("speakers") == "1",
+    }
+    return fmt, options
+
 
+def _export_etag(request, transcript_id):
+    """
+    The export's ETag, from one small query. Segments still change while a
+    transcription is processing, so only finished ones get one.
+    """
+    row = Transcription.objects.filter(id=transcript_id).values_list("content_version", "status").first()
+    if row is None or row[1] != "DONE":
+        return None
+    fmt, options = _export_params(request.GET)
+    return export_key(transcript_id, row[0], fmt, options)
+
+
+def _rendering_response(progress: dict) -> JsonResponse:
+    response = JsonResponse({"state": "rendering", **progress}, status=202)
+    response["Retry-After"] = str(EXPORT_RETRY_AFTER)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def export_status(request, transcript_id):
+    """
+    Whether an export (same query parameters as export_transcript) is still
+    being rendered in the background: 202 {"state": "rendering", "format",
+    "done", "total"} segments, or 200 {"state": "ready"} once downloading it
+    will not wait on a render.
+    """
+    fmt, options = _export_params(request.GET)
+    transcription = get_object_or_404(Transcription.objects.only("id", "status", "content_version"), id=transcript_id)
+    cache = get_export_cache() if transcription.status == "DONE" else None
+    if cache is not None:
+        key = export_key(transcription.id, transcription.content_version, fmt, options)
+        progress = get_render_progress(cache, key) if cache.get_path(key) is None else None
+        if progress is not None:
+            return _rendering_response(progress)
+    response = JsonResponse({"state": "ready"})
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+@condition(etag_func=_export_etag)
 def export_transcript(request, transcript_id):
     """
     Export a transcription in one of the supported formats:
-    TXT, PDF, DOCX, SRT.
+    TXT, PDF, DOCX, SRT, VTT.
 
     The exported filename is derived from the uploaded audio file
     to make it meaningful for the user.
 
     Query parameters:
-        - format: 'txt', 'pdf', 'docx', 'srt'. Default: 'txt'
+        - format: 'txt', 'pdf', 'docx', 'srt', 'vtt'. Default: 'txt'
         - timestamps: '1' to include timestamps
         - speakers: '1' to include speaker info
-    """
-    # Get requested format (default to txt)
-    fmt = request.GET.get("format", "txt").lower()
 
-    # Determine export options
-    options = {
-        "include_timestamps": request.GET.get("timestamps") == "1",
-        "include_speakers": request.GET.get("speakers") == "1",
-    }
+    PDF and DOCX still being pre-rendered by prerender_exports_task answer
+    202 with the render's progress (see export_status) instead of rendering
+    a second copy in the request.
+    """
+    # Requested format (default to txt) and export options
+    fmt, options = _export_params(request.GET)
 
     # Fetch the transcription object
     transcription = get_object_or_404(Transcription, id=transcript_id)
@@ -329,24 +523,44 @@ def export_transcript(request, transcript_id):
     # Get appropriate exporter from ExportManager
     exporter = ExportManager.get_exporter(fmt)
 
-    # Generate file content (bytes)
-    file_bytes = exporter.export(transcription.structured_segments, options)
+    # Determine a meaningful filename from the uploaded audio file
+    safe_name = export_basename(transcription)
 
-    # Determine a meaningful filename
-    if transcription.audio_file:
-        # Take the original audio filename without extension
-        base_name = os.path.splitext(os.path.basename(transcription.audio_file.name))[0]
+    finished = transcription.status == "DONE"
+    key = export_key(transcription.id, transcription.content_version, fmt, options)
+    cache = get_export_cache() if finished else None
+    cached_path = cache.get_path(key) if cache is not None and not exporter.streaming else None
+    cached_file = None
+    if cached_path is not None:
+        try:
+            cached_file = open(cached_path, "rb")
+        except FileNotFoundError:
+            # Evicted since get_path: render it again below
+            pass
+
+    # Text formats stream straight from the database; PDF and DOCX are built
+    # whole, so they are rendered once per content version and then served from disk
+    if cached_file is not None:
+        response = FileResponse(cached_file, content_type=exporter.content_type)
+    elif cache is not None and not exporter.streaming and (progress := get_render_progress(cache, key)) is not None:
+        return _rendering_response(progress)
+    elif exporter.streaming:
+        response = StreamingHttpResponse(
+            exporter.iter_export(transcription.iter_segments(), options),
+            content_type=exporter.content_type,
+        )
     else:
-        # Fallback if no audio file
-        base_name = f"transcript_{transcription.id}"
-
-    # Sanitize filename (replace unsafe chars with underscore)
-    safe_name = "".join(c if c.isalnum() or c in ('-', '_') else "_" for c in base_name)
-
-    # Prepare HTTP response for file download
-    response = HttpResponse(file_bytes, content_type="application/octet-stream")
+        file_bytes = exporter.export(transcription.get_segments(), options)
+        if cache is not None:
+            cache.put_bytes(key, file_bytes)
+        response = HttpResponse(file_bytes, content_type=exporter.content_type)
     response["Content-Disposition"] = f'attachment; filename="{safe_name}.{fmt}"'
 
+    if finished:
+        # Browsers revalidate each download; unchanged transcripts get a 304
+        response["ETag"] = quote_etag(key)
+        response["Cache-Control"] = "private, no-cache"
+
     return response
 
 
@@ -356,5 +570,7 @@ def cancel_transcription(request, pk):
     transcription = get_object_or_404(Transcription, pk=pk)
     transcription.status = "CANCELLED"
     transcription.save(update_fields=["status"])
+    status_counts.invalidate()
+    progress_channel.publish(pk, status="CANCELLED")
     cancel_transcription_task.delay(pk)
     return JsonResponse({"ok": True})